@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from utils.load_data import load_risk_model
+from utils.risk import (
+    TRADING_DAYS,
+    annualized_volatility,
+    inverse_vol_weights,
+    portfolio_volatility,
+)
+from utils.telemetry import page_timer
+from utils.universe import UNKNOWN_SECTOR, load_sectors
+
+
+# ============================================================
+# PAGE CONFIG
+# ============================================================
+st.set_page_config(page_title="Risk", page_icon="🧭", layout="wide")
+st.title("🧭 Correlation & Risk")
+timer = page_timer("10_Risk")
+
+
+# ============================================================
+# LOAD ROLLING COVARIANCE (advanced daily by run_daily.py)
+# ============================================================
+with timer.phase("load"):
+    risk = load_risk_model()
+
+if risk is None or risk.filled < 2:
+    st.warning("⚠ No price data found. Run `python run_daily.py` first.")
+    st.stop()
+
+sectors = load_sectors()
+
+colA, colB, colC = st.columns(3)
+colA.metric("Symbols", len(risk.symbols))
+colB.metric("Window", f"{risk.filled} / {risk.window} sessions")
+colC.metric("As of", f"{risk.last_date:%d-%m-%Y}")
+
+
+# ============================================================
+# OPTIONS
+# ============================================================
+col1, col2, col3 = st.columns(3)
+with col1:
+    shrink = st.checkbox(
+        "Ledoit-Wolf shrinkage",
+        value=True,
+        help="Shrink the sample covariance towards a scaled identity – stable sizing when symbols outnumber sessions",
+    )
+with col2:
+    order = st.selectbox("Heatmap order", ["Sector", "Symbol", "Average correlation"])
+with col3:
+    max_weight = st.slider("Max weight per symbol (%)", 1, 100, 100) / 100
+
+with timer.phase("compute"):
+    corr = risk.correlation()
+    cov = risk.shrunk_covariance() if shrink else risk.covariance()
+
+    # Symbols with too little overlapping history are left out
+    ok = corr.index[np.isfinite(np.diag(corr.to_numpy()))]
+    corr = corr.loc[ok, ok]
+
+    avg_corr = (corr.sum(axis=1) - 1) / max(len(corr) - 1, 1)
+    if order == "Sector":
+        keys = pd.Series([sectors.get(s, UNKNOWN_SECTOR) for s in corr.index], index=corr.index)
+        ordered = keys.sort_values(kind="stable").index
+    elif order == "Average correlation":
+        ordered = avg_corr.sort_values(ascending=False).index
+    else:
+        ordered = corr.index.sort_values()
+    corr = corr.loc[ordered, ordered]
+
+    vol = annualized_volatility(cov)
+    weights = inverse_vol_weights(cov, max_weight=max_weight if max_weight < 1 else None)
+    equal = pd.Series(1 / len(vol), index=vol.index) if len(vol) else vol
+
+off_diag = corr.to_numpy()[~np.eye(len(corr), dtype=bool)]
+colD, colE, colF = st.columns(3)
+colD.metric("Average pairwise correlation", f"{np.nanmean(off_diag):.2f}" if off_diag.size else "—")
+colE.metric("Inverse-vol portfolio volatility", f"{portfolio_volatility(weights, cov) * 100:.1f}%")
+colF.metric("Equal-weight portfolio volatility", f"{portfolio_volatility(equal, cov) * 100:.1f}%")
+
+
+# ============================================================
+# CORRELATION HEATMAP
+# ============================================================
+with timer.phase("figures"):
+    fig = px.imshow(
+        corr,
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale="RdBu_r",
+        aspect="auto",
+        title=f"Rolling {risk.filled}-session correlation of daily returns",
+    )
+    fig.update_layout(height=max(450, min(14 * len(corr), 1400)))
+st.plotly_chart(fig, use_container_width=True)
+
+
+# ============================================================
+# VOLATILITY & INVERSE-VOL SIZING
+# ============================================================
+st.subheader("⚖ Inverse-volatility weights")
+
+sizing_df = pd.DataFrame({
+    "Sector": [sectors.get(s, UNKNOWN_SECTOR) for s in vol.index],
+    "Volatility_%": vol * 100,
+    "Avg_Correlation": avg_corr.reindex(vol.index),
+    "Weight_%": weights.reindex(vol.index) * 100,
+}).sort_values("Weight_%", ascending=False)
+
+st.dataframe(
+    sizing_df.style.format({
+        "Volatility_%": "{:.1f}",
+        "Avg_Correlation": "{:.2f}",
+        "Weight_%": "{:.2f}",
+    }),
+    use_container_width=True,
+)
+
+st.caption(
+    f"""
+    Covariance of daily returns over the last {risk.window} sessions, kept as
+    running sums and advanced by `run_daily.py` in O(N²) per day (no full
+    recompute). Volatilities are annualized with {TRADING_DAYS} sessions; the
+    same numbers are available to scripts through `utils.risk`
+    (`load` the state, then `shrunk_covariance()` → `inverse_vol_weights()`).
+    """
+)
+
+timer.finish()
@@ -1,5 +1,6 @@
 import streamlit as st
 from utils.load_data import load_price_data, load_prediction_data
+from utils.telemetry import page_timer
 
 
 # ============================================================
@@ -12,13 +13,15 @@ st.set_page_config(
 )
 
 st.title("🤖 AI Predictions – Today")
+timer = page_timer("1_Predictions")
 
 
 # ============================================================
 # LOAD DATA (NO BASE_DIR PARAMETER ANYMORE)
 # ============================================================
-price_df = load_price_data()
-pred_df = load_prediction_data()
+with timer.phase("load"):
+    price_df = load_price_data()
+    pred_df = load_prediction_data()
 
 if pred_df.empty:
     st.warning("⚠ No predictions file found yet. Run `python run_daily.py` first.")
@@ -44,8 +47,9 @@ if auto_refresh:
 # ============================================================
 # SELECT SYMBOL DETAILS
 # ============================================================
-sym_pred = pred_df[pred_df["Symbol"] == selected_symbol].iloc[0]
-sym_price = price_df[price_df["Symbol"] == selected_symbol].sort_values("Date")
+with timer.phase("compute"):
+    sym_pred = pred_df[pred_df["Symbol"] == selected_symbol].iloc[0]
+    sym_price = price_df[price_df["Symbol"] == selected_symbol].sort_values("Date")
 
 last_close = sym_price.iloc[-1]["Close"]
 
@@ -70,3 +74,5 @@ st.dataframe(
     pred_df.sort_values("Probability_Up", ascending=False),
     use_container_width=True,
 )
+
+timer.finish()
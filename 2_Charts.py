@@ -1,22 +1,29 @@
 import streamlit as st
-from utils.load_data import load_price_data
+from utils.load_data import (
+    get_price_data_version,
+    load_price_data,
+    load_symbol_indicators,
+)
 from utils.charts import (
-    add_indicators,
+    MAX_CHART_POINTS,
     make_candlestick_with_sma,
     make_rsi_chart,
     make_macd_chart
 )
+from utils.telemetry import page_timer
 
 # ============================================================
 # PAGE CONFIG
 # ============================================================
 st.set_page_config(page_title="Charts", page_icon="📊", layout="wide")
 st.title("📊 Pro Charts")
+timer = page_timer("2_Charts")
 
 # ============================================================
 # LOAD DATA  (NO BASE_DIR — auto-detected inside loader)
 # ============================================================
-df = load_price_data()
+with timer.phase("load"):
+    df = load_price_data()
 
 if df.empty:
     st.warning("⚠ No price data found. Run `python run_daily.py` first.")
@@ -27,7 +34,7 @@ if df.empty:
 # ============================================================
 symbols = sorted(df["Symbol"].unique())
 
-col1, col2 = st.columns(2)
+col1, col2, col3 = st.columns([2, 2, 1])
 with col1:
     symbol = st.selectbox("Select Symbol", symbols)
 
@@ -40,18 +47,27 @@ with col2:
         step=30
     )
 
-# Filter selected symbol
-sym_df = df[df["Symbol"] == symbol].sort_values("Date").tail(lookback_days)
+with col3:
+    fast_render = st.checkbox(
+        "⚡ Fast rendering",
+        value=True,
+        help=f"Aggregate candles and downsample lines above {MAX_CHART_POINTS} points (WebGL)",
+    )
+
+max_points = MAX_CHART_POINTS if fast_render else None
 
-# Add indicators
-sym_df = add_indicators(sym_df)
+# Indicators are precomputed over full history (cached per symbol +
+# data version), then sliced – no warm-up NaNs at the window edge
+with timer.phase("compute"):
+    sym_df = load_symbol_indicators(symbol, get_price_data_version()).tail(lookback_days)
 
 # ============================================================
 # BUILD CHARTS
 # ============================================================
-candle_fig = make_candlestick_with_sma(sym_df, symbol)
-rsi_fig = make_rsi_chart(sym_df, symbol)
-macd_fig = make_macd_chart(sym_df, symbol)
+with timer.phase("figures"):
+    candle_fig = make_candlestick_with_sma(sym_df, symbol, max_points)
+    rsi_fig = make_rsi_chart(sym_df, symbol, max_points)
+    macd_fig = make_macd_chart(sym_df, symbol, max_points)
 
 # ============================================================
 # DISPLAY CHARTS
@@ -63,3 +79,5 @@ with col_rsi:
     st.plotly_chart(rsi_fig, use_container_width=True)
 with col_macd:
     st.plotly_chart(macd_fig, use_container_width=True)
+
+timer.finish()
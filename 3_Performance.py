@@ -1,12 +1,22 @@
-import os
-import joblib
-import pandas as pd
+import plotly.express as px
 import streamlit as st
 
+from utils.drift import INSUFFICIENT, MIN_EFFECTIVE_ROWS, PSI_ALERT, PSI_WARN, feature_drift, symbol_drift
+from utils.evaluation import (
+    confusion_matrix_frame,
+    per_symbol_table,
+    rolling_accuracy,
+)
 from utils.load_data import (
+    load_drift_sketches,
+    load_evaluation_summary,
+    load_online_stats,
+    load_prediction_outcomes,
     load_price_data,
-    load_prediction_history,
 )
+from utils.online_model import online_vs_forest
+from utils.resources import get_model, get_model_info, model_exists
+from utils.telemetry import page_timer
 
 
 # ============================================================
@@ -14,12 +24,14 @@ from utils.load_data import (
 # ============================================================
 st.set_page_config(page_title="Model Performance", page_icon="📈", layout="wide")
 st.title("📈 Model Performance Dashboard")
+timer = page_timer("3_Performance")
 
 
 # ============================================================
 # LOAD PRICE DATA
 # ============================================================
-price_df = load_price_data()
+with timer.phase("load"):
+    price_df = load_price_data()
 
 if price_df.empty:
     st.warning("⚠ No price data found. Run `python run_daily.py` first.")
@@ -31,42 +43,141 @@ col2.metric("Total Rows", len(price_df))
 
 
 # ============================================================
-# LOAD MODELS (no BASE_DIR, auto-detected inside paths)
+# LOAD MODELS (shared handles from utils/resources.py)
 # ============================================================
-MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "model")
-MODEL_DIR = os.path.abspath(MODEL_DIR)
-
-price_model_path = os.path.join(MODEL_DIR, "price_model.pkl")
-dir_model_path = os.path.join(MODEL_DIR, "dir_model.pkl")
-
 st.markdown("### 🔍 Installed Models")
 
-if not (os.path.exists(price_model_path) and os.path.exists(dir_model_path)):
+if not (model_exists("price_model") and model_exists("dir_model")):
     st.warning("❌ Models not found. Run `python train_model.py` to train models.")
     st.stop()
 
-price_model = joblib.load(price_model_path)
-dir_model = joblib.load(dir_model_path)
+model_info = get_model_info()
+
+# Class names come from model_info.json; only unpickle for older models
+price_model_name = model_info.get("price_model") or type(get_model("price_model")).__name__
+dir_model_name = model_info.get("dir_model") or type(get_model("dir_model")).__name__
 
-st.write(f"**Price Model:** `{type(price_model).__name__}`")
-st.write(f"**Direction Model:** `{type(dir_model).__name__}`")
+st.write(f"**Price Model:** `{price_model_name}`")
+st.write(f"**Direction Model:** `{dir_model_name}`")
 
 
 # ============================================================
-# LOAD PREDICTION HISTORY (if available)
+# FEATURE DRIFT (training-window histograms vs. recent feature rows)
 # ============================================================
-hist_df = load_prediction_history()
+st.markdown("---")
+st.subheader("🌊 Feature Drift")
+
+with timer.phase("load"):
+    reference, live = load_drift_sketches()
+
+if reference is None:
+    st.info("No drift reference yet – it is saved next to the model by `python train_model.py`.")
+elif live is None or live.version != reference.version or live.counts.sum() == 0:
+    st.info("No live feature rows since the last training – `python run_daily.py` adds one row per symbol each day.")
+else:
+    with timer.phase("compute"):
+        drift_df = feature_drift(reference, live)
+        sym_psi = symbol_drift(reference, live)
+
+    colD1, colD2, colD3 = st.columns(3)
+    colD1.metric("Features in alert (PSI ≥ %.2f)" % PSI_ALERT, int((drift_df["Status"] == "alert").sum()))
+    colD2.metric("Features to watch (PSI ≥ %.2f)" % PSI_WARN, int((drift_df["Status"] == "warn").sum()))
+    colD3.metric("Effective live rows", f"{live.effective_rows():,.0f}")
+
+    if (drift_df["Status"] == INSUFFICIENT).all():
+        st.info(
+            f"Too few live rows to score drift yet ({live.effective_rows():,.0f} of "
+            f"{MIN_EFFECTIVE_ROWS:,.0f} effective) – the PSI below is mostly sampling noise."
+        )
+
+    with timer.phase("figures"):
+        drift_fig = px.bar(
+            drift_df,
+            x="Feature",
+            y="PSI",
+            color="Status",
+            color_discrete_map={"ok": "seagreen", "warn": "orange", "alert": "crimson", INSUFFICIENT: "lightgray"},
+            hover_data={"KS": ":.3f", "PSI": ":.3f"},
+            title="Population stability index per feature (all symbols)",
+        )
+        drift_fig.add_hline(y=PSI_WARN, line_dash="dot", line_color="orange")
+        drift_fig.add_hline(y=PSI_ALERT, line_dash="dash", line_color="crimson")
+    st.plotly_chart(drift_fig, use_container_width=True)
+
+    if not sym_psi.empty:
+        with timer.phase("figures"):
+            sym_fig = px.imshow(
+                sym_psi,
+                zmin=0,
+                zmax=max(PSI_ALERT * 2, 0.5),
+                color_continuous_scale="YlOrRd",
+                aspect="auto",
+                title="PSI per symbol vs. its own training window",
+            )
+        st.plotly_chart(sym_fig, use_container_width=True)
+
+    st.caption(
+        "Fixed-bin histograms (training deciles) saved with the model; live counts decay "
+        "per session, so they reflect roughly the last quarter. Histograms are only scored "
+        f"from {MIN_EFFECTIVE_ROWS:.0f} effective rows on – a symbol after ~110 daily runs. "
+        "Alerts are written to the run log (`run_daily.py --log`)."
+    )
+
+
+# ============================================================
+# ONLINE MODEL VS. FOREST (test-then-train on the same rows)
+# ============================================================
+st.markdown("---")
+st.subheader("🔁 Online Model vs. Forest")
+
+with timer.phase("load"):
+    online = load_online_stats()
+
+if not online:
+    st.info("No online model – create one with `python train_model.py --online`; `run_daily.py` then updates it every day.")
+elif not online["n"]:
+    st.info("Online model created – accuracy appears once `run_daily.py` has resolved a previous run's rows.")
+else:
+    colO1, colO2, colO3 = st.columns(3)
+    colO1.metric("Online (SGD) accuracy", f"{online['online_correct'] / online['n'] * 100:.1f}%")
+    colO2.metric("Forest accuracy, same rows", f"{online['forest_correct'] / online['n'] * 100:.1f}%")
+    colO3.metric("Rows scored before learning", f"{online['n']:,}")
+
+    with timer.phase("figures"):
+        online_fig = px.line(
+            online_vs_forest(online),
+            x="Date",
+            y="Rolling_Accuracy",
+            color="Model",
+            title="Rolling direction accuracy (20 resolved days)",
+        )
+        online_fig.add_hline(y=0.5, line_dash="dash", line_color="gray")
+    st.plotly_chart(online_fig, use_container_width=True)
+
+    st.caption(
+        f"Every row is scored by both models before the online model learns from it. "
+        f"Brier score: online {online['online_brier_sum'] / online['n']:.4f}, "
+        f"forest {online['forest_brier_sum'] / online['n']:.4f}. "
+        f"Rows learned in total (training window + daily): {online['n_seen']:,}."
+    )
+
+
+# ============================================================
+# LOAD EVALUATION STORE (running aggregates from run_daily.py)
+# ============================================================
+with timer.phase("load"):
+    summary = load_evaluation_summary()
 
 st.markdown("---")
 st.subheader("📚 Historical Prediction Accuracy")
 
-if hist_df.empty:
+if summary["n"] == 0:
     st.info(
         """
-        No prediction history found.
+        No resolved predictions yet.
 
-        After you run **run_daily.py**, a file  
-        `predictions_history.csv` will automatically update every day.
+        Each run of **run_daily.py** resolves earlier predictions against the
+        realized next close and updates `evaluation_summary.json`.
 
         Come back later to see rolling accuracy, confusion matrix, and performance charts.
         """
@@ -75,40 +186,55 @@ if hist_df.empty:
 
 
 # ============================================================
-# CLEAN & PREPARE HISTORY
+# BASIC METRICS
 # ============================================================
-hist_df = hist_df.dropna(subset=["Predicted_Direction", "Probability_Up"])
+accuracy = summary["correct"] / summary["n"]
+brier = summary["brier_sum"] / summary["n"]
 
-# merge with true prices
-merged = pd.merge(
-    hist_df,
-    price_df,
-    on=["Date", "Symbol"],
-    how="inner"
-)
+colA, colB, colC = st.columns(3)
+colA.metric("Overall Direction Accuracy", f"{accuracy*100:.2f}%")
+colB.metric("Brier Score", f"{brier:.4f}")
+colC.metric("Resolved Predictions", summary["n"])
 
-merged["True_Direction"] = (
-    merged["Close"].shift(-1) > merged["Close"]
-).astype(int)
 
-merged["Pred_Class"] = (merged["Predicted_Direction"] == "UP").astype(int)
+# ============================================================
+# ROLLING ACCURACY
+# ============================================================
+window = st.slider("Rolling window (trading days)", 5, 120, 20, step=5)
+with timer.phase("compute"):
+    rolling_df = rolling_accuracy(summary, window)
+
+with timer.phase("figures"):
+    fig = px.line(
+        rolling_df,
+        x="Date",
+        y="Rolling_Accuracy",
+        title=f"Rolling Direction Accuracy ({window} days)",
+    )
+    fig.add_hline(y=0.5, line_dash="dash", line_color="gray")
+st.plotly_chart(fig, use_container_width=True)
 
 
 # ============================================================
-# BASIC METRICS
+# CONFUSION MATRIX + PER-SYMBOL ACCURACY
 # ============================================================
-accuracy = (merged["Pred_Class"] == merged["True_Direction"]).mean()
+col_conf, col_sym = st.columns([1, 2])
 
-colA, colB = st.columns(2)
-colA.metric("Overall Direction Accuracy", f"{accuracy*100:.2f}%")
-colB.metric("History Rows", len(merged))
+with col_conf:
+    st.markdown("### 🧮 Confusion Matrix")
+    st.dataframe(confusion_matrix_frame(summary), use_container_width=True)
+
+with col_sym:
+    st.markdown("### 🏷 Per-Symbol Accuracy")
+    st.dataframe(per_symbol_table(summary), use_container_width=True, hide_index=True)
 
 
 # ============================================================
 # SHOW TABLE
 # ============================================================
-st.markdown("### 📄 Full Prediction + Actual Comparison")
-st.dataframe(merged.sort_values("Date", ascending=False), use_container_width=True)
+st.markdown("### 📄 Recent Prediction + Actual Comparison")
+outcomes_df = load_prediction_outcomes(summary["updated_at"])
+st.dataframe(outcomes_df.sort_values("Date", ascending=False), use_container_width=True)
 
 
 # ============================================================
@@ -118,12 +244,11 @@ st.info(
     """
     ✔ This dashboard will become richer as more history accumulates.  
     ✔ It will later include:  
-    - Rolling accuracy  
     - Per-symbol heatmaps  
-    - Confusion matrix  
     - Win-rate statistics  
-    - Drift detection  
 
     Keep running `python run_daily.py` every day to build history.
     """
 )
+
+timer.finish()
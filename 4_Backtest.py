@@ -1,6 +1,19 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
-from utils.load_data import load_price_data
+from utils.load_data import (
+    get_prediction_history_version,
+    get_price_data_version,
+    load_prediction_history,
+    load_price_data,
+    load_price_panel,
+)
+from utils.portfolio import SIZING_MODES, build_price_panel, portfolio_backtest
+from utils.resources import get_model, get_result_cache, model_path
+from utils.robustness import bootstrap_trades
+from utils.signal_backtest import RULES, backfill_signals, history_signals, signal_backtest
 from utils.strategy import atr_strategy_backtest
+from utils.telemetry import page_timer
 import plotly.express as px
 
 
@@ -8,19 +21,236 @@ import plotly.express as px
 # PAGE CONFIG
 # ============================================================
 st.set_page_config(page_title="Backtest", page_icon="🧪", layout="wide")
-st.title("🧪 ATR-based Strategy Backtest (Example)")
+st.title("🧪 Strategy Backtest")
+timer = page_timer("4_Backtest")
 
 
 # ============================================================
 # LOAD PRICE DATA (NO BASE_DIR — auto-detected inside loader)
 # ============================================================
-df = load_price_data()
+with timer.phase("load"):
+    df = load_price_data()
 
 if df.empty:
     st.warning("⚠ No price data found. Run `python run_daily.py` first.")
     st.stop()
 
 
+mode = st.radio(
+    "Mode",
+    ["Single symbol", "Portfolio (all symbols)", "AI signals (predictions)"],
+    horizontal=True,
+)
+
+
+# ============================================================
+# RESULT CACHE (memory LRU + disk, keyed by strategy/params/symbol/data)
+# ============================================================
+result_cache = get_result_cache()
+
+
+def cached_portfolio_backtest(data_version, lookback_days, **params):
+    return result_cache.get_or_compute(
+        "portfolio_atr",
+        {"lookback_days": lookback_days, **params},
+        None,
+        data_version,
+        lambda: portfolio_backtest(build_price_panel(load_price_panel(), lookback_days), **params),
+    )
+
+
+def cached_signal_backtest(data_version, source, source_version, thresholds, rule, cost_bps):
+    # source_version (history file / model file) is part of the data version
+    def compute():
+        prices = load_price_data()
+        if source == "history":
+            prob = history_signals(load_prediction_history())
+        else:
+            prob = backfill_signals(prices, get_model("dir_model"))
+        return signal_backtest(prob, prices, np.array(thresholds), rule, cost_bps)
+
+    return result_cache.get_or_compute(
+        "ml_signals",
+        {"source": source, "thresholds": thresholds, "rule": rule, "cost_bps": cost_bps},
+        None,
+        f"{data_version}:{source_version}",
+        compute,
+    )
+
+
+# ============================================================
+# AI SIGNALS MODE
+# ============================================================
+if mode.startswith("AI signals"):
+    col1, col2, col3 = st.columns(3)
+    source = col1.radio(
+        "Signal source",
+        ["history", "backfill"],
+        format_func=lambda s: {
+            "history": "Prediction history",
+            "backfill": "Backfill with current model",
+        }[s],
+    )
+    rule = col2.radio(
+        "Rule",
+        RULES,
+        format_func=lambda r: {"long_flat": "Long / flat", "long_short": "Long / short"}[r],
+    )
+    cost_bps = col3.number_input("Costs (bps per unit traded)", 0.0, 100.0, 10.0, step=1.0)
+
+    th_range = st.slider("Probability thresholds", 0.50, 0.90, (0.50, 0.70), step=0.01)
+    thresholds = tuple(np.round(np.arange(th_range[0], th_range[1] + 1e-9, 0.01), 2))
+
+    if source == "history":
+        source_version = get_prediction_history_version()
+        if not source_version:
+            st.warning("⚠ No prediction history found. Run `python run_daily.py` first.")
+            st.stop()
+    else:
+        if get_model("dir_model") is None:
+            st.warning("⚠ Direction model not found. Run `python train_model.py` first.")
+            st.stop()
+        source_version = str(model_path("dir_model").stat().st_mtime_ns)
+
+    with st.spinner("Backtesting all thresholds..."), timer.phase("compute"):
+        result = cached_signal_backtest(
+            get_price_data_version(), source, source_version, thresholds, rule, cost_bps
+        )
+
+    stats = result["stats"]
+    if result["equity"].empty or not result["symbols"]:
+        st.warning("⚠ No predictions overlap with realized prices yet.")
+        st.stop()
+
+    best = stats.loc[stats["sharpe"].idxmax()]
+    colA, colB, colC, colD = st.columns(4)
+    colA.metric("Best threshold (Sharpe)", f"{best['threshold']:.2f}")
+    colB.metric("Total Return", f"{best['total_return']*100:.1f}%")
+    colC.metric("Max Drawdown", f"{best['max_drawdown']*100:.1f}%")
+    colD.metric("Buy & hold", f"{(result['benchmark'].iloc[-1] - 1)*100:.1f}%")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.line(
+            stats, x="threshold", y=["total_return", "max_drawdown"],
+            markers=True, title="Return / Drawdown by Threshold",
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        chosen = st.selectbox("Equity curve for threshold", thresholds, index=thresholds.index(best["threshold"]))
+        curves = result["equity"][[chosen]].rename(columns={chosen: f"Signals ≥ {chosen:.2f}"})
+        curves["Buy & hold"] = result["benchmark"]
+        curves = curves.rename_axis("Date").reset_index()
+        fig = px.line(curves, x="Date", y=curves.columns[1:], title="Equity Curve vs Buy & Hold")
+        st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(
+        stats.style.format({
+            "threshold": "{:.2f}", "total_return": "{:.1%}", "max_drawdown": "{:.1%}",
+            "sharpe": "{:.2f}", "hit_rate": "{:.1%}", "avg_exposure": "{:.2f}", "avg_turnover": "{:.2f}",
+        }),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    st.caption(
+        """
+        Signals dated D are traded at D's close and held to the next close,
+        equally weighted across active signals. **Backfilled** signals come
+        from the current model scoring the full price history, most of which
+        it was trained on – treat them as in-sample.
+        """
+    )
+    timer.finish()
+    st.stop()
+
+
+# ============================================================
+# PORTFOLIO MODE
+# ============================================================
+if mode.startswith("Portfolio"):
+    col1, col2, col3 = st.columns(3)
+    max_positions = col1.number_input("Max open positions", 1, 100, 10)
+    sizing = col2.selectbox("Position sizing", SIZING_MODES)
+    lookback_days = col3.number_input("Lookback days", 100, 10000, 1000, step=50)
+
+    with st.expander("⚙ Strategy & cost parameters"):
+        colP1, colP2, colP3, colP4 = st.columns(4)
+        atr_mult_stop = colP1.number_input("Stop × ATR", 0.5, 10.0, 2.0, step=0.25)
+        atr_mult_tp = colP2.number_input("Take-profit × ATR", 0.5, 20.0, 3.0, step=0.25)
+        rsi_entry = colP3.number_input("RSI entry (>)", 0.0, 100.0, 50.0, step=1.0)
+        rsi_exit = colP4.number_input("RSI exit (<)", 0.0, 100.0, 45.0, step=1.0)
+
+        colC1, colC2, colC3, colC4 = st.columns(4)
+        initial_capital = colC1.number_input("Initial capital (₹)", 10_000.0, 1e9, 1_000_000.0, step=100_000.0)
+        cost_bps = colC2.number_input("Costs (bps per side)", 0.0, 100.0, 10.0, step=1.0)
+        slippage_bps = colC3.number_input("Slippage (bps per side)", 0.0, 100.0, 5.0, step=1.0)
+        risk_per_trade = colC4.number_input(
+            "Risk per trade (volatility sizing)", 0.001, 0.1, 0.01, step=0.001, format="%.3f"
+        )
+
+    with st.spinner("Running portfolio backtest..."), timer.phase("compute"):
+        result = cached_portfolio_backtest(
+            get_price_data_version(),
+            int(lookback_days),
+            max_positions=int(max_positions),
+            sizing=sizing,
+            initial_capital=initial_capital,
+            cost_bps=cost_bps,
+            slippage_bps=slippage_bps,
+            atr_mult_stop=atr_mult_stop,
+            atr_mult_tp=atr_mult_tp,
+            rsi_entry=rsi_entry,
+            rsi_exit=rsi_exit,
+            risk_per_trade=risk_per_trade,
+        )
+
+    stats = result["stats"]
+    if not stats:
+        st.warning("⚠ Not enough data to run the portfolio backtest.")
+        st.stop()
+
+    colA, colB, colC, colD, colE = st.columns(5)
+    colA.metric("Total Return", f"{stats['total_return']*100:.1f}%")
+    colB.metric("CAGR", f"{stats['cagr']*100:.1f}%")
+    colC.metric("Max Drawdown", f"{stats['max_drawdown']*100:.1f}%")
+    colD.metric("Sharpe", f"{stats['sharpe']:.2f}")
+    colE.metric("Trades", stats["n_trades"])
+
+    equity = result["equity"].rename_axis("Date").reset_index()
+    with timer.phase("figures"):
+        fig = px.line(equity, x="Date", y="Equity", title="Portfolio Equity Curve (ATR Strategy)")
+    st.plotly_chart(fig, use_container_width=True)
+
+    exposures = result["exposures"]
+    exposure_df = exposures.sum(axis=1).rename("Gross exposure").to_frame()
+    exposure_df["Open positions"] = (exposures > 0).sum(axis=1)
+    exposure_df = exposure_df.rename_axis("Date").reset_index()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            px.area(exposure_df, x="Date", y="Gross exposure", title="Gross Exposure (share of equity)"),
+            use_container_width=True,
+        )
+    with col2:
+        latest = exposures.iloc[-1]
+        latest = latest[latest > 0].sort_values(ascending=False).rename("Weight")
+        st.subheader("📌 Current Holdings")
+        st.dataframe(latest.to_frame().style.format("{:.1%}"), use_container_width=True)
+
+    st.caption(
+        f"Win rate {stats['win_rate']*100:.1f}% · avg {stats['avg_positions']:.1f} positions · "
+        f"costs paid ₹{stats['costs_paid']:,.0f}"
+    )
+
+    st.subheader("📜 Trade Log")
+    st.dataframe(result["trades"].iloc[::-1], use_container_width=True, hide_index=True)
+    timer.finish()
+    st.stop()
+
+
 # ============================================================
 # USER INPUTS
 # ============================================================
@@ -39,14 +269,37 @@ with col2:
         step=50
     )
 
-# Filter data
-sym_df = df[df["Symbol"] == symbol].sort_values("Date").tail(lookback_days)
+with st.expander("⚙ Strategy parameters"):
+    colP1, colP2, colP3, colP4 = st.columns(4)
+    atr_mult_stop = colP1.number_input("Stop × ATR", 0.5, 10.0, 2.0, step=0.25)
+    atr_mult_tp = colP2.number_input("Take-profit × ATR", 0.5, 20.0, 3.0, step=0.25)
+    rsi_entry = colP3.number_input("RSI entry (>)", 0.0, 100.0, 50.0, step=1.0)
+    rsi_exit = colP4.number_input("RSI exit (<)", 0.0, 100.0, 45.0, step=1.0)
+
 
 
 # ============================================================
-# RUN BACKTEST
+# RUN BACKTEST (cached: flipping back to a seen combination is instant)
 # ============================================================
-result = atr_strategy_backtest(sym_df)
+def run_symbol_backtest():
+    sym_df = df[df["Symbol"] == symbol].sort_values("Date").tail(lookback_days)
+    return atr_strategy_backtest(sym_df, atr_mult_stop, atr_mult_tp, rsi_entry, rsi_exit)
+
+
+with timer.phase("compute"):
+    result = result_cache.get_or_compute(
+        "atr_strategy",
+        {
+            "lookback_days": int(lookback_days),
+            "atr_mult_stop": atr_mult_stop,
+            "atr_mult_tp": atr_mult_tp,
+            "rsi_entry": rsi_entry,
+            "rsi_exit": rsi_exit,
+        },
+        symbol,
+        get_price_data_version(),
+        run_symbol_backtest,
+    )
 
 if result is None:
     st.warning("⚠ Not enough data to run ATR strategy.")
@@ -68,24 +321,71 @@ colB.metric("Max Drawdown", f"{max_dd*100:.1f}%")
 # ============================================================
 # PLOT EQUITY CURVE
 # ============================================================
-fig = px.line(
-    bt_df,
-    x="Date",
-    y="Equity",
-    title=f"{symbol} – Equity Curve (ATR Strategy)"
-)
+with timer.phase("figures"):
+    fig = px.line(
+        bt_df,
+        x="Date",
+        y="Equity",
+        title=f"{symbol} – Equity Curve (ATR Strategy)"
+    )
 st.plotly_chart(fig, use_container_width=True)
 
 
+# ============================================================
+# ROBUSTNESS (bootstrap of the trade returns)
+# ============================================================
+with st.expander("🎲 Robustness – bootstrap confidence intervals"):
+    trades = result["trades"]
+
+    colR1, colR2 = st.columns(2)
+    n_resamples = colR1.select_slider("Resamples", [1_000, 5_000, 10_000, 20_000], value=10_000)
+    block_size = colR2.number_input("Block size (1 = i.i.d., >1 keeps trade streaks)", 1, 50, 1)
+
+    years = (bt_df["Date"].iloc[-1] - bt_df["Date"].iloc[0]).days / 365.25
+    with timer.phase("compute"):
+        boot = bootstrap_trades(
+            trades["Return"],
+            n_resamples=n_resamples,
+            block_size=int(block_size),
+            trades_per_year=len(trades) / years if years > 0 else None,
+        )
+
+    if not boot:
+        st.info("Need at least 2 closed trades for a bootstrap.")
+    else:
+        lo_pct = (1 - boot["confidence"]) / 2 * 100
+        ci_df = pd.DataFrame(
+            [(name, boot["point"][name], *boot["ci"][name]) for name in boot["ci"]],
+            columns=["Metric", "Actual", f"P{lo_pct:g}", "Median", f"P{100 - lo_pct:g}"],
+        )
+        st.dataframe(
+            ci_df.style.format({c: "{:.2f}" for c in ci_df.columns[1:]}),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.caption(
+            f"{boot['n_trades']} closed trades · {boot['n_resamples']:,} resamples · "
+            f"probability of a loss: {boot['prob_loss']*100:.1f}%"
+        )
+
+        fig = px.histogram(
+            x=boot["samples"]["total_return"] * 100,
+            nbins=60,
+            labels={"x": "Total return (%)"},
+            title="Bootstrap distribution of total return",
+        )
+        fig.add_vline(x=boot["point"]["total_return"] * 100, line_dash="dash")
+        st.plotly_chart(fig, use_container_width=True)
+
+
 # ============================================================
 # FOOTER
 # ============================================================
 st.caption(
     """
     This is a **technical ATR-based example strategy**, independent of the ML signals.
-
-    To backtest the **actual AI predictions strategy**,  
-    you would need the full `predictions_history.csv` generated daily by:
-    `python run_daily.py`.
+    Use the **AI signals** mode to backtest the model's predictions.
     """
 )
+
+timer.finish()
@@ -1,81 +1,150 @@
-import os
+from datetime import date
+from functools import partial
+from pathlib import Path
+
 import streamlit as st
 from utils.load_data import (
-    load_price_data,
-    load_prediction_data,
-    load_prediction_history
+    get_base_dir,
+    load_export_manifest,
+    load_export_preview,
 )
+from utils.exports import get_export_dir, write_filtered_export
+from utils.telemetry import page_timer
 
 # ============================================================
 # PAGE CONFIG
 # ============================================================
 st.set_page_config(page_title="Downloads", page_icon="💾", layout="wide")
 st.title("💾 Downloads")
+timer = page_timer("5_Downloads")
 
 
 # ============================================================
-# LOAD DATA  (NO BASE_DIR NEEDED)
+# LOAD EXPORT MANIFEST  (prebuilt by run_daily.py — no CSV built here)
 # ============================================================
-price_df = load_price_data()
-pred_df = load_prediction_data()
-hist_df = load_prediction_history()
+with timer.phase("load"):
+    export_dir = get_export_dir(get_base_dir())
+    manifest = load_export_manifest()
+
+
+def export_section(name: str, title: str, label: str, empty_msg: str, preview_rows=200):
+    """Preview + download buttons for one prebuilt export."""
+
+    st.subheader(title)
+
+    entry = manifest.get(name)
+    if not entry:
+        st.warning(empty_msg)
+        return
+
+    st.caption(
+        f"Version `{entry['version']}` · {entry['rows']:,} rows · built {entry['built_at']}"
+    )
+
+    preview = load_export_preview(name, entry["version"], preview_rows)
+    st.dataframe(preview, use_container_width=True, height=300)
+
+    # File contents are only read when the button is clicked
+    col_csv, col_parquet = st.columns(2)
+
+    with col_csv:
+        csv_path = export_dir / entry["files"]["csv.gz"]
+        st.download_button(
+            f"⬇ Download {label} (CSV, gzip)",
+            data=partial(Path.read_bytes, csv_path),
+            file_name=f"{name}_export.csv.gz",
+            mime="application/gzip",
+            key=f"{name}_csv",
+        )
+
+    if "parquet" in entry["files"]:
+        with col_parquet:
+            parquet_path = export_dir / entry["files"]["parquet"]
+            st.download_button(
+                f"⬇ Download {label} (Parquet)",
+                data=partial(Path.read_bytes, parquet_path),
+                file_name=f"{name}_export.parquet",
+                mime="application/octet-stream",
+                key=f"{name}_parquet",
+            )
 
 
 # ============================================================
 # PRICE DATA DOWNLOAD
 # ============================================================
-st.subheader("📁 Price Data (stock_data.csv)")
-
-if price_df.empty:
-    st.warning("⚠ No price data found. Run `python run_daily.py` first.")
-else:
-    st.dataframe(price_df.tail(200), use_container_width=True, height=300)
-
-    csv_price = price_df.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        "⬇ Download Full Price Data CSV",
-        data=csv_price,
-        file_name="stock_data_export.csv",
-        mime="text/csv",
-    )
+export_section(
+    "stock_data",
+    "📁 Price Data (stock_data.csv)",
+    "Full Price Data",
+    "⚠ No price export found. Run `python run_daily.py` first.",
+)
+
+
+# ============================================================
+# FILTERED PRICE EXPORT (SYMBOL + DATE RANGE)
+# ============================================================
+price_entry = manifest.get("stock_data")
+
+if price_entry:
+    st.subheader("🔎 Filtered Price Export")
+
+    with st.form("filtered_export"):
+        date_min = date.fromisoformat(price_entry["date_min"])
+        date_max = date.fromisoformat(price_entry["date_max"])
+
+        col1, col2 = st.columns(2)
+        with col1:
+            selected_symbols = st.multiselect("Symbols", price_entry["symbols"])
+        with col2:
+            date_range = st.date_input(
+                "Date range",
+                value=(date_min, date_max),
+                min_value=date_min,
+                max_value=date_max,
+            )
+
+        submitted = st.form_submit_button("Prepare export")
+
+    if submitted:
+        start = date_range[0] if len(date_range) > 0 else None
+        end = date_range[1] if len(date_range) > 1 else None
+
+        with st.spinner("Streaming filtered export..."), timer.phase("compute"):
+            filtered_path = write_filtered_export(
+                export_dir, "stock_data", selected_symbols, start, end
+            )
+
+        if filtered_path is not None:
+            st.download_button(
+                "⬇ Download Filtered Price Data (CSV, gzip)",
+                data=partial(Path.read_bytes, filtered_path),
+                file_name="stock_data_filtered.csv.gz",
+                mime="application/gzip",
+                key="stock_data_filtered",
+            )
 
 
 # ============================================================
 # LATEST PREDICTIONS DOWNLOAD
 # ============================================================
-st.subheader("🤖 Latest AI Predictions (latest_predictions.csv)")
-
-if pred_df.empty:
-    st.warning("⚠ No predictions found. Run `python run_daily.py` first.")
-else:
-    st.dataframe(pred_df, use_container_width=True)
-
-    csv_pred = pred_df.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        "⬇ Download Latest Predictions CSV",
-        data=csv_pred,
-        file_name="latest_predictions_export.csv",
-        mime="text/csv",
-    )
+export_section(
+    "latest_predictions",
+    "🤖 Latest AI Predictions (latest_predictions.csv)",
+    "Latest Predictions",
+    "⚠ No predictions found. Run `python run_daily.py` first.",
+    preview_rows=1000,
+)
 
 
 # ============================================================
 # PREDICTION HISTORY DOWNLOAD
 # ============================================================
-st.subheader("📚 Prediction History (predictions_history.csv)")
-
-if hist_df.empty:
-    st.info("No prediction history found yet. It will generate daily after running `run_daily.py`.")
-else:
-    st.dataframe(hist_df.tail(200), use_container_width=True, height=300)
-
-    csv_hist = hist_df.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        "⬇ Download Prediction History CSV",
-        data=csv_hist,
-        file_name="predictions_history_export.csv",
-        mime="text/csv",
-    )
+export_section(
+    "predictions_history",
+    "📚 Prediction History (predictions_history.csv)",
+    "Prediction History",
+    "No prediction history found yet. It will generate daily after running `run_daily.py`.",
+)
 
 
 # ============================================================
@@ -84,7 +153,9 @@ else:
 st.caption(
     """
     ✔ All files are generated automatically by **run_daily.py**  
-    ✔ You can download them anytime  
+    ✔ Exports are prebuilt as gzip CSV + Parquet (rebuild: `python -m utils.exports`)  
     ✔ Streamlit Cloud-optimized (no BASE_DIR issues)
     """
 )
+
+timer.finish()
@@ -1,10 +1,23 @@
+from datetime import date
+
 import streamlit as st
+from utils.market_calendar import calendar_years, last_closed_session, now_ist, upcoming_holidays
+from utils.price_store import COMPACT_AFTER_DELTAS, PriceStore
+from utils.scheduling import lock_status, next_due, read_state
+from utils.telemetry import (
+    RENDER_WINDOW,
+    export_telemetry_json,
+    page_latency_stats,
+    page_timer,
+    reset_telemetry,
+)
 
 # ============================================================
 # PAGE CONFIG
 # ============================================================
 st.set_page_config(page_title="Admin", page_icon="🛠️", layout="wide")
 st.title("🛠️ Admin & System Notes")
+timer = page_timer("6_Admin")
 
 st.markdown(
     """
@@ -30,15 +43,33 @@ st.subheader("📦 Manual Commands")
 
 st.code(
     """
-# Fetch full historical NSE data
+# Fetch new bars into the price store (data/store) – full history on the
+# first run, afterwards only bars from each symbol's last stored date on
+# (that bar is re-fetched, so a partial intraday bar gets corrected)
 python nse_fetch.py
 
+# Re-download the full history of every symbol into new base partitions –
+# needed after a split / bonus issue (Yahoo re-adjusts the older bars)
+python nse_fetch.py --full
+
 # Retrain ML models (price + direction)
 python train_model.py
 
+# Same, for histories larger than RAM: features streamed into an on-disk
+# float32 matrix (data/cache/train) under a memory budget
+python train_model.py --out-of-core --memory-budget-mb 2048
+
+# Also fit the online direction model (run_daily.py then updates it
+# every day with partial_fit and compares it with the forest)
+python train_model.py --online
+
 # Generate today's predictions + append to history
 python run_daily.py
 
+# Symbols come from data/universe.csv (e.g. the NIFTY 500 list);
+# fetch / features / scoring run in symbol shards on all cores
+python run_daily.py --workers 8
+
 # Launch dashboard locally
 streamlit run app.py
 """,
@@ -57,5 +88,130 @@ st.markdown(
 - Streamlit will run `app.py` automatically  
 - Data & model folders must be included in your repo  
 
-To automate daily predictions, use **Windows Task Scheduler** (or Linux cron):
+Commit and push the refreshed `data/` folder after each daily run so the
+cloud app picks up the new predictions.
+"""
+)
+
+
+# ============================================================
+# DAILY SCHEDULER (trading-calendar aware)
+# ============================================================
+st.subheader("🗓 Daily Scheduler")
+
+st.markdown(
+    """
+Run the built-in scheduler instead of a plain daily cron job. It only
+runs on NSE trading days (weekends + `data/nse_holidays.csv` are skipped),
+waits for the session's bar to be published after the close, and holds a
+lock file so two pipeline runs never overlap.
+"""
+)
+
+st.code(
+    """
+# Keep running in a terminal / as a service (one run per trading day)
+python scheduler.py --log
+
+# Or let cron / Task Scheduler start it every weekday at 16:00 IST –
+# it exits immediately on holidays and when the session is already done
+python scheduler.py --once --log
+
+# Calendar, last processed session, next run, lock holder
+python scheduler.py --status
+""",
+    language="bash",
+)
+
+now = now_ist()
+state = read_state()
+session, due_at = next_due(now, date.fromisoformat(state["last_session"]) if state.get("last_session") else None)
+lock = lock_status()
+
+colS1, colS2, colS3, colS4 = st.columns(4)
+colS1.metric("Last closed session", f"{last_closed_session(now):%d-%m-%Y}")
+colS2.metric("Last processed", state.get("last_session", "—"), state.get("status"), delta_color="off")
+colS3.metric("Next run (IST)", f"{due_at:%d-%m %H:%M}", f"session {session:%d-%m}", delta_color="off")
+colS4.metric("Pipeline lock", "free" if lock is None else f"held by {lock.get('owner', '?')}")
+
+if now.year not in calendar_years():
+    st.warning(
+        f"⚠ `data/nse_holidays.csv` has no {now.year} holidays – only weekends are "
+        "skipped. Add this year's dates from the NSE holiday circular."
+    )
+
+holidays_df = upcoming_holidays(90, now)
+if not holidays_df.empty:
+    st.markdown("**Upcoming NSE holidays**")
+    st.dataframe(holidays_df, use_container_width=True, hide_index=True)
+
+
+# ============================================================
+# PRICE STORE (base partitions + daily deltas)
+# ============================================================
+st.subheader("🗄 Price Store")
+
+price_store = PriceStore()
+if not price_store.exists():
+    st.info("No price store yet – the next `python nse_fetch.py` imports `stock_data.csv` into `data/store`.")
+else:
+    store_status = price_store.status()
+    colP1, colP2, colP3, colP4 = st.columns(4)
+    colP1.metric("Symbols", store_status["symbols"])
+    colP2.metric("Base rows", f"{store_status['base_rows']:,}")
+    colP3.metric(
+        "Pending deltas",
+        store_status["deltas"],
+        f"{store_status['delta_rows']:,} rows",
+        delta_color="off",
+    )
+    colP4.metric("Generation", store_status["generation"])
+    st.caption(
+        f"Manifest version `{store_status['version']}` · updated {store_status['updated_at']} · "
+        f"deltas are compacted by the scheduler once {COMPACT_AFTER_DELTAS} have accumulated"
+    )
+
+st.code(
+    """
+python -m utils.price_store status    # partitions, pending deltas
+python -m utils.price_store compact   # fold deltas into base partitions now
+""",
+    language="bash",
+)
+
+
+# ============================================================
+# RENDER LATENCY (in-process telemetry of every page)
+# ============================================================
+st.subheader("⏱ Page render latency")
+
+latency_df = page_latency_stats()
+
+if latency_df.empty:
+    st.info("No page renders recorded yet in this server process.")
+else:
+    st.dataframe(
+        latency_df.style.format({c: "{:.1f}" for c in latency_df.columns if c.endswith("_ms")}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+st.caption(
+    f"p50 / p95 over the last {RENDER_WINDOW} reruns per page, split into "
+    "load / compute / figures phases. Kept in memory – resets when the server restarts."
+)
+
+col_export, col_reset = st.columns(2)
+with col_export:
+    st.download_button(
+        "⬇ Download telemetry (JSON)",
+        data=export_telemetry_json(),
+        file_name="render_telemetry.json",
+        mime="application/json",
+    )
+with col_reset:
+    if st.button("🗑 Reset telemetry"):
+        reset_telemetry()
+        st.rerun()
 
+timer.finish()
@@ -0,0 +1,102 @@
+import time
+
+import streamlit as st
+from utils.load_data import get_latest_features_version, load_latest_features
+from utils.screener import add_screen_columns, screen_universe
+from utils.telemetry import page_timer
+
+
+# ============================================================
+# PAGE CONFIG
+# ============================================================
+st.set_page_config(page_title="Screener", page_icon="🔎", layout="wide")
+st.title("🔎 Universe Screener")
+timer = page_timer("7_Screener")
+
+
+# ============================================================
+# LOAD LATEST FEATURES  (one precomputed row per symbol, from run_daily.py)
+# ============================================================
+with timer.phase("load"):
+    features_df = load_latest_features(get_latest_features_version())
+
+if features_df.empty:
+    st.warning("⚠ No latest features found. Run `python run_daily.py` first.")
+    st.stop()
+
+features_df = add_screen_columns(features_df)
+
+
+# ============================================================
+# FILTERS
+# ============================================================
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    rsi_range = st.slider("RSI 14", 0.0, 100.0, (0.0, 100.0), step=1.0)
+
+with col2:
+    sma20_filter = st.radio(
+        "Close vs SMA 20",
+        ["any", "above", "below"],
+        horizontal=True,
+    )
+
+with col3:
+    atr_max = round(float(max(features_df["ATR_Pct"].max(), 1.0)) + 0.5, 1)
+    atr_pct_range = st.slider("ATR % of Close", 0.0, atr_max, (0.0, atr_max), step=0.1)
+
+with col4:
+    min_prob_up = st.slider("Min Probability UP", 0.0, 1.0, 0.0, step=0.01)
+
+
+# ============================================================
+# RUN SCAN
+# ============================================================
+start = time.perf_counter()
+with timer.phase("compute"):
+    result = screen_universe(
+        features_df,
+        rsi_range=rsi_range,
+        sma20_filter=sma20_filter,
+        atr_pct_range=atr_pct_range,
+        min_prob_up=min_prob_up,
+    )
+scan_ms = (time.perf_counter() - start) * 1000
+
+colA, colB, colC = st.columns(3)
+colA.metric("Universe", len(features_df))
+colB.metric("Matches", len(result))
+colC.metric("Scan latency", f"{scan_ms:.2f} ms")
+
+
+# ============================================================
+# RESULTS (sortable – click a column header)
+# ============================================================
+display_cols = [
+    "Symbol", "Date", "Close", "RSI_14", "Close_vs_SMA20", "ATR_Pct",
+    "Probability_Up", "Predicted_Direction", "Predicted_Price",
+]
+display_cols = [c for c in display_cols if c in result.columns]
+
+col_sort, col_order = st.columns([3, 1])
+with col_sort:
+    default_sort = "Probability_Up" if "Probability_Up" in display_cols else "Symbol"
+    sort_col = st.selectbox("Sort by", display_cols, index=display_cols.index(default_sort))
+with col_order:
+    ascending = st.checkbox("Ascending", value=False)
+
+st.dataframe(
+    result[display_cols].sort_values(sort_col, ascending=ascending),
+    use_container_width=True,
+    hide_index=True,
+)
+
+st.caption(
+    """
+    Filters run in one vectorized pass over `latest_features.csv`
+    (the latest feature row per symbol, written by **run_daily.py**).
+    """
+)
+
+timer.finish()
@@ -0,0 +1,152 @@
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from utils.load_data import get_price_data_version, load_price_data
+from utils.resources import get_result_cache
+from utils.sweep import run_param_sweep, sweep_heatmap_frame
+from utils.telemetry import page_timer
+
+
+# ============================================================
+# PAGE CONFIG
+# ============================================================
+st.set_page_config(page_title="Parameter Sweep", page_icon="🧮", layout="wide")
+st.title("🧮 ATR Strategy Parameter Sweep")
+timer = page_timer("8_Sweep")
+
+
+# ============================================================
+# LOAD PRICE DATA
+# ============================================================
+with timer.phase("load"):
+    df = load_price_data()
+
+if df.empty:
+    st.warning("⚠ No price data found. Run `python run_daily.py` first.")
+    st.stop()
+
+
+def cached_sweep(data_version, stop_grid, tp_grid, rsi_entry_grid, rsi_exit_grid, lookback_days):
+    # Result cache (memory + disk): a grid swept once is reused by every
+    # session and process until the price data changes
+    return get_result_cache().get_or_compute(
+        "atr_param_sweep",
+        {
+            "stop_grid": stop_grid,
+            "tp_grid": tp_grid,
+            "rsi_entry_grid": rsi_entry_grid,
+            "rsi_exit_grid": rsi_exit_grid,
+            "lookback_days": lookback_days,
+        },
+        None,
+        data_version,
+        lambda: run_param_sweep(
+            load_price_data(),
+            stop_grid,
+            tp_grid,
+            rsi_entry_grid,
+            rsi_exit_grid,
+            lookback_days=lookback_days,
+        ),
+    )
+
+
+# ============================================================
+# GRID INPUTS
+# ============================================================
+with st.form("sweep_grid"):
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        stop_range = st.slider("ATR stop multiplier", 0.5, 6.0, (1.0, 4.0), step=0.25)
+        stop_steps = st.slider("Stop grid points", 2, 30, 10)
+
+    with col2:
+        tp_range = st.slider("ATR take-profit multiplier", 0.5, 10.0, (1.5, 6.0), step=0.25)
+        tp_steps = st.slider("TP grid points", 2, 30, 10)
+
+    with col3:
+        rsi_entry_grid = st.multiselect("RSI entry (>)", [40, 45, 50, 55, 60, 65], default=[50])
+        rsi_exit_grid = st.multiselect("RSI exit (<)", [30, 35, 40, 45, 50], default=[45])
+        lookback_days = st.number_input("Lookback days (0 = all)", 0, 10000, 0, step=250)
+
+    submitted = st.form_submit_button("▶ Run sweep")
+
+stop_grid = tuple(np.round(np.linspace(*stop_range, stop_steps), 3))
+tp_grid = tuple(np.round(np.linspace(*tp_range, tp_steps), 3))
+rsi_entry_grid = tuple(sorted(rsi_entry_grid)) or (50,)
+rsi_exit_grid = tuple(sorted(rsi_exit_grid)) or (45,)
+
+if not submitted and "sweep_ran" not in st.session_state:
+    st.info("Choose a grid and press **Run sweep**.")
+    st.stop()
+
+st.session_state["sweep_ran"] = True
+
+
+# ============================================================
+# RUN SWEEP (process pool, cached per data version + grid)
+# ============================================================
+with st.spinner("Running sweep across all symbols..."), timer.phase("compute"):
+    result = cached_sweep(
+        get_price_data_version(),
+        stop_grid,
+        tp_grid,
+        rsi_entry_grid,
+        rsi_exit_grid,
+        int(lookback_days) or None,
+    )
+
+n_combos = len(stop_grid) * len(tp_grid) * len(rsi_entry_grid) * len(rsi_exit_grid)
+
+colA, colB, colC = st.columns(3)
+colA.metric("Symbols", len(result["symbols"]))
+colB.metric("Combinations per symbol", n_combos)
+colC.metric("Sweep time", f"{result['elapsed_s']:.2f} s")
+
+
+# ============================================================
+# HEATMAP
+# ============================================================
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    metric = st.selectbox("Metric", result["metrics"])
+with col2:
+    view = st.selectbox("Symbols", ["Universe median", "Universe mean"] + result["symbols"])
+with col3:
+    rsi_entry = st.selectbox("RSI entry", rsi_entry_grid)
+with col4:
+    rsi_exit = st.selectbox("RSI exit", rsi_exit_grid)
+
+with timer.phase("compute"):
+    grid_df = sweep_heatmap_frame(
+        result,
+        metric,
+        rsi_entry_idx=rsi_entry_grid.index(rsi_entry),
+        rsi_exit_idx=rsi_exit_grid.index(rsi_exit),
+        symbol=None if view.startswith("Universe") else view,
+        agg="mean" if view == "Universe mean" else "median",
+    )
+
+with timer.phase("figures"):
+    fig = px.imshow(
+        grid_df,
+        labels=dict(x="Take-profit × ATR", y="Stop × ATR", color=metric),
+        x=[f"{v:g}" for v in grid_df.columns],
+        y=[f"{v:g}" for v in grid_df.index],
+        color_continuous_scale="RdYlGn" if metric != "n_trades" else "Blues",
+        aspect="auto",
+        title=f"{view} – {metric} (RSI > {rsi_entry}, exit < {rsi_exit})",
+    )
+st.plotly_chart(fig, use_container_width=True)
+
+st.caption(
+    """
+    Each cell is a full ATR strategy backtest. Stop / take-profit crossings
+    are searched once per multiplier and all combinations are walked
+    together; symbols are spread over a process pool.
+    """
+)
+
+timer.finish()
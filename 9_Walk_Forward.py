@@ -0,0 +1,146 @@
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from utils.load_data import get_price_data_version, load_price_data
+from utils.resources import get_result_cache
+from utils.telemetry import page_timer
+from utils.walk_forward import OBJECTIVES, walk_forward
+
+
+# ============================================================
+# PAGE CONFIG
+# ============================================================
+st.set_page_config(page_title="Walk-Forward", page_icon="🚶", layout="wide")
+st.title("🚶 Walk-Forward Optimization (ATR Strategy)")
+timer = page_timer("9_Walk_Forward")
+
+
+# ============================================================
+# LOAD PRICE DATA
+# ============================================================
+with timer.phase("load"):
+    df = load_price_data()
+
+if df.empty:
+    st.warning("⚠ No price data found. Run `python run_daily.py` first.")
+    st.stop()
+
+
+def cached_walk_forward(data_version, train_bars, test_bars, stop_grid, tp_grid, objective):
+    # Result cache (memory + disk): reused across sessions until data changes
+    return get_result_cache().get_or_compute(
+        "atr_walk_forward",
+        {
+            "train_bars": train_bars,
+            "test_bars": test_bars,
+            "stop_grid": stop_grid,
+            "tp_grid": tp_grid,
+            "objective": objective,
+        },
+        None,
+        data_version,
+        lambda: walk_forward(
+            load_price_data(),
+            train_bars,
+            test_bars,
+            stop_grid=stop_grid,
+            tp_grid=tp_grid,
+            objective=objective,
+        ),
+    )
+
+
+# ============================================================
+# INPUTS
+# ============================================================
+with st.form("walk_forward"):
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        train_bars = st.number_input("In-sample bars", 120, 5000, 750, step=50)
+        test_bars = st.number_input("Out-of-sample bars", 20, 2000, 250, step=10)
+
+    with col2:
+        stop_range = st.slider("ATR stop multiplier", 0.5, 6.0, (1.0, 4.0), step=0.25)
+        tp_range = st.slider("ATR take-profit multiplier", 0.5, 10.0, (1.5, 6.0), step=0.25)
+
+    with col3:
+        grid_points = st.slider("Grid points per multiplier", 2, 20, 8)
+        objective = st.selectbox("Objective (median across symbols)", OBJECTIVES)
+
+    submitted = st.form_submit_button("▶ Run walk-forward")
+
+if not submitted and "walk_forward_ran" not in st.session_state:
+    st.info("Choose windows and a grid, then press **Run walk-forward**.")
+    st.stop()
+
+st.session_state["walk_forward_ran"] = True
+
+stop_grid = tuple(np.round(np.linspace(*stop_range, grid_points), 3))
+tp_grid = tuple(np.round(np.linspace(*tp_range, grid_points), 3))
+
+
+# ============================================================
+# RUN (one process-pool task per window)
+# ============================================================
+with st.spinner("Optimizing every window..."), timer.phase("compute"):
+    result = cached_walk_forward(
+        get_price_data_version(), int(train_bars), int(test_bars), stop_grid, tp_grid, objective
+    )
+
+windows = result["windows"]
+if windows.empty:
+    st.warning("⚠ Not enough history for a single in-sample + out-of-sample window.")
+    st.stop()
+
+equity = result["equity"]
+peak = np.maximum.accumulate(equity.to_numpy())
+
+colA, colB, colC, colD = st.columns(4)
+colA.metric("Windows", len(windows))
+colB.metric("Out-of-sample return", f"{(equity.iloc[-1] - 1)*100:.1f}%")
+colC.metric("Out-of-sample max DD", f"{((equity.to_numpy() - peak) / peak).min()*100:.1f}%")
+colD.metric("Run time", f"{result['elapsed_s']:.1f} s")
+
+
+# ============================================================
+# STITCHED OUT-OF-SAMPLE EQUITY
+# ============================================================
+with timer.phase("figures"):
+    fig = px.line(
+        equity.rename_axis("Date").reset_index(),
+        x="Date",
+        y="Equity",
+        title="Stitched Out-of-Sample Equity (equal-weight universe)",
+    )
+    for start in windows["oos_start"]:
+        fig.add_vline(x=start, line_dash="dot", line_color="gray")
+st.plotly_chart(fig, use_container_width=True)
+
+
+# ============================================================
+# PER-WINDOW PARAMETERS
+# ============================================================
+st.subheader("🧾 Chosen Parameters per Window")
+st.dataframe(windows, use_container_width=True, hide_index=True)
+
+fig = px.line(
+    windows,
+    x="oos_start",
+    y=["atr_mult_stop", "atr_mult_tp"],
+    markers=True,
+    title="Parameter Stability",
+)
+st.plotly_chart(fig, use_container_width=True)
+
+st.caption(
+    """
+    Each window picks the stop / take-profit pair with the best median
+    in-sample objective across all symbols, then trades it unchanged on
+    the following out-of-sample window. Only out-of-sample results are
+    stitched, so the curve is free of parameter-selection bias.
+    """
+)
+
+timer.finish()
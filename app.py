@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
 
 # Correct imports – NO BASE_DIR parameter needed
 from utils.load_data import load_price_data, load_prediction_data
+from utils.telemetry import page_timer
 
 
 # ============================================================
@@ -15,6 +15,7 @@ st.set_page_config(
 )
 
 st.title("🧠 AI Stock Trading Desk")
+timer = page_timer("app")
 
 st.markdown(
     """
@@ -26,6 +27,10 @@ st.markdown(
     - 🕯 **Charts** – Candlesticks + Indicators  
     - 📈 **Performance** – Accuracy & analytics  
     - 🧪 **Backtest** – ATR & strategy simulation  
+    - 🔎 **Screener** – Filter the whole universe  
+    - 🧮 **Sweep** – Stop / take-profit parameter heatmaps  
+    - 🚶 **Walk-Forward** – Out-of-sample parameter selection  
+    - 🧭 **Risk** – Rolling correlation heatmap + inverse-vol sizing  
     - 📥 **Downloads** – Export data  
     - ⚙ **Admin** – Maintenance + tools  
     """
@@ -36,8 +41,9 @@ st.markdown(
 # LOAD DATA
 # BASE_DIR is auto-detected INSIDE load_data.py
 # ============================================================
-price_df = load_price_data()
-pred_df = load_prediction_data()
+with timer.phase("load"):
+    price_df = load_price_data()
+    pred_df = load_prediction_data()
 
 
 # ============================================================
@@ -75,3 +81,5 @@ st.info(
     ✔ All files load automatically (no hard-coded paths)  
     """
 )
+
+timer.finish()
@@ -0,0 +1,75 @@
+"""
+ATR strategy backtest benchmark.
+
+Checks that the array kernel reproduces the row-by-row reference
+implementation EXACTLY (same equity curve, bit for bit) and times both
+at 5,000 and 50,000 bars.
+
+Usage:
+    python benchmarks/bench_strategy.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import synthetic_ohlc  # noqa: E402
+
+from utils.strategy import (  # noqa: E402
+    _atr_strategy_backtest_loop,
+    atr_backtest_kernel,
+    atr_signal_arrays,
+    atr_strategy_backtest,
+    compute_atr_indicators,
+    crossing_tables,
+)
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main() -> None:
+    for n_bars in (5_000, 50_000):
+        df = synthetic_ohlc(n_bars)
+
+        # --- Correctness against the reference loop ---
+        for stop, tp in [(2.0, 3.0), (1.0, 1.5), (4.0, 8.0)]:
+            ref = _atr_strategy_backtest_loop(df, stop, tp)
+            new = atr_strategy_backtest(df, stop, tp)
+            same = np.array_equal(ref["df"]["Equity"].to_numpy(), new["df"]["Equity"].to_numpy())
+            assert same, f"equity mismatch at {n_bars} bars (stop={stop}, tp={tp})"
+
+        # --- Timing ---
+        ind = compute_atr_indicators(df)
+        close = ind["Close"].to_numpy(dtype=float)
+        atr = ind["ATR_14"].to_numpy(dtype=float)
+        signals = atr_signal_arrays(
+            close, ind["SMA_20"].to_numpy(dtype=float), ind["RSI_14"].to_numpy(dtype=float)
+        )
+        span = int((signals["limit"] - signals["start"]).max(initial=0))
+
+        t_ref = best_of(lambda: _atr_strategy_backtest_loop(df), 1)
+        t_full = best_of(lambda: atr_strategy_backtest(df), 3)
+        t_kernel = best_of(lambda: atr_backtest_kernel(close, atr, signals), 20)
+        tables = crossing_tables(close, span)
+        t_warm = best_of(lambda: atr_backtest_kernel(close, atr, signals, tables), 20)
+
+        print(f"📊 {n_bars:,} bars  ✅ equity identical to reference")
+        print(f"   reference loop (iterrows)     : {t_ref*1000:9.2f} ms")
+        print(f"   atr_strategy_backtest (total) : {t_full*1000:9.2f} ms  (incl. indicators)")
+        print(f"   atr_backtest_kernel           : {t_kernel*1000:9.3f} ms")
+        print(f"   kernel, tables reused (sweeps): {t_warm*1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+End-to-end benchmark suite for the batch pipeline hot paths.
+
+For every synthetic universe size (see benchmarks/synthetic.py) it times:
+    • csv_parse                  → stock_data.csv parse (load_price_data)
+    • create_features            → train_model.create_features
+    • create_features_prediction → run_daily.create_features_for_prediction
+    • forest_fit_price / _dir    → train_model forests (FOREST_PARAMS)
+    • forest_predict             → both forests on the latest feature rows
+    • atr_backtest               → atr_strategy_backtest for every symbol
+    • history_append             → run_daily.append_history (1 day onto
+                                   `--history-days` days of history)
+
+Results are written as JSON (with git commit + library versions) so runs
+can be compared across commits with --compare.
+
+Usage:
+    python benchmarks/run_benchmarks.py                       # 20, 200, 2000 symbols
+    python benchmarks/run_benchmarks.py --symbols 20 200 --years 10
+    python benchmarks/run_benchmarks.py --json after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.synthetic import UNIVERSE_SIZES, synthetic_universe  # noqa: E402
+
+
+# ============================================================
+#   HELPERS
+# ============================================================
+def timed(fn, repeat: int = 1):
+    """Best wall time over `repeat` runs, and the last return value."""
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def run_meta() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import sklearn
+
+    return {
+        "commit": commit,
+        "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+# ============================================================
+#   ONE UNIVERSE
+# ============================================================
+def bench_universe(n_symbols: int, args, workdir: Path) -> dict:
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    from run_daily import append_history, create_features_for_prediction
+    from train_model import FOREST_PARAMS, create_features
+    from utils.resources import read_price_csv
+    from utils.strategy import atr_strategy_backtest
+
+    raw = synthetic_universe(n_symbols, args.years, args.seed)
+    csv_path = workdir / f"stock_data_{n_symbols}.csv"
+    raw.to_csv(csv_path, index=False)
+
+    stages = {}
+
+    def record(name, seconds, rows):
+        stages[name] = {"seconds": round(seconds, 6), "rows": int(rows)}
+        print(f"   {name:<28}{seconds * 1000:>12.1f} ms   ({rows:,} rows)")
+
+    print(f"📊 {n_symbols} symbols × {args.years:g} years = {len(raw):,} rows")
+
+    # --- Dashboard / pipeline parse ---
+    t, prices = timed(lambda: read_price_csv(csv_path), args.repeat)
+    record("csv_parse", t, len(prices))
+
+    # --- Feature engineering ---
+    t, (feat, feature_cols) = timed(lambda: create_features(raw), args.repeat)
+    record("create_features", t, len(feat))
+
+    t, (latest, _) = timed(lambda: create_features_for_prediction(raw), args.repeat)
+    record("create_features_prediction", t, len(latest))
+
+    # --- Forests (capped training rows keep 2000 symbols tractable) ---
+    params = {**FOREST_PARAMS, **({"n_estimators": args.trees} if args.trees else {})}
+    train = feat.tail(args.fit_rows) if args.fit_rows else feat
+    X, y_price, y_dir = train[feature_cols], train["Next_Close"], train["Direction"]
+
+    price_model = RandomForestRegressor(**params)
+    t, _ = timed(lambda: price_model.fit(X, y_price))
+    record("forest_fit_price", t, len(X))
+
+    dir_model = RandomForestClassifier(**params)
+    t, _ = timed(lambda: dir_model.fit(X, y_dir))
+    record("forest_fit_dir", t, len(X))
+
+    X_latest = latest[feature_cols]
+    t, _ = timed(
+        lambda: (price_model.predict(X_latest), dir_model.predict_proba(X_latest)), args.repeat
+    )
+    record("forest_predict", t, len(X_latest))
+
+    # --- ATR strategy over the whole universe ---
+    groups = [g for _, g in prices.groupby("Symbol")]
+    t, _ = timed(lambda: [atr_strategy_backtest(g) for g in groups], args.repeat)
+    record("atr_backtest", t, len(prices))
+
+    # --- History append (one new day onto an existing history) ---
+    symbols = latest["Symbol"].to_numpy()
+    days = pd.bdate_range(end="2024-12-31", periods=args.history_days + 1).strftime("%Y-%m-%d")
+    rng = np.random.default_rng(args.seed)
+
+    def predictions(day_list):
+        n = len(day_list) * len(symbols)
+        return pd.DataFrame({
+            "Date": np.repeat(day_list, len(symbols)),
+            "Symbol": np.tile(symbols, len(day_list)),
+            "Predicted_Price": rng.uniform(50, 5000, n).round(2),
+            "Predicted_Direction": np.where(rng.random(n) > 0.5, "UP", "DOWN"),
+            "Probability_Up": rng.random(n).round(4),
+        })
+
+    history_file = workdir / f"predictions_history_{n_symbols}.csv"
+    old = predictions(days[:-1])
+    old["Run_Timestamp"] = pd.Timestamp("2024-01-01")
+    today = predictions(days[-1:])
+
+    def append_once():
+        old.to_csv(history_file, index=False)      # reset outside the timer
+        t0 = time.perf_counter()
+        append_history(today, history_file)
+        return time.perf_counter() - t0
+
+    t = min(append_once() for _ in range(args.repeat))
+    record("history_append", t, len(old) + len(today))
+
+    return {"symbols": n_symbols, "years": args.years, "rows": len(raw), "stages": stages}
+
+
+# ============================================================
+#   COMPARISON
+# ============================================================
+def compare(results: list, baseline_path: str) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    base = {(r["symbols"], r["years"]): r["stages"] for r in baseline["results"]}
+    print(f"\n🔁 Compared with {baseline_path} (commit {baseline['meta'].get('commit')})")
+
+    for res in results:
+        old = base.get((res["symbols"], res["years"]))
+        if old is None:
+            continue
+        print(f"   {res['symbols']} symbols")
+        for name, stage in res["stages"].items():
+            if name not in old or not old[name]["seconds"]:
+                continue
+            ratio = stage["seconds"] / old[name]["seconds"]
+            flag = "⚠" if ratio > 1.2 else ("🚀" if ratio < 0.8 else " ")
+            print(f"   {flag} {name:<28}{ratio:>8.2f}×")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pipeline benchmark suite")
+    parser.add_argument("--symbols", type=int, nargs="*", default=UNIVERSE_SIZES)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1, help="best-of runs for the cheaper stages")
+    parser.add_argument("--fit-rows", type=int, default=100_000, help="0 = fit on every row")
+    parser.add_argument("--trees", type=int, default=0, help="override n_estimators (0 = as trained)")
+    parser.add_argument("--history-days", type=int, default=250)
+    parser.add_argument("--json", default=None, help="output file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    args = parser.parse_args()
+
+    meta = run_meta()
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_symbols in args.symbols:
+            results.append(bench_universe(n_symbols, args, Path(tmp)))
+
+    out = Path(args.json) if args.json else BASE_DIR / "benchmarks" / "results" / f"{meta['commit'] or 'local'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "args": vars(args), "results": results}, f, indent=2)
+    print(f"💾 Saved results → {out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Dashboard startup benchmark.
+
+For every page, in a FRESH interpreter (nothing imported yet):
+    • cold import   → time to import the page's top-level imports
+    • first paint   → time for the first full script run (cold caches)
+    • warm rerun    → time for a second run (shared resources cached)
+
+Usage:
+    python benchmarks/startup.py                 # all pages
+    python benchmarks/startup.py 2_Charts.py     # selected pages
+    python benchmarks/startup.py --json out.json
+"""
+
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+# app.py + every numbered page (new pages are picked up automatically)
+PAGES = ["app.py"] + sorted(
+    (p.name for p in BASE_DIR.glob("[0-9]*_*.py")), key=lambda name: int(name.split("_", 1)[0])
+)
+
+
+# Runs inside the child interpreter
+CHILD_SCRIPT = r"""
+import json, sys, time
+sys.path.insert(0, {base_dir!r})
+
+t0 = time.perf_counter()
+exec(compile({imports!r}, "<page-imports>", "exec"), {{}})
+cold_import = time.perf_counter() - t0
+
+from streamlit.testing.v1 import AppTest
+
+t0 = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout=300).run()
+first_paint = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+at.run()
+warm_rerun = time.perf_counter() - t0
+
+print(json.dumps({{
+    "cold_import_s": cold_import,
+    "first_paint_s": first_paint,
+    "warm_rerun_s": warm_rerun,
+    "exceptions": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def page_imports(path: Path) -> str:
+    """Source of the page's top-level import statements only."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(n) for n in nodes)
+
+
+def bench_page(page: str) -> dict:
+    path = BASE_DIR / page
+
+    try:
+        imports = page_imports(path)
+    except SyntaxError as e:
+        return {"page": page, "error": f"SyntaxError: {e}"}
+
+    script = CHILD_SCRIPT.format(
+        base_dir=str(BASE_DIR), imports=imports, page=str(path)
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+
+    if proc.returncode != 0:
+        return {"page": page, "error": proc.stderr.strip().splitlines()[-1:]}
+
+    return {"page": page, **json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dashboard startup benchmark")
+    parser.add_argument("pages", nargs="*", default=PAGES)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'page':<20}{'cold import':>14}{'first paint':>14}{'warm rerun':>14}")
+
+    for page in args.pages:
+        res = bench_page(page)
+        results.append(res)
+
+        if "error" in res:
+            print(f"{page:<20}  ❌ {res['error']}")
+            continue
+
+        print(
+            f"{page:<20}{res['cold_import_s']*1000:>11.0f} ms"
+            f"{res['first_paint_s']*1000:>11.0f} ms"
+            f"{res['warm_rerun_s']*1000:>11.0f} ms"
+            + (f"  ⚠ {res['exceptions']}" if res["exceptions"] else "")
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Saved results → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Seeded synthetic OHLCV generator.
+
+Produces universes in the EXACT data/stock_data.csv schema:
+    Date (DD-MM-YYYY), Symbol, Open, High, Low, Close, Volume
+one row per business day per symbol, sorted by Symbol then Date.
+
+Usage:
+    python benchmarks/synthetic.py 200 --years 10 --out /tmp/stock_data.csv
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+COLUMNS = ["Date", "Symbol", "Open", "High", "Low", "Close", "Volume"]
+END_DATE = "2024-12-31"
+UNIVERSE_SIZES = [20, 200, 2000]
+
+
+def synthetic_ohlc(n_bars: int, seed: int = 7) -> pd.DataFrame:
+    """One symbol, parsed dtypes (datetime Date) – for strategy benchmarks."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n_bars)))
+    spread = np.abs(rng.normal(0, 0.01, n_bars)) * close
+    return pd.DataFrame({
+        "Date": pd.bdate_range("1990-01-01", periods=n_bars),
+        "Open": close,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1e5, 1e6, n_bars),
+    })
+
+
+def synthetic_universe(n_symbols: int, years: float = 5, seed: int = 42) -> pd.DataFrame:
+    """
+    `n_symbols` × `years` of daily bars as stock_data.csv would hold them.
+
+    Each symbol is a geometric random walk with its own drift, volatility
+    and price level; Open/High/Low are drawn around Close so that
+    Low <= min(Open, Close) <= max(Open, Close) <= High always holds.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=END_DATE, periods=int(years * 252))
+    n_bars = len(dates)
+
+    drift = rng.normal(0.0003, 0.0003, n_symbols)
+    vol = rng.uniform(0.01, 0.03, n_symbols)
+    level = np.exp(rng.uniform(np.log(50), np.log(5000), n_symbols))
+
+    # (bars, symbols) arrays – generated in one shot
+    log_ret = rng.normal(drift, vol, (n_bars, n_symbols))
+    close = level * np.exp(np.cumsum(log_ret, axis=0))
+    open_ = close * np.exp(rng.normal(0, vol / 2, (n_bars, n_symbols)))
+    wick = np.abs(rng.normal(0, vol / 2, (2, n_bars, n_symbols)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(13, 0.6, (n_bars, n_symbols)).astype(np.int64)
+
+    symbols = np.array([f"SYM{i:04d}" for i in range(n_symbols)])
+
+    # Symbol-major order (transpose → ravel)
+    return pd.DataFrame({
+        "Date": np.tile(dates.strftime("%d-%m-%Y"), n_symbols),
+        "Symbol": np.repeat(symbols, n_bars),
+        "Open": open_.T.ravel(),
+        "High": high.T.ravel(),
+        "Low": low.T.ravel(),
+        "Close": close.T.ravel(),
+        "Volume": volume.T.ravel(),
+    })[COLUMNS]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic stock_data.csv generator")
+    parser.add_argument("symbols", type=int, help="number of symbols")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="stock_data.csv")
+    args = parser.parse_args()
+
+    df = synthetic_universe(args.symbols, args.years, args.seed)
+    df.to_csv(args.out, index=False)
+    print(f"💾 {len(df):,} rows ({args.symbols} symbols × {args.years:g} years) → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
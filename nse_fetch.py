@@ -1,49 +1,61 @@
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 import yfinance as yf
 
+from utils.price_store import PriceStore
+from utils.run_log import get_run_log, init_run_log
+from utils.scheduling import PipelineLock
+from utils.sharding import run_sharded, shard_symbols, worker_count
+from utils.universe import load_universe
+
 # ============================================================
 #  CONFIG
 # ============================================================
-SYMBOLS = [
-    "TCS", "HDFCBANK", "INFY", "RELIANCE", "ICICIBANK", "SBIN",
-    "AXISBANK", "KOTAKBANK", "LT", "ITC", "HINDUNILVR", "BAJFINANCE",
-    "ASIANPAINT", "MARUTI", "SUNPHARMA", "TECHM", "ULTRACEMCO",
-    "BHARTIARTL", "POWERGRID", "NESTLEIND"
-]
+# Universe from data/universe.csv (e.g. NIFTY 500), else the built-in 20
+SYMBOLS = load_universe()
 
 # Full historical data (Yahoo's maximum)
 HISTORY_MODE = "max"
 
+# Downloads are network-bound: several small shards per worker
+SHARDS_PER_WORKER = 4
+
 # ============================================================
 #  AUTO-DETECT PROJECT ROOT (WORKS ON STREAMLIT CLOUD)
 # ============================================================
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
+# Legacy single-file output – imported into data/store on the first run
 OUTPUT_FILE = DATA_DIR / "stock_data.csv"
 
 
 # ============================================================
 #  FETCH SINGLE SYMBOL
 # ============================================================
-def fetch_symbol(symbol: str) -> pd.DataFrame | None:
-    """Fetch OHLCV data for one NSE symbol using yfinance."""
+def fetch_symbol(symbol: str, period: str = HISTORY_MODE, start=None) -> pd.DataFrame | None:
+    """
+    Fetch OHLCV data for one NSE symbol using yfinance.
+    `start` (date) switches from the `period` window to "bars since start".
+    """
 
     yf_symbol = symbol + ".NS"
+    window = {"start": pd.Timestamp(start).strftime("%Y-%m-%d")} if start is not None else {"period": period}
 
     df = yf.download(
         yf_symbol,
-        period=HISTORY_MODE,
         interval="1d",
         progress=False,
         auto_adjust=False,
+        **window,
     )
 
     if df.empty:
-        print(f"⚠ No data for {symbol}")
+        if start is None:
+            print(f"⚠ No data for {symbol}")
         return None
 
     df = df.reset_index()
@@ -65,47 +77,129 @@ def fetch_symbol(symbol: str) -> pd.DataFrame | None:
 
 
 # ============================================================
-#  MAIN CONTROLLER
+#  NEW-BAR PROBE (cheap poll used by scheduler.py)
 # ============================================================
-def main() -> None:
+def latest_bar_date(symbol: str = SYMBOLS[0]):
+    """Date of the newest daily bar Yahoo has for `symbol` (5-day request)."""
 
-    DATA_DIR.mkdir(exist_ok=True)
+    df = fetch_symbol(symbol, period="5d")
+    if df is None or df.empty:
+        return None
+    return pd.to_datetime(df["Date"]).max().date()
 
-    print(f"⏳ Fetching NSE data ({HISTORY_MODE}) for: {', '.join(SYMBOLS)}")
 
-    frames: list[pd.DataFrame] = []
+# ============================================================
+#  FETCH ONE SHARD (runs in a worker process)
+# ============================================================
+def fetch_shard(items: list[tuple]) -> tuple[list[pd.DataFrame], list[str]]:
+    """
+    Download a shard of (symbol, start) items – start=None means full
+    history. A failing symbol never fails the shard. An incremental
+    request that returns nothing just means "no new bars yet".
+    """
+
+    log = get_run_log()
+    frames, failed = [], []
+
+    for sym, start in items:
+        with log.stage("fetch_symbol", symbol=sym, incremental=start is not None) as stage:
+            try:
+                df_sym = fetch_symbol(sym, start=start)
+                ok = df_sym is not None or start is not None
+            except Exception as e:
+                print(f"⚠ {sym}: {type(e).__name__}: {e}")
+                df_sym, ok = None, False
+            stage.rows = 0 if df_sym is None else len(df_sym)
 
-    for sym in SYMBOLS:
-        print(f"→ Fetching {sym}...")
-        df_sym = fetch_symbol(sym)
         if df_sym is not None and not df_sym.empty:
             frames.append(df_sym)
+        if not ok:
+            failed.append(sym)
+
+    return frames, failed
 
-    if not frames:
-        print("❌ No data fetched for any symbol.")
-        return
 
-    # Combine all symbols
-    full_df = pd.concat(frames, ignore_index=True)
+# ============================================================
+#  MAIN CONTROLLER
+# ============================================================
+def main(full: bool = False) -> None:
+
+    DATA_DIR.mkdir(exist_ok=True)
 
-    # Sort by symbol + date
-    full_df = full_df.sort_values(["Symbol", "Date"])
+    log = get_run_log()
+    store = PriceStore()
+
+    # One-time migration of an existing stock_data.csv into the store
+    if not store.exists() and OUTPUT_FILE.exists() and not full:
+        with log.stage("import_stock_data") as stage:
+            manifest = store.import_csv(OUTPUT_FILE)
+            stage.rows = sum(e["rows"] for e in manifest["base"].values())
+        print(f"📥 Imported {OUTPUT_FILE.name} into the price store ({len(manifest['base'])} symbols)")
+
+    # Incremental: each known symbol asks for bars FROM its last stored date,
+    # so that bar is re-fetched and replaced (e.g. a partial bar stored by a
+    # run during market hours). Older bars are never revised – after a split
+    # or bonus issue, re-download that history with --full.
+    last = {} if full else store.last_dates()
+    items = [(sym, last.get(sym)) for sym in SYMBOLS]
+
+    n_new = sum(start is None for _, start in items)
+    print(
+        f"⏳ Fetching NSE data for {len(items)} symbols "
+        f"({len(items) - n_new} incremental, {n_new} full history)"
+    )
+    processes = worker_count()
+
+    with log.stage("fetch_shards", symbols=len(items)) as stage:
+        results, failed_shards = run_sharded(
+            fetch_shard,
+            shard_symbols(items, processes * SHARDS_PER_WORKER),
+            processes,
+            label="fetch",
+        )
+        frames = [f for shard_frames, _ in filter(None, results) for f in shard_frames]
+        stage.rows = sum(len(f) for f in frames)
+
+    failed = [sym for r in filter(None, results) for sym in r[1]]
+    if failed:
+        print(f"⚠ No data for {len(failed)} symbols: {', '.join(failed[:20])}{' …' if len(failed) > 20 else ''}")
+        log.event("fetch_failed", symbols=failed, shards=failed_shards)
 
-    # Convert date format (DD-MM-YYYY)
-    full_df["Date"] = pd.to_datetime(full_df["Date"]).dt.strftime("%d-%m-%Y")
+    if not frames:
+        print("ℹ No new bars fetched.")
+        return
 
-    # Columns in correct order
-    full_df = full_df[["Date", "Symbol", "Open", "High", "Low", "Close", "Volume"]]
+    new_df = pd.concat(frames, ignore_index=True)
+    new_df["Date"] = pd.to_datetime(new_df["Date"]).dt.tz_localize(None).dt.normalize()
 
-    # Save to CSV
-    full_df.to_csv(OUTPUT_FILE, index=False)
+    # Full rebuild → new base partitions; otherwise one small immutable delta.
+    # Symbols that failed keep their stored history either way.
+    with log.stage("write_store") as stage:
+        if full or not store.exists():
+            if full and store.exists():
+                kept = store.snapshot().read()
+                new_df = pd.concat([kept[~kept["Symbol"].isin(new_df["Symbol"].unique())], new_df])
+            store.write_base(new_df)
+            stage.rows = len(new_df)
+            print(f"✅ Price store rebuilt: {new_df['Symbol'].nunique()} symbols, {len(new_df):,} rows")
+        else:
+            stage.rows = store.append_delta(new_df)
+            print(f"✅ Appended {stage.rows:,} new or refreshed bars as a delta ({len(store.manifest()['deltas'])} pending compaction)")
 
-    print(f"✅ Saved ML-ready stock data to: {OUTPUT_FILE}")
-    print(full_df.tail())
+    print(f"📦 Price store: {store.root}")
 
 
 # ============================================================
 #  ENTRY POINT
 # ============================================================
 if __name__ == "__main__":
-    main()
+    init_run_log("nse_fetch", enabled=True if "--log" in sys.argv else None)
+
+    # Store writers are serialized with run_daily / scheduler / compaction
+    with PipelineLock("nse_fetch") as acquired:
+        if not acquired:
+            print("⏳ Another pipeline run holds the lock – skipping.")
+            sys.exit(1)
+        main(full="--full" in sys.argv)
+
+    get_run_log().summary()
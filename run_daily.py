@@ -1,4 +1,6 @@
 import os
+import sys
+import json
 import numpy as np
 import pandas as pd
 import joblib
@@ -6,7 +8,16 @@ import ta
 from datetime import datetime
 from pathlib import Path
 
-import nse_fetch   # Fetches & rebuilds stock_data.csv automatically
+from utils.cross_section import XS_FEATURES, add_cross_sectional, cross_sectional_panel
+from utils.drift import FeatureSketch, drift_alerts, reference_path, update_live
+from utils.evaluation import update_evaluation_store
+from utils.online_model import learn_from_previous_run, load_online_model, save_online_model
+from utils.price_store import read_prices
+from utils.exports import build_exports
+from utils.risk import update_risk_state
+from utils.run_log import get_run_log, init_run_log, timed
+from utils.scheduling import PipelineLock
+from utils.sharding import run_sharded, shard_frame, worker_count
 
 
 # ============================================================
@@ -17,6 +28,7 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_FILE = BASE_DIR / "data" / "stock_data.csv"
 PRED_FILE = BASE_DIR / "data" / "latest_predictions.csv"
 HISTORY_FILE = BASE_DIR / "data" / "predictions_history.csv"
+FEATURES_FILE = BASE_DIR / "data" / "latest_features.csv"
 PRICE_MODEL_FILE = BASE_DIR / "model" / "price_model.pkl"
 DIR_MODEL_FILE = BASE_DIR / "model" / "dir_model.pkl"
 
@@ -24,7 +36,12 @@ DIR_MODEL_FILE = BASE_DIR / "model" / "dir_model.pkl"
 # ============================================================
 #  FEATURE ENGINEERING FOR PREDICTION
 # ============================================================
-def create_features_for_prediction(df: pd.DataFrame):
+@timed("create_features_for_prediction")
+def create_features_for_prediction(df: pd.DataFrame, xs=None):
+    """
+    Latest feature row per symbol. `xs` is the universe's cross-sectional
+    panel – required for a shard; computed from `df` when omitted.
+    """
 
     df = df.copy()
     df["Date"] = pd.to_datetime(df["Date"], format="%d-%m-%Y")
@@ -85,46 +102,211 @@ def create_features_for_prediction(df: pd.DataFrame):
         return pd.DataFrame(), []
 
     df_last = pd.concat(frames).reset_index(drop=True)
+
+    # Market context on each symbol's latest date (same as training)
+    if xs is None:
+        xs = cross_sectional_panel(df)
+    df_last = add_cross_sectional(df_last, xs)
+    feature_cols = feature_cols + XS_FEATURES
+
+    df_last = df_last.dropna(subset=feature_cols).reset_index(drop=True)
     return df_last, feature_cols
 
 
+# ============================================================
+#  SCORING WORKER (one symbol shard per task)
+# ============================================================
+_MODELS = {}
+
+
+def load_scoring_models(price_path: str, dir_path: str, single_thread: bool = False) -> None:
+    """Pool initializer: load both models once per worker process."""
+
+    _MODELS["price"] = joblib.load(price_path)
+    _MODELS["dir"] = joblib.load(dir_path)
+    _MODELS["feature_cols"] = model_feature_cols(Path(dir_path).parent)
+
+    # Workers already run in parallel – keep each forest on one core
+    if single_thread:
+        for model in _MODELS.values():
+            if hasattr(model, "n_jobs"):
+                model.n_jobs = 1
+
+
+def model_feature_cols(model_dir: Path) -> list | None:
+    """
+    Feature columns the saved models were trained on (model_info.json).
+    None for models older than the file – they used the 15 original
+    time-series features, which are always the leading columns.
+    """
+    try:
+        with open(model_dir / "model_info.json", "r", encoding="utf-8") as f:
+            return json.load(f).get("feature_cols")
+    except (OSError, ValueError):
+        return None
+
+
+def score_shard(item):
+    """
+    Latest feature row per symbol + both model outputs for one shard.
+    `item` = (symbol shard, its columns of the cross-sectional panel).
+    """
+    df_shard, xs = item
+
+    df_feat, feature_cols = create_features_for_prediction(df_shard, xs)
+    if df_feat.empty:
+        return df_feat, feature_cols
+
+    # Clean infinite & NaN
+    df_feat = df_feat.replace([np.inf, -np.inf], np.nan).dropna().reset_index(drop=True)
+
+    model_cols = _MODELS.get("feature_cols") or feature_cols[:-len(XS_FEATURES)]
+    X = df_feat[model_cols]
+    df_feat["Pred_Price"] = _MODELS["price"].predict(X)
+    df_feat["Pred_Prob_Up"] = _MODELS["dir"].predict_proba(X)[:, 1]
+
+    return df_feat, feature_cols
+
+
+# ============================================================
+#  FEATURE DRIFT MONITOR
+# ============================================================
+def check_drift(df_feat: pd.DataFrame, log) -> list:
+    """Update the live drift sketch with today's rows; alerts go to the run log."""
+
+    reference = FeatureSketch.load(reference_path(PRICE_MODEL_FILE.parent))
+    if reference is None:
+        print("⚠ No drift reference yet – retrain with: python train_model.py")
+        return []
+
+    missing = [c for c in reference.features if c not in df_feat.columns]
+    if missing:
+        print(f"⚠ Drift monitor skipped: features {missing} not computed")
+        return []
+
+    live = update_live(df_feat, reference)
+    alerts = drift_alerts(reference, live)
+
+    for alert in alerts:
+        log.event("drift_alert", **alert)
+
+    n_features = sum(a["scope"] == "feature" for a in alerts)
+    if alerts:
+        print(f"🚨 Feature drift: {n_features} feature(s), {len(alerts) - n_features} symbol/feature pair(s) with PSI ≥ alert level")
+    else:
+        print("📏 Feature drift: all features within the training distribution")
+    return alerts
+
+
+# ============================================================
+#  ONLINE DIRECTION MODEL (optional – train_model.py --online)
+# ============================================================
+def update_online_model(prices: pd.DataFrame, df_feat: pd.DataFrame, log):
+    """
+    Learn from the previous run's feature rows (still in FEATURES_FILE –
+    call before it is overwritten), then score today's rows. Returns
+    today's online P(up) aligned with `df_feat`, or None without a model.
+    """
+    model, info = load_online_model(PRICE_MODEL_FILE.parent)
+    if model is None:
+        return None
+
+    learned = 0
+    if FEATURES_FILE.exists():
+        learned = learn_from_previous_run(model, info, pd.read_csv(FEATURES_FILE), prices)
+
+    missing = [c for c in model.feature_cols if c not in df_feat.columns]
+    if missing:
+        print(f"⚠ Online model skipped: features {missing} not computed")
+        return None
+
+    prob = model.predict_proba_up(df_feat)
+    save_online_model(model, info, PRICE_MODEL_FILE.parent)
+
+    log.event("online_model", learned=learned, n_seen=model.n_seen)
+    if info["n"]:
+        print(
+            f"🔁 Online model learned {learned} rows · accuracy {info['online_correct'] / info['n']:.3f} "
+            f"vs. forest {info['forest_correct'] / info['n']:.3f} over {info['n']}"
+        )
+    return prob
+
+
+# ============================================================
+#  PREDICTION HISTORY
+# ============================================================
+def append_history(pred_df: pd.DataFrame, history_file: Path) -> pd.DataFrame:
+    """Append today's predictions to the history file; returns the full history."""
+
+    pred_df_hist = pred_df.copy()
+    pred_df_hist["Run_Timestamp"] = datetime.now()
+
+    if history_file.exists():
+        old = pd.read_csv(history_file)
+        combined = pd.concat([old, pred_df_hist], ignore_index=True)
+        combined = combined.drop_duplicates(["Date", "Symbol"], keep="last")
+        combined.to_csv(history_file, index=False)
+        return combined
+
+    pred_df_hist.to_csv(history_file, index=False)
+    return pred_df_hist
+
+
 # ============================================================
 #  MAIN PIPELINE
 # ============================================================
 def main():
 
+    # Imported here so the feature/history helpers can be used (and
+    # benchmarked) without the network stack
+    import nse_fetch   # Fetches new bars into the price store
+
+    log = get_run_log()
+
     print("📥 Fetching latest NSE data...")
-    nse_fetch.main()   # Auto rebuild stock_data.csv
+    with log.stage("fetch"):
+        nse_fetch.main()   # Incremental: one delta file per run
 
     # Ensure models exist
     if not PRICE_MODEL_FILE.exists() or not DIR_MODEL_FILE.exists():
         print("❌ Model files missing. Run: python train_model.py")
         return
 
-    # Load models
-    print("📄 Loading models...")
-    price_model = joblib.load(PRICE_MODEL_FILE)
-    dir_model = joblib.load(DIR_MODEL_FILE)
-
-    # Load stock data
-    df = pd.read_csv(DATA_FILE)
+    # Load stock data (price store snapshot, else stock_data.csv)
+    with log.stage("load_prices") as stage:
+        df = read_prices(DATA_FILE)
+        stage.rows = len(df)
     print(f"📄 Loaded {len(df)} rows for prediction")
 
-    # Create features
-    df_feat, feature_cols = create_features_for_prediction(df)
-    if df_feat.empty:
+    # Cross-sectional features need every symbol – computed once, each
+    # shard gets its own columns of the panel
+    with log.stage("cross_section"):
+        xs = cross_sectional_panel(df)
+
+    # Features + scoring per symbol shard (models loaded once per worker)
+    processes = worker_count()
+    with log.stage("score_shards") as stage:
+        shard_results, failed = run_sharded(
+            score_shard,
+            [(s, xs.select(s["Symbol"].unique())) for s in shard_frame(df, processes * 2)],
+            processes,
+            label="score",
+            initializer=load_scoring_models,
+            initargs=(str(PRICE_MODEL_FILE), str(DIR_MODEL_FILE), processes > 1),
+        )
+        scored = [r for r in shard_results if r is not None and not r[0].empty]
+        stage.rows = sum(len(r[0]) for r in scored)
+
+    if failed:
+        log.event("score_failed", shards=failed)
+    if not scored:
         print("❌ Not enough data for indicators.")
         return
 
-    # Clean infinite & NaN
-    df_feat = df_feat.replace([np.inf, -np.inf], np.nan).dropna()
-
-    # Prepare ML inputs
-    X = df_feat[feature_cols]
-
-    # Predict
-    price_preds = price_model.predict(X)
-    dir_probs = dir_model.predict_proba(X)[:, 1]
+    df_feat = pd.concat([r[0] for r in scored], ignore_index=True)
+    feature_cols = scored[0][1]
+    price_preds = df_feat.pop("Pred_Price").to_numpy()
+    dir_probs = df_feat.pop("Pred_Prob_Up").to_numpy()
 
     # Build output
     results = []
@@ -147,28 +329,101 @@ def main():
 
     pred_df = pd.DataFrame(results)
 
+    # Online model: learn from the previous run, then add its own P(up)
+    with log.stage("online_model") as stage:
+        online_prob = update_online_model(df, df_feat, log)
+        stage.rows = len(df_feat)
+    if online_prob is not None:
+        pred_df["Online_Prob_Up"] = np.round(online_prob, 4)
+
     # Save latest predictions
     pred_df.to_csv(PRED_FILE, index=False)
     print(f"✅ Saved today's predictions to: {PRED_FILE}")
     print(pred_df)
 
     # ============================================================
-    # Append to HISTORY FILE
+    # Save latest feature row per symbol (input for the Screener page)
     # ============================================================
-    pred_df_hist = pred_df.copy()
-    pred_df_hist["Run_Timestamp"] = datetime.now()
+    feat_df = df_feat[["Date", "Symbol"] + feature_cols].copy()
+    feat_df["Date"] = feat_df["Date"].dt.strftime("%Y-%m-%d")
+    feat_df = feat_df.merge(
+        pred_df[["Symbol", "Predicted_Price", "Predicted_Direction", "Probability_Up"]],
+        on="Symbol",
+        how="left",
+    )
+    feat_df.to_csv(FEATURES_FILE, index=False)
+    print(f"🧮 Saved latest features to: {FEATURES_FILE}")
 
-    if HISTORY_FILE.exists():
-        old = pd.read_csv(HISTORY_FILE)
-        combined = pd.concat([old, pred_df_hist], ignore_index=True)
-        combined = combined.drop_duplicates(["Date", "Symbol"], keep="last")
-        combined.to_csv(HISTORY_FILE, index=False)
-    else:
-        pred_df_hist.to_csv(HISTORY_FILE, index=False)
+    # ============================================================
+    # Feature drift: today's rows vs. the training-window histograms
+    # ============================================================
+    with log.stage("drift_monitor") as stage:
+        check_drift(df_feat, log)
+        stage.rows = len(df_feat)
+
+    # ============================================================
+    # Append to HISTORY FILE
+    # ============================================================
+    with log.stage("history_append") as stage:
+        hist_df = append_history(pred_df, HISTORY_FILE)
+        stage.rows = len(hist_df)
 
     print(f"🕒 Prediction history updated: {HISTORY_FILE}")
 
+    # ============================================================
+    # Resolve past predictions against realized closes
+    # ============================================================
+    with log.stage("evaluation_store") as stage:
+        outcomes, summary = update_evaluation_store(BASE_DIR / "data", hist_df, df)
+        stage.rows = len(outcomes)
+    if summary["n"]:
+        print(
+            f"🎯 Resolved {len(outcomes)} new predictions · "
+            f"running accuracy {summary['correct'] / summary['n']:.3f} over {summary['n']}"
+        )
+
+    # ============================================================
+    # Advance the rolling covariance by the new session(s) – O(N²) per day
+    # ============================================================
+    with log.stage("risk_model") as stage:
+        risk = update_risk_state(df)
+        stage.rows = risk.filled
+    print(f"📐 Rolling covariance: {len(risk.symbols)} symbols, {risk.filled} sessions to {risk.last_date:%Y-%m-%d}")
+
+    # ============================================================
+    # Build compressed exports for the Downloads page
+    # ============================================================
+    with log.stage("build_exports"):
+        manifest = build_exports(BASE_DIR)
+    print(f"📦 Exports ready: {', '.join(sorted(manifest))}")
+
+
+# ============================================================
+#  LOCKED RUN (manual runs and scheduler.py never overlap)
+# ============================================================
+def run_with_lock(owner: str = "run_daily") -> bool:
+    """Run main() while holding the pipeline lock; False if another run is active."""
+
+    lock = PipelineLock(owner)
+    if not lock.acquire():
+        holder = lock.holder()
+        print(
+            f"⏳ Another pipeline run is active ({holder.get('owner', '?')}, "
+            f"pid {holder.get('pid', '?')}, since {holder.get('started_at', '?')}) – skipping."
+        )
+        get_run_log().event("lock_busy", holder=holder)
+        return False
+
+    try:
+        main()
+    finally:
+        lock.release()
+    return True
+
 
 # ENTRY POINT
 if __name__ == "__main__":
-    main()
+    init_run_log("run_daily", enabled=True if "--log" in sys.argv else None)
+    ok = run_with_lock()
+    get_run_log().summary()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,198 @@
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from utils.market_calendar import (
+    IST,
+    calendar_years,
+    is_trading_day,
+    last_closed_session,
+    now_ist,
+    session_close,
+)
+from utils.price_store import COMPACT_AFTER_DELTAS, PriceStore
+from utils.run_log import get_run_log, init_run_log
+from utils.scheduling import (
+    POLL_INTERVAL_S,
+    POLL_WINDOW,
+    PipelineLock,
+    lock_status,
+    next_due,
+    read_state,
+    write_state,
+)
+
+
+# ============================================================
+#  BUILT-IN DAILY SCHEDULER (replaces cron / Task Scheduler)
+# ============================================================
+# python scheduler.py           → keep running; one pipeline run per trading day
+# python scheduler.py --once    → run today's session if due, then exit
+#                                 (for a single cron / Task Scheduler entry)
+# python scheduler.py --status  → print calendar + scheduler state
+# python scheduler.py --force   → run now, ignoring the calendar
+#
+# Each trading day, RUN_DELAY after the close, the newest bar of one
+# probe symbol is polled (a 5-day request) until the session's bar is
+# published, and only then the full fetch + predict pipeline runs under
+# the pipeline lock. Weekends and NSE holidays (data/nse_holidays.csv)
+# are skipped without touching the network. After a successful run the
+# price store's daily deltas are compacted once COMPACT_AFTER_DELTAS of
+# them have accumulated.
+
+MAX_SLEEP_S = 300    # wake up regularly so laptop sleep / clock changes are picked up
+
+
+def _last_session() -> date | None:
+    value = read_state().get("last_session")
+    return date.fromisoformat(value) if value else None
+
+
+def _sleep_until(when: datetime) -> None:
+    while True:
+        remaining = (when - now_ist()).total_seconds()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, MAX_SLEEP_S))
+
+
+def wait_for_bar(session: date) -> bool:
+    """Poll the probe symbol until `session`'s bar exists or the poll window ends."""
+
+    import nse_fetch   # network stack only when actually polling
+
+    deadline = session_close(session) + POLL_WINDOW
+    log = get_run_log()
+
+    while True:
+        try:
+            latest = nse_fetch.latest_bar_date()
+        except Exception as e:
+            print(f"⚠ Probe failed: {e}")
+            latest = None
+
+        log.event("bar_poll", session=str(session), latest=str(latest))
+        if latest is not None and latest >= session:
+            print(f"📈 Bar for {session} is available (probe: {nse_fetch.SYMBOLS[0]})")
+            return True
+
+        if now_ist() + timedelta(seconds=POLL_INTERVAL_S) > deadline:
+            return False
+
+        print(f"⏳ No bar for {session} yet (latest {latest}) – retrying in {POLL_INTERVAL_S // 60} min")
+        time.sleep(POLL_INTERVAL_S)
+
+
+def compact_if_due(min_deltas: int = COMPACT_AFTER_DELTAS) -> int:
+    """Fold the store's deltas into base partitions once enough have piled up."""
+
+    store = PriceStore()
+    if not store.exists() or len(store.manifest()["deltas"]) < min_deltas:
+        return 0
+
+    with PipelineLock("compact") as acquired:
+        if not acquired:
+            return 0
+        with get_run_log().stage("compact_store") as stage:
+            merged = store.compact(min_deltas)
+            stage.rows = merged
+    print(f"🗜 Compacted {merged} delta file(s) into the price store base")
+    return merged
+
+
+def run_session(session: date, force: bool = False) -> str:
+    """Poll for the session's bar, then run the pipeline once. Returns the outcome."""
+
+    import run_daily
+
+    if not force and not wait_for_bar(session):
+        print(f"❌ No bar for {session} by {(session_close(session) + POLL_WINDOW):%H:%M} IST – skipping this session")
+        status = "no_bar"
+    elif run_daily.run_with_lock("scheduler"):
+        status = "ok"
+        compact_if_due()
+    else:
+        # Another run holds the lock: leave the session open and retry later
+        return "locked"
+
+    write_state({
+        "last_session": session.isoformat(),
+        "status": status,
+        "finished_at": now_ist().isoformat(timespec="seconds"),
+    })
+    return status
+
+
+def run_once(log_enabled: bool | None) -> str:
+    session, due_at = next_due(last_session=_last_session())
+
+    if due_at > now_ist():
+        print(f"💤 Nothing due – next run for {session} at {due_at:%d-%m-%Y %H:%M} IST")
+        return "idle"
+
+    init_run_log("scheduler", enabled=log_enabled)
+    print(f"🗓 Running pipeline for session {session}")
+    status = run_session(session)
+    get_run_log().summary()
+    return status
+
+
+def run_forever(log_enabled: bool | None) -> None:
+    print("🕰 Scheduler started – Ctrl+C to stop")
+    while True:
+        session, due_at = next_due(last_session=_last_session())
+        if due_at > now_ist():
+            print(f"💤 Next run for {session} at {due_at:%d-%m-%Y %H:%M} IST")
+            _sleep_until(due_at)
+            continue
+
+        if run_once(log_enabled) == "locked":
+            time.sleep(POLL_INTERVAL_S)
+
+
+def print_status() -> None:
+    now = now_ist()
+    years = calendar_years()
+    session, due_at = next_due(now, _last_session())
+    state = read_state()
+
+    print(f"🕒 Now: {now:%d-%m-%Y %H:%M} IST · trading day: {is_trading_day(now.date())}")
+    print(f"📅 Holiday calendar covers: {', '.join(map(str, years)) or 'nothing (weekends only)'}")
+    if now.year not in years:
+        print(f"⚠ data/nse_holidays.csv has no {now.year} holidays – add them from the NSE circular")
+    print(f"✅ Last closed session: {last_closed_session(now)}")
+    print(f"🗂 Last processed: {state.get('last_session', '—')} ({state.get('status', '—')})")
+    print(f"⏭ Next run: session {session} at {due_at.astimezone(IST):%d-%m-%Y %H:%M} IST")
+    lock = lock_status()
+    print(f"🔒 Lock: {'free' if lock is None else lock}")
+
+
+# ============================================================
+#  ENTRY POINT
+# ============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trading-calendar aware daily pipeline scheduler")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="run today's session if due, then exit")
+    mode.add_argument("--status", action="store_true", help="print calendar + scheduler state")
+    mode.add_argument("--force", action="store_true", help="run the pipeline now, ignoring the calendar")
+    parser.add_argument("--log", action="store_true", help="write the structured run log")
+    args = parser.parse_args()
+
+    log_enabled = True if args.log else None
+
+    if args.status:
+        print_status()
+    elif args.force:
+        init_run_log("scheduler", enabled=log_enabled)
+        status = run_session(last_closed_session(), force=True)
+        get_run_log().summary()
+        sys.exit(0 if status == "ok" else 1)
+    elif args.once:
+        sys.exit(0 if run_once(log_enabled) in ("ok", "idle") else 1)
+    else:
+        try:
+            run_forever(log_enabled)
+        except KeyboardInterrupt:
+            print("👋 Scheduler stopped")
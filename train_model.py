@@ -1,12 +1,31 @@
 import os
+import sys
+import json
+import math
 import joblib
 import numpy as np
 import pandas as pd
 import ta
 
+from functools import partial
 from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
+from sklearn.metrics import accuracy_score, r2_score
+
+from utils.run_log import get_run_log, init_run_log, timed
+from utils.cross_section import XS_FEATURES, add_cross_sectional, cross_sectional_panel
+from utils.drift import build_reference, reference_path
+from utils.feature_matrix import (
+    MEMORY_BUDGET_MB,
+    build_feature_memmap,
+    get_matrix_dir,
+    predict_in_chunks,
+    read_close_panel,
+)
+from utils.online_model import ONLINE_MODEL_NAME, new_online_info, bootstrap_online_model, save_online_model
+from utils.price_store import PriceStore, read_prices
+from utils.sharding import run_sharded, shard_frame, worker_count
 
 
 # ============================================================
@@ -19,11 +38,29 @@ MODEL_DIR = BASE_DIR / "model"
 
 MODEL_DIR.mkdir(exist_ok=True)
 
+# Shared by both forests (and by benchmarks/run_benchmarks.py)
+FOREST_PARAMS = dict(
+    n_estimators=300,
+    max_depth=14,
+    random_state=42,
+    n_jobs=-1
+)
+
+TEST_SIZE = 0.20
+
 
 # ============================================================
 # FEATURE ENGINEERING
 # ============================================================
-def create_features(df: pd.DataFrame):
+@timed("create_features")
+def create_features(df: pd.DataFrame, xs=None):
+    """
+    Time-series features per symbol + cross-sectional features.
+
+    `xs` is the universe's cross-sectional panel (utils/cross_section.py).
+    Callers featurizing a shard or chunk MUST pass it; without it the
+    panel is computed from `df`, which is only right for the full universe.
+    """
 
     df = df.copy()
     df["Date"] = pd.to_datetime(df["Date"], format="%d-%m-%Y")
@@ -93,6 +130,11 @@ def create_features(df: pd.DataFrame):
 
     df_feat = pd.concat(frames)
 
+    # Market context on the same date (rank, relative strength, breadth, sector)
+    if xs is None:
+        xs = cross_sectional_panel(df)
+    df_feat = add_cross_sectional(df_feat, xs)
+
     feature_cols = [
         "Close", "SMA_5", "SMA_10", "SMA_20",
         "RSI_14", "MACD", "MACD_SIGNAL",
@@ -100,7 +142,7 @@ def create_features(df: pd.DataFrame):
         "Ret_1d", "Ret_5d", "Vol_Change",
         "Rolling_Volatility_10",
         "Volume"
-    ]
+    ] + XS_FEATURES
 
     # Remove bad rows
     df_feat = df_feat.replace([np.inf, -np.inf], np.nan)
@@ -109,19 +151,42 @@ def create_features(df: pd.DataFrame):
     return df_feat, feature_cols
 
 
-# ============================================================
-# TRAINING PIPELINE
-# ============================================================
-def main():
-
-    if not DATA_FILE.exists():
-        print(f"❌ Data file not found: {DATA_FILE}")
-        return
+def create_shard_features(item):
+    """Pool task: (symbol shard, its columns of the universe's cross-sectional panel)."""
+    df, xs = item
+    return create_features(df, xs)
 
-    df = pd.read_csv(DATA_FILE)
-    print(f"📄 Loaded {len(df)} rows from {DATA_FILE}")
 
-    df_feat, feature_cols = create_features(df)
+# ============================================================
+# TRAINING DATA (in memory)
+# ============================================================
+def load_training_data(log):
+    """Whole CSV in memory, features sharded over a process pool."""
+
+    with log.stage("load_prices") as stage:
+        df = read_prices(DATA_FILE)
+        stage.rows = len(df)
+    print(f"📄 Loaded {len(df)} price rows")
+
+    # Cross-sectional features need every symbol – computed once, up front
+    with log.stage("cross_section"):
+        xs = cross_sectional_panel(df)
+
+    # Indicators per symbol shard on a process pool, merged in symbol order
+    processes = worker_count()
+    shards = [(s, xs.select(s["Symbol"].unique())) for s in shard_frame(df, processes * 2)]
+    results, failed = run_sharded(create_shard_features, shards, processes, label="features")
+    results = [r for r in results if r is not None]
+    if not results:
+        print("❌ Feature computation failed for every shard.")
+        return None
+    if failed:
+        print(f"⚠ Training without {len(failed)} failed shard(s)")
+
+    df_feat = pd.concat([r[0] for r in results])
+    feature_cols = results[0][1]
+    del df, results
+    log.event("features", rows=len(df_feat), symbols=int(df_feat["Symbol"].nunique()))
 
     # Clean again after merge
     df_feat = df_feat.replace([np.inf, -np.inf], np.nan)
@@ -133,52 +198,168 @@ def main():
     y_dir = df_feat["Direction"]
 
     # Train-test split
-    X_train, X_test, y_price_train, y_price_test, y_dir_train, y_dir_test = train_test_split(
-        X, y_price, y_dir, test_size=0.20, shuffle=False
+    split = train_test_split(X, y_price, y_dir, test_size=TEST_SIZE, shuffle=False)
+
+    # Symbol of every row (codes + labels) for the per-symbol drift reference
+    row_symbols = pd.factorize(df_feat["Symbol"])
+    return split, feature_cols, row_symbols
+
+
+# ============================================================
+# TRAINING DATA (out of core: float32 memmap, bounded memory)
+# ============================================================
+def load_training_data_out_of_core(log, memory_budget_mb: float):
+    """Stream whole-symbol chunks into an on-disk feature matrix."""
+
+    print(f"🧱 Out-of-core features (budget {memory_budget_mb:,.0f} MB) → {get_matrix_dir(BASE_DIR)}")
+    store = PriceStore()
+    source = store if store.exists() else DATA_FILE
+
+    # Cross-sectional features need every symbol: a Close panel filled chunk
+    # by chunk (dates × symbols, not rows), then looked up per chunk
+    with log.stage("cross_section"):
+        xs = cross_sectional_panel(read_close_panel(source, memory_budget_mb))
+
+    with log.stage("features_out_of_core") as stage:
+        data = build_feature_memmap(
+            source,
+            get_matrix_dir(BASE_DIR),
+            partial(create_features, xs=xs),
+            memory_budget_mb,
+            log,
+        )
+        stage.rows = data.get("n_rows", 0)
+
+    if not data:
+        print("❌ No feature rows produced.")
+        return None
+
+    print(
+        f"📄 {data['n_rows']:,} feature rows · {data['n_symbols']} symbols · "
+        f"{data['chunks']} chunks of ≤{data['chunk_rows']:,} raw rows"
     )
+    log.event("features", rows=data["n_rows"], symbols=data["n_symbols"])
+
+    # Same positional split as train_test_split(shuffle=False) – views, no copies
+    n_train = data["n_rows"] - math.ceil(data["n_rows"] * TEST_SIZE)
+    X, y_price, y_dir = data["X"], data["y_price"], data["y_dir"]
+    split = (
+        X[:n_train], X[n_train:],
+        y_price[:n_train], y_price[n_train:],
+        y_dir[:n_train], y_dir[n_train:],
+    )
+    return split, data["feature_cols"], (data["symbol"], data["symbols"])
+
+
+# ============================================================
+# TRAINING PIPELINE
+# ============================================================
+def main(out_of_core: bool = False, memory_budget_mb: float = MEMORY_BUDGET_MB, online: bool = False):
+
+    if not DATA_FILE.exists() and not PriceStore().exists():
+        print(f"❌ No price data: neither data/store nor {DATA_FILE}")
+        return
+
+    log = get_run_log()
+
+    if out_of_core:
+        loaded = load_training_data_out_of_core(log, memory_budget_mb)
+    else:
+        loaded = load_training_data(log)
+    if loaded is None:
+        return
+
+    (X_train, X_test, y_price_train, y_price_test, y_dir_train, y_dir_test), feature_cols, row_symbols = loaded
 
     # =====================
     # PRICE MODEL
     # =====================
-    price_model = RandomForestRegressor(
-        n_estimators=300,
-        max_depth=14,
-        random_state=42,
-        n_jobs=-1
-    )
-    price_model.fit(X_train, y_price_train)
+    price_model = RandomForestRegressor(**FOREST_PARAMS)
+    with log.stage("fit_price_model") as stage:
+        price_model.fit(X_train, y_price_train)
+        stage.rows = len(X_train)
 
     # =====================
     # DIRECTION MODEL
     # =====================
-    dir_model = RandomForestClassifier(
-        n_estimators=300,
-        max_depth=14,
-        random_state=42,
-        n_jobs=-1
-    )
-    dir_model.fit(X_train, y_dir_train)
+    dir_model = RandomForestClassifier(**FOREST_PARAMS)
+    with log.stage("fit_dir_model") as stage:
+        dir_model.fit(X_train, y_dir_train)
+        stage.rows = len(X_train)
 
     # Evaluate
-    price_r2 = price_model.score(X_test, y_price_test)
-    dir_acc = dir_model.score(X_test, y_dir_test)
+    with log.stage("evaluate") as stage:
+        # Block-wise predictions: the test slice may be a memmap
+        price_r2 = r2_score(y_price_test, predict_in_chunks(price_model, X_test))
+        dir_acc = accuracy_score(y_dir_test, predict_in_chunks(dir_model, X_test))
+        stage.rows = len(X_test)
 
     print(f"✅ Price model R² (test): {price_r2:.3f}")
     print(f"✅ Direction model Accuracy (test): {dir_acc:.3f}")
 
+    # =====================
+    # ONLINE DIRECTION MODEL (optional, keeps learning in run_daily.py)
+    # =====================
+    online_model = None
+    if online:
+        with log.stage("fit_online_model") as stage:
+            online_model = bootstrap_online_model(X_train, y_dir_train, feature_cols)
+            online_acc = accuracy_score(y_dir_test, predict_in_chunks(online_model, X_test))
+            stage.rows = len(X_train)
+        print(f"✅ Online direction model Accuracy (test): {online_acc:.3f}")
+
     # Save models
     price_path = MODEL_DIR / "price_model.pkl"
     dir_path = MODEL_DIR / "dir_model.pkl"
 
-    joblib.dump(price_model, price_path)
-    joblib.dump(dir_model, dir_path)
+    with log.stage("save_models"):
+        joblib.dump(price_model, price_path)
+        joblib.dump(dir_model, dir_path)
+
+    # Model metadata (lets the dashboard describe models without unpickling)
+    info = {
+        "price_model": type(price_model).__name__,
+        "dir_model": type(dir_model).__name__,
+        "feature_cols": feature_cols,
+        "price_r2": round(float(price_r2), 4),
+        "dir_accuracy": round(float(dir_acc), 4),
+        "trained_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "out_of_core": out_of_core,
+    }
+    if online_model is not None:
+        info["online_accuracy"] = round(float(online_acc), 4)
+    with open(MODEL_DIR / "model_info.json", "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+
+    # Feature histograms of the training window (drift monitor reference);
+    # versioned by trained_at so run_daily restarts its live sketch
+    with log.stage("drift_reference") as stage:
+        codes, names = row_symbols
+        reference = build_reference(X_train, codes[:len(X_train)], names, feature_cols, info["trained_at"])
+        reference.save(reference_path(MODEL_DIR))
+        stage.rows = len(X_train)
 
     print(f"💾 Saved price model → {price_path}")
     print(f"💾 Saved direction model → {dir_path}")
+    print(f"💾 Saved drift reference → {reference_path(MODEL_DIR)}")
+
+    if online_model is not None:
+        # Fresh learning state: per-symbol dates and accuracy start over
+        save_online_model(online_model, new_online_info(feature_cols), MODEL_DIR)
+        print(f"💾 Saved online direction model → {MODEL_DIR / ONLINE_MODEL_NAME}")
 
 
 # ============================================================
 # ENTRY
 # ============================================================
 if __name__ == "__main__":
-    main()
+    init_run_log("train_model", enabled=True if "--log" in sys.argv else None)
+
+    # --out-of-core [--memory-budget-mb N]: bounded-memory training from a memmap
+    budget = MEMORY_BUDGET_MB
+    if "--memory-budget-mb" in sys.argv:
+        budget = float(sys.argv[sys.argv.index("--memory-budget-mb") + 1])
+
+    # --online: also (re)start the partial_fit direction model
+    main(out_of_core="--out-of-core" in sys.argv, memory_budget_mb=budget, online="--online" in sys.argv)
+    get_run_log().summary()
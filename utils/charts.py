@@ -1,6 +1,11 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import ta
+
+
+# Max points per trace in fast rendering mode. Longer lookbacks are
+# aggregated (candles) or LTTB-downsampled (lines) down to this budget.
+MAX_CHART_POINTS = 1000
 
 
 # ============================================================
@@ -12,6 +17,8 @@ def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
     Works for NIFTY-50 large datasets without errors.
     """
 
+    import ta  # heavy import, only needed when indicators are computed
+
     df = df.sort_values("Date").copy()
 
     # Basic Moving Averages
@@ -38,24 +45,131 @@ def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# ============================================================
+#   DOWNSAMPLING (FAST RENDERING MODE)
+# ============================================================
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the indices of the `n_out` points that best preserve the
+    visual shape of the line (first and last points always kept).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+
+        # Triangle area for every candidate in the current bucket
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+
+    return out
+
+
+def downsample_line(dates: pd.Series, values: pd.Series, max_points: int):
+    """LTTB-downsample one overlay series, ignoring NaN warm-up values."""
+    valid = values.notna().to_numpy()
+    dates = dates[valid]
+    values = values[valid]
+
+    if max_points is None or len(values) <= max_points:
+        return dates, values
+
+    x = dates.to_numpy().astype("datetime64[ns]").astype(np.int64)
+    idx = lttb_indices(x, values.to_numpy(), max_points)
+    return dates.iloc[idx], values.iloc[idx]
+
+
+def resample_ohlc(df: pd.DataFrame, max_points: int) -> tuple[pd.DataFrame, str]:
+    """
+    Aggregate daily candles to weekly or monthly OHLC when the window
+    holds more bars than `max_points`. Each candle is plotted at the
+    last trading date of its period.
+    """
+    if max_points is None or len(df) <= max_points:
+        return df, "daily"
+
+    # ~5 trading days per week, ~21 per month
+    if len(df) / 5 <= max_points:
+        rule, label = "W-FRI", "weekly"
+    else:
+        rule, label = "MS", "monthly"
+
+    agg = {
+        "Open": "first",
+        "High": "max",
+        "Low": "min",
+        "Close": "last",
+        "Date": "last",
+    }
+    if "Volume" in df.columns:
+        agg["Volume"] = "sum"
+
+    out = (
+        df.assign(Bar_Date=df["Date"])
+        .resample(rule, on="Bar_Date")
+        .agg(agg)
+        .dropna(subset=["Open", "High", "Low", "Close"])
+        .reset_index(drop=True)
+    )
+    return out, label
+
+
+def _line_trace(df: pd.DataFrame, col: str, name: str, max_points: int | None):
+    """Plain SVG line, or a downsampled WebGL line in fast rendering mode."""
+    if max_points is None:
+        return go.Scatter(x=df["Date"], y=df[col], mode="lines", name=name)
+
+    x, y = downsample_line(df["Date"], pd.to_numeric(df[col], errors="coerce"), max_points)
+    return go.Scattergl(x=x, y=y, mode="lines", name=name)
+
+
 # ============================================================
 #   CANDLESTICK + SMAs
 # ============================================================
-def make_candlestick_with_sma(df: pd.DataFrame, symbol: str) -> go.Figure:
+def make_candlestick_with_sma(
+    df: pd.DataFrame, symbol: str, max_points: int | None = None
+) -> go.Figure:
     """
     Professional candlestick chart with SMA overlays.
+    With `max_points`, candles are aggregated to weekly/monthly bars and
+    the SMAs are LTTB-downsampled into WebGL traces.
     """
 
     fig = go.Figure()
 
+    candles, bar_label = resample_ohlc(df, max_points)
+
     # Candlestick
     fig.add_trace(
         go.Candlestick(
-            x=df["Date"],
-            open=df["Open"],
-            high=df["High"],
-            low=df["Low"],
-            close=df["Close"],
+            x=candles["Date"],
+            open=candles["Open"],
+            high=candles["High"],
+            low=candles["Low"],
+            close=candles["Close"],
             name="Price",
         )
     )
@@ -69,18 +183,15 @@ def make_candlestick_with_sma(df: pd.DataFrame, symbol: str) -> go.Figure:
 
     for col, name in ma_list:
         if col in df.columns:
-            fig.add_trace(
-                go.Scatter(
-                    x=df["Date"],
-                    y=df[col],
-                    mode="lines",
-                    name=name,
-                )
-            )
+            fig.add_trace(_line_trace(df, col, name, max_points))
+
+    title = f"{symbol} – Candlestick with Moving Averages"
+    if bar_label != "daily":
+        title += f" ({bar_label} bars)"
 
     # Layout
     fig.update_layout(
-        title=f"{symbol} – Candlestick with Moving Averages",
+        title=title,
         xaxis_title="Date",
         yaxis_title="Price",
         xaxis_rangeslider_visible=False,
@@ -94,16 +205,16 @@ def make_candlestick_with_sma(df: pd.DataFrame, symbol: str) -> go.Figure:
 # ============================================================
 #   RSI CHART
 # ============================================================
-def make_rsi_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
+def make_rsi_chart(
+    df: pd.DataFrame, symbol: str, max_points: int | None = None
+) -> go.Figure:
     """
     RSI panel for technical overview.
     """
 
     fig = go.Figure()
 
-    fig.add_trace(
-        go.Scatter(x=df["Date"], y=df["RSI_14"], mode="lines", name="RSI 14")
-    )
+    fig.add_trace(_line_trace(df, "RSI_14", "RSI 14", max_points))
 
     # Add Overbought/Oversold lines
     fig.add_hline(y=70, line_dash="dash", line_color="red")
@@ -124,21 +235,17 @@ def make_rsi_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
 # ============================================================
 #   MACD CHART
 # ============================================================
-def make_macd_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
+def make_macd_chart(
+    df: pd.DataFrame, symbol: str, max_points: int | None = None
+) -> go.Figure:
     """
     MACD panel including signal line.
     """
 
     fig = go.Figure()
 
-    fig.add_trace(
-        go.Scatter(x=df["Date"], y=df["MACD"], mode="lines", name="MACD")
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=df["Date"], y=df["MACD_SIGNAL"], mode="lines", name="Signal"
-        )
-    )
+    fig.add_trace(_line_trace(df, "MACD", "MACD", max_points))
+    fig.add_trace(_line_trace(df, "MACD_SIGNAL", "Signal", max_points))
 
     fig.update_layout(
         title=f"{symbol} – MACD",
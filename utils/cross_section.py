@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+from utils.indicators import wide_sma
+from utils.panel import PricePanel
+from utils.universe import UNKNOWN_SECTOR, load_sectors
+
+
+# ============================================================
+#   CROSS-SECTIONAL FEATURES (market context per date)
+# ============================================================
+# The time-series features in train_model / run_daily only see one
+# symbol. These compare every symbol with the rest of the universe on
+# the same date, so they MUST be computed on the full universe – never
+# on a symbol shard or out-of-core chunk. The pipelines compute the
+# panel once and hand each shard its columns (PricePanel.select).
+#
+# Everything is a whole-panel array operation on the Date × Symbol
+# Close matrix (no per-date or per-symbol loop); 500 symbols × 20 years
+# takes well under a second.
+#
+#   • Ret_5d_Rank       → percentile rank of the 5-session return (0–1]
+#   • RS_20d            → 20-session return minus the equal-weight index's
+#   • Breadth_SMA20     → share of the universe closing above its SMA 20
+#                         (same value for every symbol on a date)
+#   • Sector_Rel_Ret_5d → 5-session return minus its sector's average
+
+XS_FEATURES = ["Ret_5d_Rank", "RS_20d", "Breadth_SMA20", "Sector_Rel_Ret_5d"]
+
+
+def cross_sectional_panel(prices, sectors: dict | None = None) -> PricePanel:
+    """
+    Cross-sectional features for every (date, symbol) of the universe.
+
+    `prices` is a PricePanel or a long price frame (Date, Symbol, Close;
+    dates as datetimes or DD-MM-YYYY strings). `sectors` defaults to
+    data/sectors.csv.
+    """
+    if isinstance(prices, pd.DataFrame):
+        df = prices[["Date", "Symbol", "Close"]].copy()
+        df["Date"] = pd.to_datetime(df["Date"], format="%d-%m-%Y")
+        df["Close"] = pd.to_numeric(df["Close"], errors="coerce")
+        prices = PricePanel.from_long(df.dropna(subset=["Close"]), fields=["Close"])
+
+    sectors = load_sectors() if sectors is None else sectors
+    valid = prices.valid
+
+    # Returns over sessions of the whole calendar: a symbol's missing bar
+    # carries its last close forward instead of stretching the window
+    close = prices.frame("Close").ffill()
+    ret_1d = close.pct_change(1, fill_method=None).where(valid).to_numpy()
+    ret_5d = close.pct_change(5, fill_method=None).where(valid)
+    ret_20d = close.pct_change(20, fill_method=None).where(valid).to_numpy()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Equal-weight index: average daily return of the symbols trading
+        index_ret = np.nan_to_num(_nanmean_rows(ret_1d))
+        index_level = np.cumprod(1 + index_ret)
+        index_20d = np.full_like(index_level, np.nan)
+        index_20d[20:] = index_level[20:] / index_level[:-20] - 1
+
+        sma_20 = wide_sma(close, 20).to_numpy()
+        above = np.where(valid & np.isfinite(sma_20), close.to_numpy() > sma_20, np.nan)
+
+        xs = PricePanel(prices.dates, prices.symbols, {}, valid)
+        xs.add("Ret_5d_Rank", ret_5d.rank(axis=1, pct=True))
+        xs.add("RS_20d", ret_20d - index_20d[:, None])
+        xs.add("Breadth_SMA20", np.broadcast_to(_nanmean_rows(above)[:, None], xs.shape))
+        xs.add("Sector_Rel_Ret_5d", ret_5d.to_numpy() - _sector_means(ret_5d.to_numpy(), prices.symbols, sectors))
+
+    return xs
+
+
+def _nanmean_rows(values: np.ndarray) -> np.ndarray:
+    """Row means over finite entries (NaN for empty rows, no warnings)."""
+    finite = np.isfinite(values)
+    counts = finite.sum(axis=1)
+    sums = np.where(finite, values, 0.0).sum(axis=1)
+    return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def _sector_means(values: np.ndarray, symbols, sectors: dict) -> np.ndarray:
+    """Per date, each symbol's sector average of `values`, as a (T, N) array."""
+    codes, names = pd.factorize(pd.Series([sectors.get(s, UNKNOWN_SECTOR) for s in symbols]))
+
+    # One-hot (N, S) membership: sector sums / counts are two matmuls
+    member = np.zeros((len(symbols), len(names)))
+    member[np.arange(len(symbols)), codes] = 1.0
+
+    finite = np.isfinite(values)
+    sums = np.where(finite, values, 0.0) @ member
+    counts = finite.astype(float) @ member
+    means = sums / np.maximum(counts, 1.0)
+    means[counts == 0] = np.nan
+
+    return means[:, codes]
+
+
+# ============================================================
+#   JOIN ONTO (Date, Symbol) FEATURE ROWS
+# ============================================================
+def add_cross_sectional(feat: pd.DataFrame, xs: PricePanel) -> pd.DataFrame:
+    """
+    Add the XS_FEATURES columns to `feat` (in place) by array lookup on
+    (Date, Symbol) – no merge. Rows the panel does not cover get NaN.
+    """
+    t = xs.dates.get_indexer(pd.DatetimeIndex(feat["Date"]))
+    s = xs.symbols.get_indexer(feat["Symbol"])
+    hit = (t >= 0) & (s >= 0)
+
+    for col in XS_FEATURES:
+        values = np.full(len(feat), np.nan, dtype=np.float32)
+        values[hit] = xs[col][t[hit], s[hit]]
+        feat[col] = values
+
+    return feat
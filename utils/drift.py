@@ -0,0 +1,313 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+#   FEATURE DRIFT MONITOR (fixed-bin histogram sketches)
+# ============================================================
+# train_model.py summarizes the training window as one histogram per
+# model feature – overall and per symbol – on fixed bins (training
+# deciles, so every reference bin holds ~10% of the rows):
+#
+#     model/drift_reference.npz   edges (F, B-1), counts (F, B),
+#                                 symbol_counts (S, F, B)
+#
+# run_daily.py adds each new day's feature rows to live histograms on
+# the SAME bins (data/drift_live.npz). Before a new session is added the
+# live counts decay by DECAY, so they describe roughly the last quarter
+# and memory stays constant however long the history grows. Adding a
+# row is a binary search per feature.
+#
+# Drift scores compare live vs. reference bin shares:
+#   • PSI = Σ (live − ref) · ln(live / ref)   <0.1 stable, >0.25 alert
+#   • KS  = max |CDF_live − CDF_ref| at the bin edges (histogram KS)
+#
+# A histogram is only scored once its effective sample size
+# (Σw)² / Σw² of the decayed row weights reaches MIN_EFFECTIVE_ROWS.
+# Below that, sampling noise alone pushes PSI over the alert level (an
+# empty live bin adds ~0.7), so scores are reported as "insufficient
+# data" and never alert. With one row per symbol and session, a symbol
+# is scored after ~110 sessions; the steady state is (1 + DECAY) /
+# (1 − DECAY) ≈ 200 effective rows. Just past the gate, noise PSI still
+# reaches ~0.35, so the alert level is also at least PSI_NOISE_ROWS / n
+# (0.5 at 100 effective rows, the flat PSI_ALERT from 200 on).
+
+N_BINS = 10
+DECAY = 0.99                # per session → half-life ≈ 69 sessions
+PSI_WARN = 0.10
+PSI_ALERT = 0.25
+MIN_EFFECTIVE_ROWS = 100.0  # (Σw)² / Σw² before a histogram is scored
+PSI_NOISE_ROWS = 50.0       # ≈ 1.5 × χ²(9 dof) at p = 1e-4 – the empty-bin floor fattens the tail
+MAX_SYMBOL_ALERTS = 20      # worst (symbol, feature) pairs reported per run
+_EPS = 1e-4                 # empty-bin floor for PSI
+
+REFERENCE_NAME = "drift_reference.npz"
+LIVE_FILE = Path(__file__).resolve().parents[1] / "data" / "drift_live.npz"
+
+
+class FeatureSketch:
+    def __init__(self, features, symbols, edges: np.ndarray, version: str):
+        self.features = list(features)
+        self.symbols = pd.Index(symbols)
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.version = version
+
+        n_features, n_bins = len(self.features), self.edges.shape[1] + 1
+        self.counts = np.zeros((n_features, n_bins))
+        self.symbol_counts = np.zeros((len(self.symbols), n_features, n_bins))
+        self.weight_sq = 0.0                               # Σw² of the rows
+        self.symbol_weight_sq = np.zeros(len(self.symbols))
+        self.last_date = {}          # symbol → last date added (live sketches)
+
+    # --------------------------------------------------------
+    #   BINNING
+    # --------------------------------------------------------
+    def bin_index(self, X: np.ndarray) -> np.ndarray:
+        """(rows, F) bin numbers; NaN / ±inf land in the outer bins."""
+        X = np.asarray(X, dtype=np.float64)
+        out = np.empty(X.shape, dtype=np.int64)
+        for f in range(X.shape[1]):
+            out[:, f] = np.searchsorted(self.edges[f], X[:, f], side="right")
+        return out
+
+    def add(self, X, symbol_codes: np.ndarray | None = None) -> None:
+        """
+        Count rows of X (columns in `self.features` order). `symbol_codes`
+        index `self.symbols`; -1 counts towards the overall histogram only.
+        """
+        bins = self.bin_index(X)
+        n_features, n_bins = self.counts.shape
+        flat = bins + np.arange(n_features) * n_bins
+
+        self.counts += np.bincount(flat.ravel(), minlength=n_features * n_bins).reshape(n_features, n_bins)
+        self.weight_sq += len(bins)
+
+        if symbol_codes is not None:
+            codes = np.asarray(symbol_codes)
+            keep = codes >= 0
+            self.symbol_weight_sq += np.bincount(codes[keep], minlength=len(self.symbols))
+            flat_sym = flat[keep] + codes[keep, None] * (n_features * n_bins)
+            self.symbol_counts += np.bincount(
+                flat_sym.ravel(), minlength=self.symbol_counts.size
+            ).reshape(self.symbol_counts.shape)
+
+    def decay(self, factor: float) -> None:
+        self.counts *= factor
+        self.symbol_counts *= factor
+        self.weight_sq *= factor ** 2
+        self.symbol_weight_sq *= factor ** 2
+
+    # --------------------------------------------------------
+    #   EFFECTIVE SAMPLE SIZE
+    # --------------------------------------------------------
+    def effective_rows(self) -> float:
+        """(Σw)² / Σw² over all rows – equals the row count before any decay."""
+        total = self.counts[0].sum()
+        return float(total ** 2 / self.weight_sq) if self.weight_sq > 0 else 0.0
+
+    def symbol_effective_rows(self) -> np.ndarray:
+        total = self.symbol_counts[:, 0, :].sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.symbol_weight_sq > 0, total ** 2 / self.symbol_weight_sq, 0.0)
+
+    # --------------------------------------------------------
+    #   PERSISTENCE
+    # --------------------------------------------------------
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # np.savez appends .npz to names without it – write under the final suffix
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(
+            tmp,
+            features=np.asarray(self.features, dtype=str),
+            symbols=self.symbols.to_numpy(dtype=str),
+            edges=self.edges,
+            version=self.version,
+            counts=self.counts,
+            symbol_counts=self.symbol_counts,
+            weight_sq=self.weight_sq,
+            symbol_weight_sq=self.symbol_weight_sq,
+            last_symbols=np.asarray(list(self.last_date), dtype=str),
+            last_dates=np.asarray(list(self.last_date.values()), dtype="datetime64[ns]"),
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "FeatureSketch | None":
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        with np.load(path) as data:
+            sketch = cls(data["features"].astype(str), data["symbols"].astype(str), data["edges"], str(data["version"]))
+            sketch.counts = data["counts"]
+            sketch.symbol_counts = data["symbol_counts"]
+            # Files written before weights were tracked: treat rows as undecayed
+            sketch.weight_sq = float(data["weight_sq"]) if "weight_sq" in data else sketch.counts[0].sum()
+            sketch.symbol_weight_sq = (
+                data["symbol_weight_sq"] if "symbol_weight_sq" in data else sketch.symbol_counts[:, 0, :].sum(axis=1)
+            )
+            sketch.last_date = dict(zip(data["last_symbols"].astype(str), data["last_dates"]))
+        return sketch
+
+
+# ============================================================
+#   REFERENCE (train_model.py, saved next to the model)
+# ============================================================
+def build_reference(
+    X,
+    symbol_codes: np.ndarray,
+    symbols,
+    features: list,
+    version: str,
+    chunk_rows: int = 200_000,
+    sample_rows: int = 200_000,
+) -> FeatureSketch:
+    """
+    Reference sketch of the training rows. X may be a frame or a memmap:
+    bin edges come from an evenly strided sample, counts are added in
+    row blocks, so memory stays bounded.
+    """
+    n = len(X)
+
+    def rows(sl):
+        block = X.iloc[sl] if hasattr(X, "iloc") else X[sl]
+        return np.asarray(block, dtype=np.float64)
+
+    # Training deciles of an evenly strided sample; duplicates collapse
+    # (e.g. discrete features)
+    sample = rows(slice(None, None, max(n // sample_rows, 1)))
+    qs = np.linspace(0, 1, N_BINS + 1)[1:-1]
+    edges = np.maximum.accumulate(np.nanquantile(sample, qs, axis=0).T, axis=1)
+
+    sketch = FeatureSketch(features, symbols, edges, version)
+    for i in range(0, n, chunk_rows):
+        sketch.add(rows(slice(i, i + chunk_rows)), np.asarray(symbol_codes[i:i + chunk_rows]))
+    return sketch
+
+
+def reference_path(model_dir: Path) -> Path:
+    return Path(model_dir) / REFERENCE_NAME
+
+
+# ============================================================
+#   LIVE SKETCH (run_daily.py)
+# ============================================================
+def update_live(feat_df: pd.DataFrame, reference: FeatureSketch, path: Path = LIVE_FILE) -> FeatureSketch:
+    """
+    Add the rows of `feat_df` (Date, Symbol + reference features) that are
+    newer than what each symbol already contributed. Live counts decay
+    once per new session. A retrained model (new reference version)
+    starts a fresh live sketch.
+    """
+    live = FeatureSketch.load(path)
+    if live is None or live.version != reference.version or live.features != reference.features:
+        live = FeatureSketch(reference.features, reference.symbols, reference.edges, reference.version)
+
+    dates = pd.to_datetime(feat_df["Date"]).to_numpy(dtype="datetime64[ns]")
+    last = np.array(
+        [live.last_date.get(s, np.datetime64("NaT")) for s in feat_df["Symbol"]], dtype="datetime64[ns]"
+    )
+    new = np.isnat(last) | (dates > last)
+    if not new.any():
+        return live
+
+    # Decay by the number of sessions past the newest date already counted
+    newest = max(live.last_date.values()) if live.last_date else None
+    sessions = np.unique(dates[new] if newest is None else dates[new & (dates > newest)])
+    live.decay(DECAY ** len(sessions))
+
+    rows = feat_df[new]
+    live.add(rows[reference.features].to_numpy(dtype=np.float64), reference.symbols.get_indexer(rows["Symbol"]))
+    live.last_date.update(zip(rows["Symbol"], dates[new]))
+
+    live.save(path)
+    return live
+
+
+# ============================================================
+#   SCORES
+# ============================================================
+def _shares(counts: np.ndarray) -> np.ndarray:
+    total = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return counts / total
+
+
+def _psi(ref: np.ndarray, live: np.ndarray) -> np.ndarray:
+    p = np.maximum(_shares(ref), _EPS)
+    q = np.maximum(_shares(live), _EPS)
+    return ((q - p) * np.log(q / p)).sum(axis=-1)
+
+
+def _ks(ref: np.ndarray, live: np.ndarray) -> np.ndarray:
+    return np.abs(np.cumsum(_shares(live), axis=-1) - np.cumsum(_shares(ref), axis=-1)).max(axis=-1)
+
+
+INSUFFICIENT = "insufficient data"
+
+
+def alert_level(effective_rows):
+    """PSI alert threshold for a histogram of `effective_rows` live rows."""
+    with np.errstate(divide="ignore"):
+        return np.maximum(PSI_ALERT, PSI_NOISE_ROWS / np.asarray(effective_rows, dtype=float))
+
+
+def _status(psi, effective_rows):
+    return np.select([psi >= alert_level(effective_rows), psi >= PSI_WARN], ["alert", "warn"], "ok")
+
+
+def feature_drift(reference: FeatureSketch, live: FeatureSketch) -> pd.DataFrame:
+    """
+    PSI / KS per feature over all symbols, worst first. Status is
+    INSUFFICIENT until the live sketch holds MIN_EFFECTIVE_ROWS.
+    """
+    psi = _psi(reference.counts, live.counts)
+    effective = live.effective_rows()
+    status = _status(psi, effective) if effective >= MIN_EFFECTIVE_ROWS else np.full(len(psi), INSUFFICIENT)
+    out = pd.DataFrame({
+        "Feature": reference.features,
+        "PSI": psi,
+        "KS": _ks(reference.counts, live.counts),
+        "Status": status,
+        "Live_Weight": live.counts.sum(axis=1),
+        "Effective_Rows": effective,
+    })
+    return out.sort_values("PSI", ascending=False, ignore_index=True)
+
+
+def symbol_drift(reference: FeatureSketch, live: FeatureSketch) -> pd.DataFrame:
+    """
+    Symbol × Feature PSI against each symbol's own training histogram.
+    Symbols with fewer than MIN_EFFECTIVE_ROWS effective live rows are
+    left out.
+    """
+    scored = (live.symbol_effective_rows() >= MIN_EFFECTIVE_ROWS) & (reference.symbol_counts.sum(axis=2)[:, 0] > 0)
+
+    psi = _psi(reference.symbol_counts[scored], live.symbol_counts[scored])
+    return pd.DataFrame(psi, index=reference.symbols[scored], columns=reference.features)
+
+
+def drift_alerts(reference: FeatureSketch, live: FeatureSketch) -> list[dict]:
+    """
+    Features, and the worst (symbol, feature) pairs, at or above the
+    alert level – only for histograms with enough effective rows.
+    """
+    alerts = [
+        {"scope": "feature", "feature": r.Feature, "psi": round(float(r.PSI), 4), "ks": round(float(r.KS), 4)}
+        for r in feature_drift(reference, live).itertuples()
+        if r.Status == "alert"
+    ]
+
+    by_symbol = symbol_drift(reference, live).stack()
+    effective = live.symbol_effective_rows()[live.symbols.get_indexer(by_symbol.index.get_level_values(0))]
+    level = alert_level(effective)
+    worst = by_symbol[by_symbol.to_numpy() >= level].sort_values(ascending=False).head(MAX_SYMBOL_ALERTS)
+    for (symbol, feature), psi in worst.items():
+        alerts.append({"scope": "symbol", "symbol": symbol, "feature": feature, "psi": round(float(psi), 4)})
+
+    return alerts
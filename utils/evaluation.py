@@ -0,0 +1,236 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+#   FILES (inside data/)
+# ============================================================
+OUTCOMES_NAME = "prediction_outcomes.csv"
+SUMMARY_NAME = "evaluation_summary.json"
+
+OUTCOME_COLS = [
+    "Date", "Symbol", "Close", "Next_Close", "Predicted_Direction",
+    "Probability_Up", "Pred_Class", "True_Direction", "Correct", "Brier",
+]
+
+
+def _empty_summary() -> dict:
+    return {
+        "n": 0,
+        "correct": 0,
+        "brier_sum": 0.0,
+        "confusion": {"tp": 0, "fp": 0, "tn": 0, "fn": 0},
+        "per_symbol": {},
+        "daily": {},
+        "resolved_through": {},
+        "updated_at": None,
+    }
+
+
+def load_summary(data_dir: Path) -> dict:
+    path = Path(data_dir) / SUMMARY_NAME
+    if not path.exists():
+        return _empty_summary()
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return _empty_summary()
+
+
+def _save_summary(data_dir: Path, summary: dict) -> None:
+    path = Path(data_dir) / SUMMARY_NAME
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _to_datetime(series: pd.Series, fmt: str) -> pd.Series:
+    try:
+        return pd.to_datetime(series, format=fmt)
+    except (ValueError, TypeError):
+        return pd.to_datetime(series, errors="coerce")
+
+
+# ============================================================
+#   RESOLVE PENDING PREDICTIONS
+# ============================================================
+def resolve_predictions(
+    hist_df: pd.DataFrame,
+    price_df: pd.DataFrame,
+    resolved_through: dict,
+) -> pd.DataFrame:
+    """
+    Match each not-yet-resolved prediction to its realized next close.
+
+    A prediction made on `Date` is resolved by the symbol's next bar
+    after `Date` (computed per symbol, never across symbol boundaries).
+    Predictions whose next bar has not arrived yet stay pending.
+    """
+
+    hist = hist_df.dropna(subset=["Predicted_Direction", "Probability_Up"])
+    hist = hist[["Date", "Symbol", "Predicted_Direction", "Probability_Up"]].copy()
+
+    # Only predictions after the last resolved date of each symbol
+    last = hist["Symbol"].map(resolved_through)
+    last = pd.to_datetime(last, errors="coerce")
+    pending = hist[last.isna() | (hist["Date"] > last)]
+
+    if pending.empty:
+        return pd.DataFrame(columns=OUTCOME_COLS)
+
+    # Next bar per symbol – only the price tail after the oldest pending date
+    prices = price_df.loc[
+        price_df["Date"] >= pending["Date"].min(), ["Date", "Symbol", "Close"]
+    ]
+    prices = prices.sort_values(["Symbol", "Date"])
+    prices["Next_Close"] = prices.groupby("Symbol")["Close"].shift(-1)
+
+    out = pending.merge(prices, on=["Date", "Symbol"], how="inner")
+    out = out.dropna(subset=["Next_Close"])
+    if out.empty:
+        return pd.DataFrame(columns=OUTCOME_COLS)
+
+    prob = out["Probability_Up"].astype(float)
+    out["Pred_Class"] = (out["Predicted_Direction"] == "UP").astype(int)
+    out["True_Direction"] = (out["Next_Close"] > out["Close"]).astype(int)
+    out["Correct"] = (out["Pred_Class"] == out["True_Direction"]).astype(int)
+    out["Brier"] = (prob - out["True_Direction"]) ** 2
+
+    return out[OUTCOME_COLS].sort_values(["Date", "Symbol"]).reset_index(drop=True)
+
+
+# ============================================================
+#   RUNNING AGGREGATES
+# ============================================================
+def _accumulate(summary: dict, outcomes: pd.DataFrame) -> dict:
+    """Fold newly resolved outcomes into the running aggregates."""
+
+    pred = outcomes["Pred_Class"].to_numpy()
+    true = outcomes["True_Direction"].to_numpy()
+
+    summary["n"] += int(len(outcomes))
+    summary["correct"] += int(outcomes["Correct"].sum())
+    summary["brier_sum"] += float(outcomes["Brier"].sum())
+
+    conf = summary["confusion"]
+    conf["tp"] += int(np.sum((pred == 1) & (true == 1)))
+    conf["fp"] += int(np.sum((pred == 1) & (true == 0)))
+    conf["tn"] += int(np.sum((pred == 0) & (true == 0)))
+    conf["fn"] += int(np.sum((pred == 0) & (true == 1)))
+
+    by_symbol = outcomes.groupby("Symbol").agg(
+        n=("Correct", "size"), correct=("Correct", "sum"), brier_sum=("Brier", "sum")
+    )
+    for sym, row in by_symbol.iterrows():
+        agg = summary["per_symbol"].setdefault(sym, {"n": 0, "correct": 0, "brier_sum": 0.0})
+        agg["n"] += int(row["n"])
+        agg["correct"] += int(row["correct"])
+        agg["brier_sum"] += float(row["brier_sum"])
+
+    dates = outcomes["Date"].dt.strftime("%Y-%m-%d")
+    by_day = outcomes.groupby(dates).agg(n=("Correct", "size"), correct=("Correct", "sum"))
+    for day, row in by_day.iterrows():
+        agg = summary["daily"].setdefault(day, {"n": 0, "correct": 0})
+        agg["n"] += int(row["n"])
+        agg["correct"] += int(row["correct"])
+
+    last_dates = outcomes.groupby("Symbol")["Date"].max().dt.strftime("%Y-%m-%d")
+    summary["resolved_through"].update(last_dates.to_dict())
+
+    return summary
+
+
+# ============================================================
+#   DAILY UPDATE (called by run_daily.py)
+# ============================================================
+def update_evaluation_store(
+    data_dir: Path,
+    hist_df: pd.DataFrame,
+    price_df: pd.DataFrame,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Resolve pending predictions, append them to prediction_outcomes.csv
+    and update evaluation_summary.json incrementally.
+
+    `price_df` may be the raw stock_data.csv frame (DD-MM-YYYY dates).
+    Returns (new outcomes, updated summary).
+    """
+
+    data_dir = Path(data_dir)
+    summary = load_summary(data_dir)
+
+    hist = hist_df.copy()
+    if not pd.api.types.is_datetime64_any_dtype(hist["Date"]):
+        hist["Date"] = _to_datetime(hist["Date"], "%Y-%m-%d")
+    hist["Probability_Up"] = pd.to_numeric(hist["Probability_Up"], errors="coerce")
+
+    prices = price_df[["Date", "Symbol", "Close"]].copy()
+    if not pd.api.types.is_datetime64_any_dtype(prices["Date"]):
+        prices["Date"] = _to_datetime(prices["Date"], "%d-%m-%Y")
+    prices["Close"] = pd.to_numeric(prices["Close"], errors="coerce")
+
+    outcomes = resolve_predictions(hist, prices, summary["resolved_through"])
+    if outcomes.empty:
+        return outcomes, summary
+
+    out_path = data_dir / OUTCOMES_NAME
+    to_write = outcomes.copy()
+    to_write["Date"] = to_write["Date"].dt.strftime("%Y-%m-%d")
+    to_write.to_csv(out_path, mode="a", header=not out_path.exists(), index=False)
+
+    summary = _accumulate(summary, outcomes)
+    summary["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    _save_summary(data_dir, summary)
+
+    return outcomes, summary
+
+
+# ============================================================
+#   READ-SIDE HELPERS (Performance page)
+# ============================================================
+def rolling_accuracy(summary: dict, window: int = 20) -> pd.DataFrame:
+    """Rolling accuracy over the last `window` resolved trading days."""
+
+    if not summary.get("daily"):
+        return pd.DataFrame(columns=["Date", "Accuracy", "Rolling_Accuracy"])
+
+    daily = pd.DataFrame.from_dict(summary["daily"], orient="index")
+    daily.index = pd.to_datetime(daily.index)
+    daily = daily.sort_index()
+
+    daily["Accuracy"] = daily["correct"] / daily["n"]
+    daily["Rolling_Accuracy"] = (
+        daily["correct"].rolling(window, min_periods=1).sum()
+        / daily["n"].rolling(window, min_periods=1).sum()
+    )
+
+    return daily.rename_axis("Date").reset_index()
+
+
+def per_symbol_table(summary: dict) -> pd.DataFrame:
+    if not summary.get("per_symbol"):
+        return pd.DataFrame(columns=["Symbol", "Predictions", "Accuracy", "Brier"])
+
+    df = pd.DataFrame.from_dict(summary["per_symbol"], orient="index")
+    df["Accuracy"] = df["correct"] / df["n"]
+    df["Brier"] = df["brier_sum"] / df["n"]
+    df = df.rename(columns={"n": "Predictions"})[["Predictions", "Accuracy", "Brier"]]
+
+    return df.rename_axis("Symbol").reset_index().sort_values("Accuracy", ascending=False)
+
+
+def confusion_matrix_frame(summary: dict) -> pd.DataFrame:
+    conf = summary["confusion"]
+    return pd.DataFrame(
+        [[conf["tp"], conf["fn"]], [conf["fp"], conf["tn"]]],
+        index=["Actual UP", "Actual DOWN"],
+        columns=["Predicted UP", "Predicted DOWN"],
+    )
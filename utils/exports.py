@@ -0,0 +1,403 @@
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+
+# ============================================================
+#   EXPORTABLE DATASETS
+# ============================================================
+# Each dataset is a CSV produced by the pipeline. The exports are
+# built from these files once per data version (by run_daily.py),
+# so the Downloads page only has to hand back a ready-made file.
+DATASETS = {
+    "stock_data": {
+        "file": "stock_data.csv",
+        "date_format": "%d-%m-%Y",
+        # Built from the partitioned price store when it exists
+        "store": "store",
+    },
+    "latest_predictions": {
+        "file": "latest_predictions.csv",
+        "date_format": "%Y-%m-%d",
+    },
+    "predictions_history": {
+        "file": "predictions_history.csv",
+        "date_format": "%Y-%m-%d",
+    },
+}
+
+EXPORT_DIRNAME = "exports"
+MANIFEST_NAME = "manifest.json"
+CHUNK_ROWS = 200_000
+
+# Last rows of every export, kept in a small side file for the page preview
+PREVIEW_ROWS = 200
+
+
+def get_export_dir(base_dir: Path) -> Path:
+    return Path(base_dir) / "data" / EXPORT_DIRNAME
+
+
+# ============================================================
+#   DATA VERSION (cheap fingerprint of a source file)
+# ============================================================
+def dataset_version(path: Path) -> str:
+    """
+    Short fingerprint of a file based on its size + modification time.
+    Changes whenever the pipeline rewrites the file, without reading it.
+    """
+    stat = Path(path).stat()
+    key = f"{stat.st_size}-{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+# ============================================================
+#   MANIFEST
+# ============================================================
+def load_manifest(export_dir: Path) -> dict:
+    path = Path(export_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(export_dir: Path, manifest: dict) -> None:
+    # Write to a temp file first so readers never see half a manifest
+    path = Path(export_dir) / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ============================================================
+#   BUILD COMPRESSED ARTIFACTS
+# ============================================================
+def _iter_chunks(src):
+    """Source chunks: a CSV path, or a callable returning a chunk iterator."""
+    return src() if callable(src) else pd.read_csv(src, chunksize=CHUNK_ROWS)
+
+
+def _store_source(store_dir: Path, date_format: str):
+    """(version, chunk factory) for one snapshot of the price store, or None."""
+    from utils.price_store import PriceStore
+
+    store = PriceStore(store_dir)
+    if not store.exists():
+        return None
+
+    snapshot = store.snapshot()
+
+    def chunks():
+        for chunk in snapshot.iter_symbol_chunks(CHUNK_ROWS):
+            chunk = chunk.copy()
+            chunk["Date"] = chunk["Date"].dt.strftime(date_format)
+            yield chunk
+
+    return dataset_version(store.manifest_path), chunks
+
+
+def _write_csv_gz(src: Path, dest: Path, tail_dest: Path, date_format: str) -> dict:
+    """
+    Stream the source CSV into a gzip CSV chunk by chunk; its last
+    PREVIEW_ROWS rows also go to the plain CSV `tail_dest`.
+    Returns row count, symbols and date range for the manifest.
+    """
+    rows = 0
+    symbols = set()
+    date_min = date_max = None
+    tail = None
+    tmp = dest.with_name(dest.name + ".tmp")
+
+    with gzip.open(tmp, "wt", encoding="utf-8", newline="") as out:
+        for i, chunk in enumerate(_iter_chunks(src)):
+            chunk.to_csv(out, index=False, header=(i == 0))
+            rows += len(chunk)
+            tail = chunk if tail is None else pd.concat([tail, chunk.tail(PREVIEW_ROWS)])
+            tail = tail.tail(PREVIEW_ROWS)
+
+            if "Symbol" in chunk.columns:
+                symbols.update(chunk["Symbol"].dropna().astype(str).unique())
+
+            if "Date" in chunk.columns:
+                dates = pd.to_datetime(chunk["Date"], format=date_format, errors="coerce")
+                lo, hi = dates.min(), dates.max()
+                if pd.notna(lo):
+                    date_min = lo if date_min is None else min(date_min, lo)
+                    date_max = hi if date_max is None else max(date_max, hi)
+
+    os.replace(tmp, dest)
+
+    tmp = tail_dest.with_name(tail_dest.name + ".tmp")
+    (tail if tail is not None else pd.DataFrame()).to_csv(tmp, index=False)
+    os.replace(tmp, tail_dest)
+
+    return {
+        "rows": rows,
+        "symbols": sorted(symbols),
+        "date_min": date_min.strftime("%Y-%m-%d") if date_min is not None else None,
+        "date_max": date_max.strftime("%Y-%m-%d") if date_max is not None else None,
+    }
+
+
+def _write_parquet(src: Path, dest: Path) -> bool:
+    """
+    Columnar copy of the source CSV (needs pyarrow).
+    Returns False when pyarrow is not installed.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return False
+
+    tmp = dest.with_name(dest.name + ".tmp")
+    writer = None
+
+    try:
+        for chunk in _iter_chunks(src):
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(tmp, table.schema, compression="zstd")
+            else:
+                table = pa.Table.from_pandas(
+                    chunk, schema=writer.schema, preserve_index=False
+                )
+            writer.write_table(table)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Column types drifted between chunks; the CSV export still exists
+        if writer is not None:
+            writer.close()
+            writer = None
+        tmp.unlink(missing_ok=True)
+        return False
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if not tmp.exists():
+        return False
+
+    os.replace(tmp, dest)
+    return True
+
+
+def _prune_old_versions(export_dir: Path, name: str, keep: set) -> None:
+    for path in export_dir.glob(f"{name}-*"):
+        if path.name not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def build_exports(base_dir: Path, force: bool = False) -> dict:
+    """
+    Build versioned, compressed exports (gzip CSV + Parquet) for every
+    dataset in DATASETS. A dataset is only rebuilt when its source file
+    changed since the last build.
+
+    Returns the updated manifest.
+    """
+    data_dir = Path(base_dir) / "data"
+    export_dir = get_export_dir(base_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(export_dir)
+    kept_files: dict[str, list] = {}
+
+    for name, spec in DATASETS.items():
+        src = data_dir / spec["file"]
+        store = _store_source(data_dir / spec["store"], spec["date_format"]) if "store" in spec else None
+        if store is not None:
+            version, src = store
+        elif not src.exists():
+            continue
+        else:
+            version = dataset_version(src)
+
+        entry = manifest.get(name, {})
+
+        up_to_date = (
+            not force
+            and entry.get("version") == version
+            and "tail" in entry.get("files", {})
+            and all((export_dir / f).exists() for f in entry.get("files", {}).values())
+        )
+        if up_to_date:
+            kept_files[name] = list(entry["files"].values())
+            continue
+
+        files = {}
+
+        csv_name = f"{name}-{version}.csv.gz"
+        tail_name = f"{name}-{version}.tail.csv"
+        stats = _write_csv_gz(src, export_dir / csv_name, export_dir / tail_name, spec["date_format"])
+        files["csv.gz"] = csv_name
+        files["tail"] = tail_name
+
+        parquet_name = f"{name}-{version}.parquet"
+        if _write_parquet(src, export_dir / parquet_name):
+            files["parquet"] = parquet_name
+
+        previous = list(entry.get("files", {}).values())
+        manifest[name] = {
+            "version": version,
+            "source": spec["file"],
+            "date_format": spec["date_format"],
+            "files": files,
+            **stats,
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        # Keep the previous version around for downloads already in flight
+        kept_files[name] = list(files.values()) + previous
+
+    _write_manifest(export_dir, manifest)
+
+    for name, keep in kept_files.items():
+        _prune_old_versions(export_dir, name, set(keep))
+
+    return manifest
+
+
+# ============================================================
+#   PREVIEW (LAST N ROWS OF AN EXPORT)
+# ============================================================
+def read_export_tail(export_dir: Path, name: str, rows: int = PREVIEW_ROWS) -> pd.DataFrame:
+    """
+    Last `rows` (≤ PREVIEW_ROWS) rows of a prebuilt export, from the small
+    tail file written alongside it – the export itself is never opened.
+    """
+    entry = load_manifest(export_dir).get(name)
+    if not entry or "tail" not in entry["files"]:
+        return pd.DataFrame()
+
+    try:
+        tail = pd.read_csv(Path(export_dir) / entry["files"]["tail"])
+    except (OSError, pd.errors.EmptyDataError):
+        return pd.DataFrame()
+    return tail.tail(rows).reset_index(drop=True)
+
+
+# ============================================================
+#   FILTERED EXPORT (STREAMED IN CHUNKS)
+# ============================================================
+def iter_filtered_csv(
+    export_dir: Path,
+    name: str,
+    symbols=None,
+    start=None,
+    end=None,
+    chunksize: int = CHUNK_ROWS,
+):
+    """
+    Yield UTF-8 CSV bytes for the rows of a prebuilt export matching
+    the symbol list and [start, end] date range.
+
+    The prebuilt gzip CSV is read chunk by chunk, so memory stays
+    bounded by `chunksize` regardless of dataset size.
+    """
+    entry = load_manifest(export_dir).get(name)
+    if not entry or "csv.gz" not in entry["files"]:
+        return
+
+    path = Path(export_dir) / entry["files"]["csv.gz"]
+    date_format = entry.get("date_format")
+    symbols = set(symbols) if symbols else None
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    header = True
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        mask = pd.Series(True, index=chunk.index)
+
+        if symbols is not None and "Symbol" in chunk.columns:
+            mask &= chunk["Symbol"].isin(symbols)
+
+        if (start is not None or end is not None) and "Date" in chunk.columns:
+            dates = pd.to_datetime(chunk["Date"], format=date_format, errors="coerce")
+            if start is not None:
+                mask &= dates >= start
+            if end is not None:
+                mask &= dates <= end
+
+        part = chunk[mask]
+        if part.empty and not header:
+            continue
+
+        yield part.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def write_filtered_export(
+    export_dir: Path,
+    name: str,
+    symbols=None,
+    start=None,
+    end=None,
+) -> Path | None:
+    """
+    Write a filtered gzip CSV export next to the prebuilt files and
+    return its path. Results are reused for the same filter + version.
+    """
+    entry = load_manifest(export_dir).get(name)
+    if not entry:
+        return None
+
+    key = json.dumps(
+        [
+            entry["version"],
+            sorted(symbols) if symbols else None,
+            str(start) if start is not None else None,
+            str(end) if end is not None else None,
+        ]
+    )
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+    out_dir = Path(export_dir) / "filtered"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dest = out_dir / f"{name}-{entry['version']}-{digest}.csv.gz"
+
+    if dest.exists():
+        return dest
+
+    # Filtered files are disposable: drop exports of older data versions
+    for old in out_dir.glob(f"{name}-*.csv.gz"):
+        if not old.name.startswith(f"{name}-{entry['version']}-"):
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    tmp = dest.with_name(dest.name + ".tmp")
+    with gzip.open(tmp, "wb") as out:
+        for block in iter_filtered_csv(export_dir, name, symbols, start, end):
+            out.write(block)
+    os.replace(tmp, dest)
+
+    return dest
+
+
+# ============================================================
+#   ENTRY POINT  (python -m utils.exports)
+# ============================================================
+def main() -> None:
+    base_dir = Path(__file__).resolve().parents[1]
+    manifest = build_exports(base_dir)
+
+    for name, entry in manifest.items():
+        print(f"📦 {name}: {entry['rows']} rows → {', '.join(entry['files'].values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.panel import PricePanel
+
+
+# ============================================================
+#   OUT-OF-CORE TRAINING MATRIX (float32 memmap on disk)
+# ============================================================
+# For histories larger than RAM, train_model.py --out-of-core streams
+# whole-symbol chunks out of the price store (or the legacy
+# stock_data.csv), computes features chunk by
+# chunk and writes them into preallocated float32 memory-mapped arrays:
+#
+#     data/cache/train/X.npy        float32 (rows, features), C-contiguous
+#     data/cache/train/y_price.npy  float32 (rows,)
+#     data/cache/train/y_dir.npy    uint8   (rows,)
+#     data/cache/train/symbol.npy   int32   (rows,) index into "symbols"
+#
+# Rows keep the in-memory path's order (symbol, then date), so the
+# positional train/test split is unchanged. Only one chunk of raw +
+# feature frames is alive at any time; its size is derived from the
+# memory budget. The forests read X straight from the mapped file
+# (float32 is their native dtype, so sklearn does not copy it).
+#
+# The cross-sectional features need the whole universe at once: their
+# Close panel is filled chunk by chunk (read_close_panel), so it scales
+# with dates × symbols, not with rows, and stays outside the budget.
+
+MEMORY_BUDGET_MB = 1024
+
+# Rough peak bytes per raw CSV row while a chunk is featurized: the
+# parsed frame, per-symbol copies and ~20 float64 feature columns
+BYTES_PER_RAW_ROW = 1_000
+
+# Share of the budget for feature chunks; the rest is left for the
+# forests' own working memory and the OS page cache
+CHUNK_SHARE = 0.5
+
+CSV_READ_ROWS = 200_000
+
+
+def get_matrix_dir(base_dir: Path) -> Path:
+    return Path(base_dir) / "data" / "cache" / "train"
+
+
+def chunk_rows_for_budget(memory_budget_mb: float) -> int:
+    """Raw CSV rows per featurized chunk under the memory budget."""
+    rows = int(memory_budget_mb * 1024 * 1024 * CHUNK_SHARE / BYTES_PER_RAW_ROW)
+    return max(rows, 10_000)
+
+
+def count_rows(csv_path: Path) -> int:
+    """Data rows in the CSV (one narrow column, read in chunks)."""
+    return sum(len(c) for c in pd.read_csv(csv_path, usecols=["Symbol"], chunksize=1_000_000))
+
+
+def iter_symbol_chunks(csv_path: Path, chunk_rows: int):
+    """
+    Yield frames of COMPLETE symbols, each about `chunk_rows` rows.
+    The CSV must be grouped by symbol (nse_fetch writes it sorted).
+    A single symbol larger than chunk_rows is yielded on its own.
+    """
+    seen = set()
+    pending = []
+    pending_rows = 0
+    tail = None     # rows of the symbol that may continue in the next read
+
+    for block in pd.read_csv(csv_path, chunksize=min(chunk_rows, CSV_READ_ROWS)):
+        if tail is not None:
+            block = pd.concat([tail, block], ignore_index=True)
+
+        last = block["Symbol"].iat[-1]
+        is_last = (block["Symbol"] == last).to_numpy()
+        tail = block[is_last]
+        complete = block[~is_last]
+
+        for symbol in complete["Symbol"].unique():
+            if symbol in seen:
+                raise ValueError(f"{csv_path} is not grouped by symbol ({symbol} appears twice)")
+            seen.add(symbol)
+
+        if not complete.empty:
+            pending.append(complete)
+            pending_rows += len(complete)
+
+        if pending_rows >= chunk_rows:
+            yield pd.concat(pending, ignore_index=True)
+            pending, pending_rows = [], 0
+
+    if tail is not None and not tail.empty:
+        if tail["Symbol"].iat[0] in seen:
+            raise ValueError(f"{csv_path} is not grouped by symbol")
+        pending.append(tail)
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def read_close_panel(source, memory_budget_mb: float = MEMORY_BUDGET_MB) -> PricePanel:
+    """
+    Date × Symbol Close panel of the whole history (input of the
+    cross-sectional features), from a PriceStore or CSV in two chunked
+    passes: the first collects the axes, the second fills a preallocated
+    float32 (T, N) array. The long frame is never held in memory – the
+    panel costs dates × symbols × 5 bytes (~12 MB for 500 symbols × 20
+    years), independent of the row count.
+    """
+    if hasattr(source, "snapshot"):
+        snapshot = source.snapshot()
+        chunk_rows = chunk_rows_for_budget(memory_budget_mb)
+
+        def chunks():
+            return snapshot.iter_symbol_chunks(chunk_rows)
+    else:
+        def chunks():
+            return pd.read_csv(source, usecols=["Date", "Symbol", "Close"], chunksize=CSV_READ_ROWS)
+
+    def rows(chunk):
+        dates = chunk["Date"]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, format="%d-%m-%Y")
+        close = pd.to_numeric(chunk["Close"], errors="coerce").to_numpy(dtype=np.float32)
+        has = np.isfinite(close)
+        return pd.DatetimeIndex(dates[has]), chunk["Symbol"].to_numpy()[has], close[has]
+
+    # Pass 1: the axes (sorted, like PricePanel.from_long)
+    all_dates, all_symbols = set(), set()
+    for chunk in chunks():
+        d, s, _ = rows(chunk)
+        all_dates.update(d.unique())
+        all_symbols.update(pd.unique(s))
+    dates = pd.DatetimeIndex(sorted(all_dates))
+    symbols = pd.Index(sorted(all_symbols))
+
+    # Pass 2: fill
+    close = np.full((len(dates), len(symbols)), np.nan, dtype=np.float32)
+    valid = np.zeros(close.shape, dtype=bool)
+    for chunk in chunks():
+        d, s, c = rows(chunk)
+        t_idx, s_idx = dates.get_indexer(d), symbols.get_indexer(s)
+        close[t_idx, s_idx] = c
+        valid[t_idx, s_idx] = True
+
+    return PricePanel(dates, symbols, {"Close": close}, valid)
+
+
+def build_feature_memmap(
+    source,
+    out_dir: Path,
+    feature_fn,
+    memory_budget_mb: float = MEMORY_BUDGET_MB,
+    log=None,
+) -> dict:
+    """
+    Featurize `source` chunk by chunk into float32 memmaps in `out_dir`.
+    `source` is a PriceStore or the path of a symbol-grouped CSV.
+
+    `feature_fn(raw_df) -> (feat_df, feature_cols)` is train_model's
+    create_features (rows with NaN features / targets already dropped).
+
+    Returns:
+        {
+            "X", "y_price", "y_dir", "symbol": read-only memmaps of the filled rows,
+            "symbols": labels of the symbol codes,
+            "feature_cols", "n_rows", "n_symbols", "chunks", "chunk_rows",
+            "elapsed_s",
+        }
+    """
+    t0 = time.perf_counter()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Upper bound: feature rows never exceed raw rows
+    chunk_rows = chunk_rows_for_budget(memory_budget_mb)
+    if hasattr(source, "snapshot"):
+        snapshot = source.snapshot()
+        capacity = snapshot.rows
+        chunks = snapshot.iter_symbol_chunks(chunk_rows)
+    else:
+        capacity = count_rows(source)
+        chunks = iter_symbol_chunks(source, chunk_rows)
+
+    X = y_price = y_dir = symbol = None
+    feature_cols = None
+    symbols = []
+    n = n_symbols = n_chunks = 0
+
+    for raw in chunks:
+        feat, cols = feature_fn(raw)
+        del raw
+
+        if X is None:
+            feature_cols = cols
+            X = np.lib.format.open_memmap(out_dir / "X.npy", "w+", np.float32, (max(capacity, 1), len(cols)))
+            y_price = np.lib.format.open_memmap(out_dir / "y_price.npy", "w+", np.float32, (max(capacity, 1),))
+            y_dir = np.lib.format.open_memmap(out_dir / "y_dir.npy", "w+", np.uint8, (max(capacity, 1),))
+            symbol = np.lib.format.open_memmap(out_dir / "symbol.npy", "w+", np.int32, (max(capacity, 1),))
+
+        m = len(feat)
+        X[n:n + m] = feat[feature_cols].to_numpy(dtype=np.float32)
+        y_price[n:n + m] = feat["Next_Close"].to_numpy(dtype=np.float32)
+        y_dir[n:n + m] = feat["Direction"].to_numpy(dtype=np.uint8)
+
+        # Chunks hold complete symbols → codes continue from the previous chunk
+        codes, names = pd.factorize(feat["Symbol"])
+        symbol[n:n + m] = codes + len(symbols)
+        symbols.extend(names)
+
+        n += m
+        n_symbols += len(names)
+        n_chunks += 1
+        if log is not None:
+            log.event("feature_chunk", chunk=n_chunks, rows=m, filled=n)
+        print(f"   🧱 chunk {n_chunks}: {m:,} feature rows ({n:,} / ≤{capacity:,})")
+        del feat
+
+    if X is None:
+        return {}
+
+    for arr in (X, y_price, y_dir, symbol):
+        arr.flush()
+    del X, y_price, y_dir, symbol
+
+    # Reopen read-only, sliced to the rows actually written (views, no copy)
+    X = np.load(out_dir / "X.npy", mmap_mode="r")[:n]
+    y_price = np.load(out_dir / "y_price.npy", mmap_mode="r")[:n]
+    y_dir = np.load(out_dir / "y_dir.npy", mmap_mode="r")[:n]
+    symbol = np.load(out_dir / "symbol.npy", mmap_mode="r")[:n]
+
+    return {
+        "X": X,
+        "y_price": y_price,
+        "y_dir": y_dir,
+        "symbol": symbol,
+        "symbols": symbols,
+        "feature_cols": feature_cols,
+        "n_rows": n,
+        "n_symbols": n_symbols,
+        "chunks": n_chunks,
+        "chunk_rows": chunk_rows,
+        "elapsed_s": time.perf_counter() - t0,
+    }
+
+
+def predict_in_chunks(model, X, chunk_rows: int = 200_000, proba: bool = False) -> np.ndarray:
+    """model.predict (or predict_proba[:, 1]) over row blocks of a memmap or frame."""
+    out = []
+    for i in range(0, len(X), chunk_rows):
+        block = X.iloc[i:i + chunk_rows] if hasattr(X, "iloc") else np.asarray(X[i:i + chunk_rows])
+        out.append(model.predict_proba(block)[:, 1] if proba else model.predict(block))
+    return np.concatenate(out) if out else np.empty(0)
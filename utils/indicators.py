@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+#   WIDE (DATE × SYMBOL) INDICATORS
+# ============================================================
+# Every function takes DataFrames indexed by Date with one column per
+# symbol and computes the indicator for ALL symbols at once (pandas
+# rolling / ewm run column-wise in C). Rows before a symbol's first bar
+# are NaN and stay NaN.
+
+
+def to_wide(df: pd.DataFrame, field: str) -> pd.DataFrame:
+    """Long (Date, Symbol, field) frame → Date × Symbol frame."""
+    df = df.drop_duplicates(subset=["Date", "Symbol"], keep="last")
+    return df.pivot(index="Date", columns="Symbol", values=field).sort_index()
+
+
+def wide_sma(close: pd.DataFrame, window: int) -> pd.DataFrame:
+    return close.rolling(window).mean()
+
+
+def wide_rsi(close: pd.DataFrame, window: int = 14) -> pd.DataFrame:
+    """RSI with Wilder smoothing (same formula as ta.momentum.rsi)."""
+    diff = close.diff(1)
+
+    # First bar of each symbol counts as "no move", like ta does
+    up = diff.where(diff > 0, 0.0).where(close.notna())
+    down = (-diff).where(diff < 0, 0.0).where(close.notna())
+
+    ema_up = up.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    ema_down = down.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + ema_up / ema_down)
+
+    return rsi.where(ema_down != 0, 100.0).where(ema_up.notna())
+
+
+def wide_atr(
+    high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame, window: int = 14
+) -> pd.DataFrame:
+    """Average True Range with Wilder smoothing, for every symbol at once."""
+    prev_close = close.shift(1)
+
+    true_range = np.fmax(
+        (high - low).to_numpy(),
+        np.fmax((high - prev_close).abs().to_numpy(), (low - prev_close).abs().to_numpy()),
+    )
+    true_range = pd.DataFrame(true_range, index=close.index, columns=close.columns)
+
+    return true_range.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
@@ -3,6 +3,21 @@ from pathlib import Path
 import pandas as pd
 import streamlit as st
 
+from utils.drift import LIVE_FILE as DRIFT_LIVE_FILE, reference_path
+from utils.evaluation import OUTCOMES_NAME, load_summary
+from utils.exports import dataset_version, get_export_dir, load_manifest, read_export_tail
+from utils.online_model import load_online_info
+from utils.price_store import PriceStore
+from utils.resources import (
+    build_rolling_covariance,
+    get_feature_sketch,
+    get_model_dir,
+    get_price_frame,
+    get_price_panel,
+    get_rolling_covariance,
+)
+from utils.risk import STATE_FILE as RISK_STATE_FILE
+
 
 # ============================================================
 #   AUTO-DETECT BASE DIRECTORY (WORKS ON ANY COMPUTER / CLOUD)
@@ -20,34 +35,88 @@ def get_base_dir() -> Path:
 
 
 # ============================================================
-#   LOAD HISTORICAL PRICE DATA (stock_data.csv)
+#   LOAD HISTORICAL PRICE DATA (price store, else stock_data.csv)
 # ============================================================
-@st.cache_data
+def get_price_source() -> Path:
+    """data/store when the partitioned store exists, else the legacy CSV."""
+    store = PriceStore(get_base_dir() / "data" / "store")
+    return store.root if store.exists() else get_base_dir() / "data" / "stock_data.csv"
+
+
 def load_price_data() -> pd.DataFrame:
-    base_dir = get_base_dir()
-    path = base_dir / "data" / "stock_data.csv"
+    """
+    Process-wide shared price frame (see utils/resources.py).
+    Read-only: filter or copy before modifying.
+    """
+    path = get_price_source()
 
     if not path.exists():
         st.error(f"❌ Prices file not found: {path}")
         return pd.DataFrame()
 
-    df = pd.read_csv(path)
+    return get_price_frame(str(path), get_price_data_version())
 
-    # Convert Date column
-    # stock_data.csv uses DD-MM-YYYY format
-    try:
-        df["Date"] = pd.to_datetime(df["Date"], format="%d-%m-%Y")
-    except:
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
 
-    # Convert numeric fields
-    numeric_cols = ["Open", "High", "Low", "Close", "Volume"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+def load_price_panel():
+    """
+    Process-wide shared Date × Symbol panel of the same prices (see
+    utils/panel.py). None when there is no price data.
+    """
+    path = get_price_source()
 
-    df = df.dropna(subset=["Open", "High", "Low", "Close"])
+    if not path.exists():
+        st.error(f"❌ Prices file not found: {path}")
+        return None
 
-    return df
+    return get_price_panel(str(path), get_price_data_version())
+
+
+# ============================================================
+#   PRICE DATA VERSION (changes with every store commit / CSV rewrite)
+# ============================================================
+def get_price_data_version() -> str:
+    # Store: fingerprint of manifest.json, rewritten on every commit (stat only)
+    path = get_price_source()
+    if path.is_dir():
+        path = PriceStore(path).manifest_path
+    return dataset_version(path) if path.exists() else ""
+
+
+# ============================================================
+#   ROLLING COVARIANCE (advanced daily by run_daily.py)
+# ============================================================
+def load_risk_model():
+    """
+    Shared RollingCovariance: the persisted state when run_daily.py has
+    written one, else built from the price history. None without prices.
+    """
+    if RISK_STATE_FILE.exists():
+        return get_rolling_covariance(str(RISK_STATE_FILE), dataset_version(RISK_STATE_FILE))
+
+    path = get_price_source()
+    if not path.exists():
+        return None
+    return build_rolling_covariance(str(path), get_price_data_version())
+
+
+# ============================================================
+#   CHART INDICATORS (full history, cached per symbol + data version)
+# ============================================================
+@st.cache_data(max_entries=64)
+def load_symbol_indicators(symbol: str, data_version: str) -> pd.DataFrame:
+    """
+    SMA / RSI / MACD computed once over the symbol's FULL history.
+    Pages slice the lookback afterwards, so values at the window edge
+    are fully warmed up and widget changes never recompute indicators.
+    """
+    # Lazy import: plotly/ta are only loaded by pages that draw charts
+    from utils.charts import add_indicators
+
+    df = load_price_data()
+    if df.empty:
+        return df
+
+    return add_indicators(df[df["Symbol"] == symbol]).reset_index(drop=True)
 
 
 # ============================================================
@@ -108,3 +177,88 @@ def load_prediction_history() -> pd.DataFrame:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
     return df
+
+
+def get_prediction_history_version() -> str:
+    path = get_base_dir() / "data" / "predictions_history.csv"
+    return dataset_version(path) if path.exists() else ""
+
+
+# ============================================================
+#   LOAD LATEST FEATURES (latest_features.csv – one row per symbol)
+# ============================================================
+@st.cache_data
+def load_latest_features(data_version: str) -> pd.DataFrame:
+    path = get_base_dir() / "data" / "latest_features.csv"
+
+    if not path.exists():
+        return pd.DataFrame()
+
+    df = pd.read_csv(path)
+
+    try:
+        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
+    except:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+
+    return df
+
+
+def get_latest_features_version() -> str:
+    path = get_base_dir() / "data" / "latest_features.csv"
+    return dataset_version(path) if path.exists() else ""
+
+
+# ============================================================
+#   EVALUATION STORE (resolved predictions + running aggregates)
+# ============================================================
+def load_evaluation_summary() -> dict:
+    # Small JSON of running aggregates maintained by run_daily.py
+    return load_summary(get_base_dir() / "data")
+
+
+@st.cache_data
+def load_prediction_outcomes(updated_at: str, rows: int = 1000) -> pd.DataFrame:
+    # `updated_at` (from the summary) keys the cache to the latest update
+    path = get_base_dir() / "data" / OUTCOMES_NAME
+
+    if not path.exists():
+        return pd.DataFrame()
+
+    df = pd.read_csv(path).tail(rows)
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+
+    return df
+
+
+# ============================================================
+#   FEATURE DRIFT SKETCHES (model reference + live, see utils/drift.py)
+# ============================================================
+def load_drift_sketches() -> tuple:
+    """(reference, live) FeatureSketch pair; None for a missing file."""
+    sketches = []
+    for path in (reference_path(get_model_dir()), DRIFT_LIVE_FILE):
+        sketches.append(get_feature_sketch(str(path), dataset_version(path)) if path.exists() else None)
+    return tuple(sketches)
+
+
+# ============================================================
+#   ONLINE DIRECTION MODEL STATS (see utils/online_model.py)
+# ============================================================
+def load_online_stats() -> dict:
+    # Small JSON rewritten once per run – read fresh, never unpickle the model
+    return load_online_info(get_model_dir())
+
+
+# ============================================================
+#   PREBUILT EXPORTS (data/exports/manifest.json)
+# ============================================================
+def load_export_manifest() -> dict:
+    # Tiny JSON file – read fresh so new builds show up immediately
+    return load_manifest(get_export_dir(get_base_dir()))
+
+
+@st.cache_data
+def load_export_preview(name: str, version: str, rows: int = 200) -> pd.DataFrame:
+    # `version` is part of the cache key: a rebuilt export refreshes the preview
+    return read_export_tail(get_export_dir(get_base_dir()), name, rows)
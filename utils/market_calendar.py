@@ -0,0 +1,92 @@
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+
+# ============================================================
+#   NSE TRADING CALENDAR (local holiday file)
+# ============================================================
+# data/nse_holidays.csv lists exchange holidays (Date YYYY-MM-DD,
+# Description). Weekends are always closed. Update the file once a year
+# from the NSE holiday circular – for years it does not cover, only
+# weekends are treated as closed and calendar_years() shows the gap.
+
+IST = timezone(timedelta(hours=5, minutes=30))   # no DST in India
+MARKET_CLOSE = time(15, 30)
+
+HOLIDAY_FILE = Path(__file__).resolve().parents[1] / "data" / "nse_holidays.csv"
+
+
+@lru_cache(maxsize=4)
+def _load_holidays(path: str, mtime_ns: int) -> dict:
+    df = pd.read_csv(path)
+    dates = pd.to_datetime(df["Date"], format="%Y-%m-%d").dt.date
+    return dict(zip(dates, df["Description"].fillna("")))
+
+
+def load_holidays(path: Path | None = None) -> dict:
+    """{date: description}; empty when the holiday file is missing."""
+    path = Path(path or HOLIDAY_FILE)
+    if not path.exists():
+        return {}
+    return _load_holidays(str(path), path.stat().st_mtime_ns)
+
+
+def calendar_years(path: Path | None = None) -> list[int]:
+    """Years covered by the holiday file."""
+    return sorted({d.year for d in load_holidays(path)})
+
+
+def now_ist() -> datetime:
+    return datetime.now(IST)
+
+
+def is_trading_day(day: date, holidays: dict | None = None) -> bool:
+    holidays = load_holidays() if holidays is None else holidays
+    return day.weekday() < 5 and day not in holidays
+
+
+def next_trading_day(day: date, holidays: dict | None = None) -> date:
+    """First trading day strictly after `day`."""
+    holidays = load_holidays() if holidays is None else holidays
+    day += timedelta(days=1)
+    while not is_trading_day(day, holidays):
+        day += timedelta(days=1)
+    return day
+
+
+def previous_trading_day(day: date, holidays: dict | None = None) -> date:
+    """Last trading day strictly before `day`."""
+    holidays = load_holidays() if holidays is None else holidays
+    day -= timedelta(days=1)
+    while not is_trading_day(day, holidays):
+        day -= timedelta(days=1)
+    return day
+
+
+def last_closed_session(now: datetime | None = None, holidays: dict | None = None) -> date:
+    """Most recent trading day whose session has already closed."""
+    now = (now or now_ist()).astimezone(IST)
+    holidays = load_holidays() if holidays is None else holidays
+    today = now.date()
+    if is_trading_day(today, holidays) and now.time() >= MARKET_CLOSE:
+        return today
+    return previous_trading_day(today, holidays)
+
+
+def session_close(day: date) -> datetime:
+    """Closing time of `day`'s session as an aware IST datetime."""
+    return datetime.combine(day, MARKET_CLOSE, tzinfo=IST)
+
+
+def upcoming_holidays(days: int = 60, now: datetime | None = None) -> pd.DataFrame:
+    """Holidays in the next `days` calendar days (Admin page)."""
+    today = (now or now_ist()).date()
+    rows = [
+        {"Date": d, "Holiday": name}
+        for d, name in sorted(load_holidays().items())
+        if today <= d <= today + timedelta(days=days)
+    ]
+    return pd.DataFrame(rows, columns=["Date", "Holiday"])
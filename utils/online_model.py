@@ -0,0 +1,237 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.evaluation import _to_datetime, resolve_predictions
+
+
+# ============================================================
+#   ONLINE DIRECTION MODEL (optional, learns every day)
+# ============================================================
+# The random forest only learns when train_model.py retrains it on the
+# whole history. This optional companion is a logistic-loss SGD
+# classifier on standardized features that keeps learning with
+# partial_fit:
+#
+#     model/online_dir_model.pkl      running StandardScaler + SGDClassifier
+#     model/online_model_info.json    feature columns, per-symbol learned
+#                                     dates, accuracy vs. the forest
+#
+# • created by `python train_model.py --online` (one pass over the
+#   training window: scaler statistics first, then SGD)
+# • run_daily.py resolves the previous run's feature rows against the
+#   realized next close and learns from them – O(symbols) per day
+# • every pair is scored BEFORE it is learned (test-then-train), so the
+#   reported accuracy is out-of-sample, and the forest's probability for
+#   the same row is scored alongside for a like-for-like comparison
+
+ONLINE_MODEL_NAME = "online_dir_model.pkl"
+ONLINE_INFO_NAME = "online_model_info.json"
+
+SGD_PARAMS = dict(loss="log_loss", alpha=1e-4, random_state=42)
+
+
+class OnlineDirectionModel:
+    def __init__(self, feature_cols: list):
+        # sklearn is only imported where the model is actually used
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.preprocessing import StandardScaler
+
+        self.feature_cols = list(feature_cols)
+        self.scaler = StandardScaler()
+        self.clf = SGDClassifier(**SGD_PARAMS)
+        self.n_seen = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.n_seen > 0
+
+    def _matrix(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_cols]
+        return np.asarray(X, dtype=np.float64)
+
+    def partial_fit(self, X, y, update_scaler: bool = True) -> None:
+        X = self._matrix(X)
+        if update_scaler:
+            self.scaler.partial_fit(X)
+        self.clf.partial_fit(self.scaler.transform(X), np.asarray(y, dtype=int), classes=[0, 1])
+        self.n_seen += len(X)
+
+    def predict_proba_up(self, X) -> np.ndarray:
+        return self.clf.predict_proba(self.scaler.transform(self._matrix(X)))[:, 1]
+
+    def predict(self, X) -> np.ndarray:
+        # sklearn-style, so predict_in_chunks works on it
+        return (self.predict_proba_up(X) >= 0.5).astype(int)
+
+
+# ============================================================
+#   BOOTSTRAP (train_model.py --online)
+# ============================================================
+def bootstrap_online_model(X, y, feature_cols: list, chunk_rows: int = 100_000) -> OnlineDirectionModel:
+    """
+    One pass over the training window in row blocks (frames or memmaps).
+    The scaler sees every block first, so SGD never trains on scaling
+    that is still moving.
+    """
+    model = OnlineDirectionModel(feature_cols)
+
+    def rows(i):
+        block = X.iloc[i:i + chunk_rows] if hasattr(X, "iloc") else X[i:i + chunk_rows]
+        return model._matrix(block)
+
+    for i in range(0, len(X), chunk_rows):
+        model.scaler.partial_fit(rows(i))
+    for i in range(0, len(X), chunk_rows):
+        model.partial_fit(rows(i), np.asarray(y[i:i + chunk_rows]), update_scaler=False)
+
+    return model
+
+
+# ============================================================
+#   PERSISTENCE
+# ============================================================
+def new_online_info(feature_cols: list) -> dict:
+    """Learning state of a freshly bootstrapped model."""
+    return {
+        "feature_cols": list(feature_cols),
+        "n": 0,
+        "online_correct": 0,
+        "forest_correct": 0,
+        "online_brier_sum": 0.0,
+        "forest_brier_sum": 0.0,
+        "daily": {},
+        "learned_through": {},
+        "n_seen": 0,
+        "updated_at": None,
+    }
+
+
+def load_online_info(model_dir: Path) -> dict:
+    """Stats JSON only – no unpickling (Performance page). Empty without a model."""
+    path = Path(model_dir) / ONLINE_INFO_NAME
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_online_model(model_dir: Path):
+    """(model, info), or (None, {}) when the online model was never created."""
+    path = Path(model_dir) / ONLINE_MODEL_NAME
+    if not path.exists():
+        return None, {}
+
+    import joblib
+
+    model = joblib.load(path)
+    return model, load_online_info(model_dir) or new_online_info(model.feature_cols)
+
+
+def save_online_model(model: OnlineDirectionModel, info: dict, model_dir: Path) -> None:
+    import joblib
+
+    model_dir = Path(model_dir)
+    info["n_seen"] = int(model.n_seen)
+    info["updated_at"] = datetime.now().isoformat(timespec="seconds")
+
+    tmp = model_dir / (ONLINE_MODEL_NAME + ".tmp")
+    joblib.dump(model, tmp)
+    os.replace(tmp, model_dir / ONLINE_MODEL_NAME)
+
+    tmp = model_dir / (ONLINE_INFO_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=1)
+    os.replace(tmp, model_dir / ONLINE_INFO_NAME)
+
+
+# ============================================================
+#   DAILY LEARNING (run_daily.py)
+# ============================================================
+def learn_from_previous_run(
+    model: OnlineDirectionModel,
+    info: dict,
+    prev_features: pd.DataFrame,
+    prices: pd.DataFrame,
+) -> int:
+    """
+    Resolve the previous run's feature rows (latest_features.csv: Date,
+    Symbol, features, the forest's Probability_Up) against the realized
+    next close, score them with the online model and the forest, then
+    learn from them. Rows already learned – or files written before the
+    model's features existed – are skipped. Returns the number of rows
+    learned.
+    """
+    missing = [c for c in model.feature_cols + ["Predicted_Direction", "Probability_Up"] if c not in prev_features.columns]
+    if missing:
+        return 0
+
+    prev = prev_features.copy()
+    prev["Date"] = _to_datetime(prev["Date"], "%Y-%m-%d")
+    prev = prev.dropna(subset=["Date", "Probability_Up"] + model.feature_cols)
+
+    prices = prices[["Date", "Symbol", "Close"]].copy()
+    if not pd.api.types.is_datetime64_any_dtype(prices["Date"]):
+        prices["Date"] = _to_datetime(prices["Date"], "%d-%m-%Y")
+
+    # Realized direction of each row (same resolution as the evaluation store)
+    resolved = resolve_predictions(prev, prices, info["learned_through"])
+    if resolved.empty:
+        return 0
+
+    rows = prev.merge(resolved[["Date", "Symbol", "True_Direction"]], on=["Date", "Symbol"])
+    y = rows["True_Direction"].to_numpy(dtype=int)
+
+    # Test, then train
+    if model.ready:
+        online_prob = model.predict_proba_up(rows)
+        forest_prob = rows["Probability_Up"].to_numpy(dtype=float)
+        online_ok = (online_prob >= 0.5).astype(int) == y
+        forest_ok = (forest_prob >= 0.5).astype(int) == y
+
+        info["n"] += int(len(rows))
+        info["online_correct"] += int(online_ok.sum())
+        info["forest_correct"] += int(forest_ok.sum())
+        info["online_brier_sum"] += float(((online_prob - y) ** 2).sum())
+        info["forest_brier_sum"] += float(((forest_prob - y) ** 2).sum())
+
+        days = rows["Date"].dt.strftime("%Y-%m-%d")
+        by_day = pd.DataFrame({"day": days, "online": online_ok, "forest": forest_ok}).groupby("day")
+        for day, g in by_day:
+            agg = info["daily"].setdefault(day, {"n": 0, "online": 0, "forest": 0})
+            agg["n"] += int(len(g))
+            agg["online"] += int(g["online"].sum())
+            agg["forest"] += int(g["forest"].sum())
+
+    model.partial_fit(rows, y)
+
+    last = rows.groupby("Symbol")["Date"].max().dt.strftime("%Y-%m-%d")
+    info["learned_through"].update(last.to_dict())
+    return int(len(rows))
+
+
+# ============================================================
+#   READ-SIDE HELPERS (Performance page)
+# ============================================================
+def online_vs_forest(info: dict, window: int = 20) -> pd.DataFrame:
+    """Rolling accuracy of both models over the last `window` resolved days."""
+    if not info.get("daily"):
+        return pd.DataFrame(columns=["Date", "Model", "Rolling_Accuracy"])
+
+    daily = pd.DataFrame.from_dict(info["daily"], orient="index").sort_index()
+    rolled = daily.rolling(window, min_periods=1).sum()
+
+    out = pd.DataFrame({
+        "Date": pd.to_datetime(daily.index),
+        "Online (SGD)": rolled["online"] / rolled["n"],
+        "Forest": rolled["forest"] / rolled["n"],
+    })
+    return out.melt(id_vars="Date", var_name="Model", value_name="Rolling_Accuracy")
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+#   DATE × SYMBOL PRICE PANEL
+# ============================================================
+# Long frames (one row per Date, Symbol) are what the CSV / price store
+# hold; most analytics want the opposite layout. A PricePanel pivots
+# ONCE into aligned 2-D float32 arrays (dates × symbols) that features,
+# cross-sectional analytics and the portfolio backtest can all share
+# without regrouping by symbol.
+#
+#   • every array has the same (T, N) shape and the same axes
+#   • `valid[t, n]` is True where symbol n has a bar on date t; all
+#     fields are NaN elsewhere
+#   • float32 halves the memory of a 500-symbol history; indicators are
+#     computed in float64 (see frame) and stored back as float32
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class PricePanel:
+    def __init__(self, dates, symbols, arrays: dict, valid: np.ndarray):
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = pd.Index(symbols)
+        self.arrays = arrays
+        self.valid = valid
+
+    # --------------------------------------------------------
+    #   LONG ↔ WIDE
+    # --------------------------------------------------------
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, fields=FIELDS) -> "PricePanel":
+        """
+        Long (Date, Symbol, fields...) frame → panel. Duplicate
+        (Date, Symbol) rows keep the last one, like to_wide.
+        """
+        fields = [f for f in fields if f in df.columns]
+        df = df.drop_duplicates(subset=["Date", "Symbol"], keep="last")
+
+        t_idx, dates = pd.factorize(pd.to_datetime(df["Date"]), sort=True)
+        s_idx, symbols = pd.factorize(df["Symbol"], sort=True)
+        shape = (len(dates), len(symbols))
+
+        valid = np.zeros(shape, dtype=bool)
+        valid[t_idx, s_idx] = True
+
+        arrays = {}
+        for field in fields:
+            arr = np.full(shape, np.nan, dtype=np.float32)
+            arr[t_idx, s_idx] = pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=np.float32)
+            arrays[field] = arr
+
+        return cls(dates, symbols, arrays, valid)
+
+    def to_long(self, fields=None) -> pd.DataFrame:
+        """
+        Panel → long frame with one row per valid (Symbol, Date), sorted
+        by Symbol then Date (the stock_data.csv order).
+        """
+        fields = list(self.arrays) if fields is None else list(fields)
+
+        # Transposed nonzero walks symbol-major → rows come out sorted
+        s_idx, t_idx = np.nonzero(self.valid.T)
+
+        out = pd.DataFrame({
+            "Date": self.dates[t_idx],
+            "Symbol": self.symbols[s_idx],
+        })
+        for field in fields:
+            out[field] = self.arrays[field][t_idx, s_idx]
+        return out
+
+    # --------------------------------------------------------
+    #   ACCESS
+    # --------------------------------------------------------
+    @property
+    def shape(self) -> tuple:
+        return self.valid.shape
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.arrays
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.arrays[field]
+
+    def values(self, field: str, dtype=np.float64) -> np.ndarray:
+        """(T, N) array of one field; float64 copy by default for arithmetic."""
+        return self.arrays[field].astype(dtype)
+
+    def frame(self, field: str, dtype=np.float64) -> pd.DataFrame:
+        """Date × Symbol DataFrame of one field – the input of utils.indicators."""
+        return pd.DataFrame(self.values(field, dtype), index=self.dates, columns=self.symbols)
+
+    # --------------------------------------------------------
+    #   DERIVED FIELDS (computed for all symbols at once)
+    # --------------------------------------------------------
+    def add(self, name: str, values) -> "PricePanel":
+        """Attach a (T, N) array or Date × Symbol frame as a new field."""
+        arr = np.asarray(values, dtype=np.float32)
+        if arr.shape != self.shape:
+            raise ValueError(f"{name}: expected shape {self.shape}, got {arr.shape}")
+
+        # Derived values only exist where there is a bar
+        self.arrays[name] = np.where(self.valid, arr, np.nan).astype(np.float32)
+        return self
+
+    def compute(self, name: str, fn, *fields, **kwargs) -> "PricePanel":
+        """
+        Run a wide indicator over every symbol in one call, e.g.
+            panel.compute("SMA_20", wide_sma, "Close", window=20)
+            panel.compute("ATR_14", wide_atr, "High", "Low", "Close")
+        """
+        return self.add(name, fn(*(self.frame(f) for f in fields), **kwargs))
+
+    # --------------------------------------------------------
+    #   SLICING
+    # --------------------------------------------------------
+    def tail(self, n: int) -> "PricePanel":
+        """Last `n` dates (indicators computed before slicing stay warmed up)."""
+        return PricePanel(
+            self.dates[-n:],
+            self.symbols,
+            {k: v[-n:] for k, v in self.arrays.items()},
+            self.valid[-n:],
+        )
+
+    def select(self, symbols) -> "PricePanel":
+        """Subset of symbols, in the given order (unknown symbols are ignored)."""
+        cols = self.symbols.get_indexer(pd.Index(symbols))
+        cols = cols[cols >= 0]
+        return PricePanel(
+            self.dates,
+            self.symbols[cols],
+            {k: v[:, cols] for k, v in self.arrays.items()},
+            self.valid[:, cols],
+        )
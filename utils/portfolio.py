@@ -0,0 +1,281 @@
+import numpy as np
+import pandas as pd
+
+from utils.indicators import wide_atr, wide_rsi, wide_sma
+from utils.panel import PricePanel
+
+
+# ============================================================
+#   DEFAULTS
+# ============================================================
+INITIAL_CAPITAL = 1_000_000.0
+COST_BPS = 10.0          # brokerage + taxes, per side
+SLIPPAGE_BPS = 5.0       # fill vs. close, per side
+SIZING_MODES = ["equal", "volatility"]
+
+EXIT_REASONS = np.array(["stop", "take_profit", "trend_break"])
+
+
+# ============================================================
+#   STRATEGY PANEL (Date × Symbol arrays + ATR strategy indicators)
+# ============================================================
+def build_price_panel(prices, lookback_days: int | None = None) -> PricePanel:
+    """
+    Price panel with the ATR strategy indicators (SMA_20, RSI_14, ATR_14)
+    computed for every symbol at once.
+
+    `prices` is a PricePanel (shared, left untouched) or a long price
+    frame. Indicators are computed on the full history and trimmed to the
+    last `lookback_days` dates afterwards, so warm-up does not eat the
+    window.
+    """
+    if isinstance(prices, pd.DataFrame):
+        prices = PricePanel.from_long(prices)
+
+    panel = PricePanel(prices.dates, prices.symbols, dict(prices.arrays), prices.valid)
+    panel.compute("SMA_20", wide_sma, "Close", window=20)
+    panel.compute("RSI_14", wide_rsi, "Close", window=14)
+    panel.compute("ATR_14", wide_atr, "High", "Low", "Close", window=14)
+
+    return panel.tail(lookback_days) if lookback_days else panel
+
+
+# ============================================================
+#   PORTFOLIO BACKTEST
+# ============================================================
+def portfolio_backtest(
+    panel: PricePanel,
+    max_positions: int = 10,
+    sizing: str = "equal",
+    initial_capital: float = INITIAL_CAPITAL,
+    cost_bps: float = COST_BPS,
+    slippage_bps: float = SLIPPAGE_BPS,
+    atr_mult_stop: float = 2.0,
+    atr_mult_tp: float = 3.0,
+    rsi_entry: float = 50.0,
+    rsi_exit: float = 45.0,
+    risk_per_trade: float = 0.01,
+    max_weight: float = 0.25,
+) -> dict:
+    """
+    Portfolio version of the ATR trend strategy across the whole universe.
+
+    Walks the Date × Symbol panel from build_price_panel once; every step works on whole rows
+    (all symbols) with NumPy:
+        • exits first  → stop, take-profit or trend break (same rules as
+                         atr_strategy_backtest)
+        • then entries → Close > SMA20 and RSI > rsi_entry, strongest RSI
+                         first, up to `max_positions` open positions
+        • fills at the close ± slippage, costs charged on both sides
+        • whole shares only, no leverage (entries limited by cash)
+
+    Sizing:
+        • "equal"      → equity / max_positions per position
+        • "volatility" → risk `risk_per_trade` of equity down to the ATR
+                         stop, capped at `max_weight` of equity
+
+    Returns:
+        dict {
+            "equity": Series (portfolio value per date)
+            "exposures": DataFrame of position weights (Date × Symbol)
+            "trades": DataFrame trade log (open positions marked "open")
+            "stats": dict of summary metrics
+        }
+    """
+    if sizing not in SIZING_MODES:
+        raise ValueError(f"sizing must be one of {SIZING_MODES}, got {sizing!r}")
+
+    # float64 copies: cash and share arithmetic stays in double precision
+    close, sma, rsi, atr = (panel.values(f) for f in ("Close", "SMA_20", "RSI_14", "ATR_14"))
+    dates, symbols = panel.dates, list(panel.symbols)
+    n_dates, n_symbols = close.shape
+
+    # --- Whole-panel signals (one vectorized pass) ---
+    with np.errstate(invalid="ignore"):
+        tradable = np.isfinite(close) & np.isfinite(sma) & np.isfinite(rsi) & np.isfinite(atr)
+        entry_sig = tradable & (close > sma) & (rsi > rsi_entry)
+        break_sig = tradable & ((close < sma) | (rsi < rsi_exit))
+
+    # Valuation uses the last known close when a symbol has no bar
+    mark = pd.DataFrame(close).ffill().fillna(0.0).to_numpy()
+
+    cost_rate = cost_bps / 1e4
+    slip = slippage_bps / 1e4
+
+    # --- Portfolio state (one slot per symbol) ---
+    cash = float(initial_capital)
+    shares = np.zeros(n_symbols)
+    entry_fill = np.zeros(n_symbols)
+    entry_cost = np.zeros(n_symbols)
+    entry_t = np.full(n_symbols, -1)
+    stop_px = np.zeros(n_symbols)
+    tp_px = np.zeros(n_symbols)
+
+    equity = np.empty(n_dates)
+    positions = np.zeros((n_dates, n_symbols), dtype=np.float32)
+    costs_paid = 0.0
+    closed = []
+
+    for t in range(n_dates):
+        c = close[t]
+
+        # --- Exits ---
+        held = shares > 0
+        if held.any():
+            with np.errstate(invalid="ignore"):
+                hit_stop = held & (c <= stop_px)
+                hit_tp = held & ~hit_stop & (c >= tp_px)
+                hit_break = held & ~hit_stop & ~hit_tp & break_sig[t]
+            out = np.flatnonzero(hit_stop | hit_tp | hit_break)
+
+            if out.size:
+                fill = c[out] * (1 - slip)
+                gross = shares[out] * fill
+                cost = gross * cost_rate
+                cash += float((gross - cost).sum())
+                costs_paid += float(cost.sum())
+
+                reason = np.select([hit_stop[out], hit_tp[out]], [0, 1], 2)
+                closed.append((
+                    out, entry_t[out], np.full(out.size, t), entry_fill[out], fill,
+                    shares[out], gross - cost - shares[out] * entry_fill[out] - entry_cost[out],
+                    EXIT_REASONS[reason],
+                ))
+                shares[out] = 0.0
+                held[out] = False
+        else:
+            out = np.empty(0, dtype=np.int64)
+
+        # --- Entries ---
+        slots = max_positions - int(held.sum())
+        if slots > 0:
+            can_enter = entry_sig[t] & ~held
+            can_enter[out] = False           # no same-bar re-entry after an exit
+            cand = np.flatnonzero(can_enter)
+
+            if cand.size:
+                if cand.size > slots:
+                    cand = cand[np.argsort(-rsi[t, cand], kind="stable")[:slots]]
+
+                nav = cash + float(shares @ mark[t])
+                fill = c[cand] * (1 + slip)
+
+                if sizing == "equal":
+                    notional = np.full(cand.size, nav / max_positions)
+                else:
+                    atr_pct = atr[t, cand] / c[cand]
+                    notional = nav * risk_per_trade / (atr_mult_stop * atr_pct)
+                    notional = np.minimum(notional, nav * max_weight)
+
+                qty = np.floor(notional / fill)
+                outlay = qty * fill * (1 + cost_rate)
+
+                # Cash is spent in priority order; a candidate that no
+                # longer fits is skipped, smaller later ones still enter
+                ok = qty > 0
+                left = cash + 1e-9
+                for i in np.flatnonzero(ok):        # at most max_positions
+                    if outlay[i] <= left:
+                        left -= outlay[i]
+                    else:
+                        ok[i] = False
+                cand, qty, fill, outlay = cand[ok], qty[ok], fill[ok], outlay[ok]
+
+                if cand.size:
+                    cash -= float(outlay.sum())
+                    cost = outlay - qty * fill
+                    costs_paid += float(cost.sum())
+
+                    shares[cand] = qty
+                    entry_fill[cand] = fill
+                    entry_cost[cand] = cost
+                    entry_t[cand] = t
+                    stop_px[cand] = c[cand] - atr_mult_stop * atr[t, cand]
+                    tp_px[cand] = c[cand] + atr_mult_tp * atr[t, cand]
+
+        positions[t] = shares
+        equity[t] = cash + float(shares @ mark[t])
+
+    # --- Positions still open at the end: marked to the last close ---
+    still_open = np.flatnonzero(shares > 0)
+    if still_open.size:
+        last = mark[-1, still_open]
+        closed.append((
+            still_open, entry_t[still_open], np.full(still_open.size, n_dates - 1),
+            entry_fill[still_open], last, shares[still_open],
+            shares[still_open] * (last - entry_fill[still_open]) - entry_cost[still_open],
+            np.full(still_open.size, "open"),
+        ))
+
+    trades = _trade_log(closed, dates, symbols)
+
+    equity_s = pd.Series(equity, index=dates, name="Equity")
+    exposures = pd.DataFrame(
+        positions * mark.astype(np.float32) / equity[:, None].astype(np.float32),
+        index=dates,
+        columns=symbols,
+    )
+
+    return {
+        "equity": equity_s,
+        "exposures": exposures,
+        "trades": trades,
+        "stats": _portfolio_stats(equity_s, exposures, trades, costs_paid, initial_capital),
+    }
+
+
+# ============================================================
+#   OUTPUT HELPERS
+# ============================================================
+def _trade_log(closed: list, dates, symbols) -> pd.DataFrame:
+    cols = [
+        "Symbol", "Entry_Date", "Exit_Date", "Entry_Price", "Exit_Price",
+        "Shares", "PnL", "Return", "Bars_Held", "Exit_Reason",
+    ]
+    if not closed:
+        return pd.DataFrame(columns=cols)
+
+    sym, t_in, t_out, px_in, px_out, qty, pnl, reason = (
+        np.concatenate(parts) for parts in zip(*closed)
+    )
+
+    trades = pd.DataFrame({
+        "Symbol": np.asarray(symbols)[sym],
+        "Entry_Date": dates[t_in],
+        "Exit_Date": dates[t_out],
+        "Entry_Price": px_in,
+        "Exit_Price": px_out,
+        "Shares": qty.astype(np.int64),
+        "PnL": pnl,
+        "Return": pnl / (qty * px_in),
+        "Bars_Held": t_out - t_in,
+        "Exit_Reason": reason,
+    })
+    return trades.sort_values(["Entry_Date", "Symbol"], ignore_index=True)
+
+
+def _portfolio_stats(
+    equity: pd.Series, exposures: pd.DataFrame, trades: pd.DataFrame, costs: float, initial_capital: float
+) -> dict:
+    if equity.empty:
+        return {}
+
+    values = np.concatenate([[initial_capital], equity.to_numpy()])
+
+    peak = np.maximum.accumulate(values)
+    daily = np.diff(values) / values[:-1]
+    years = max(len(equity) / 252, 1 / 252)
+
+    done = trades[trades["Exit_Reason"] != "open"]
+
+    return {
+        "total_return": float(values[-1] / values[0] - 1),
+        "cagr": float((values[-1] / values[0]) ** (1 / years) - 1),
+        "max_drawdown": float(((values - peak) / peak).min()),
+        "sharpe": float(daily.mean() / daily.std() * np.sqrt(252)) if daily.size > 1 and daily.std() > 0 else 0.0,
+        "n_trades": int(len(done)),
+        "win_rate": float((done["PnL"] > 0).mean()) if len(done) else float("nan"),
+        "avg_exposure": float(exposures.sum(axis=1).mean()),
+        "avg_positions": float((exposures > 0).sum(axis=1).mean()),
+        "costs_paid": float(costs),
+    }
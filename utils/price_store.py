@@ -0,0 +1,353 @@
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+
+# ============================================================
+#   PARTITIONED PRICE STORE (base per symbol + daily deltas)
+# ============================================================
+# data/store/
+#     manifest.json                  ← the only mutable file (atomic replace)
+#     base/<SYMBOL>.g<N>.parquet     ← full history per symbol up to compaction N
+#     delta/<timestamp>-<id>.parquet ← new (and re-fetched last) bars of one fetch run
+#
+# • nse_fetch appends one small immutable delta per run: O(new bars). It
+#   re-fetches each symbol's last stored bar, which the delta then
+#   replaces; older history only changes with `nse_fetch.py --full`
+# • compact() folds deltas into new base generations (scheduler.py runs it
+#   once COMPACT_AFTER_DELTAS have piled up, or: python -m utils.price_store compact)
+# • Readers take a snapshot = one manifest read, then only open files it
+#   lists. Files are never modified in place, and files retired by a
+#   compaction are only deleted GC_GRACE_S later – so a reader never sees
+#   a half-written file or a mix of two versions.
+#
+# Writers (fetch, compaction) must hold the pipeline lock
+# (utils.scheduling.PipelineLock); readers need no lock.
+
+STORE_DIR = Path(__file__).resolve().parents[1] / "data" / "store"
+MANIFEST_NAME = "manifest.json"
+STORE_FORMAT = 1
+
+COLUMNS = ["Date", "Symbol", "Open", "High", "Low", "Close", "Volume"]
+NUMERIC_COLS = ["Open", "High", "Low", "Close", "Volume"]
+
+COMPACT_AFTER_DELTAS = 5
+GC_GRACE_S = 3600
+
+
+def _empty_manifest() -> dict:
+    return {"format": STORE_FORMAT, "version": "", "generation": 0, "base": {}, "deltas": [], "retired": []}
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Store schema: datetime Date, str Symbol, float OHLCV; bad rows dropped."""
+    df = df[COLUMNS].copy()
+    if not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        df["Date"] = pd.to_datetime(df["Date"], format="%d-%m-%Y", errors="coerce")
+    df["Symbol"] = df["Symbol"].astype(str)
+    for col in NUMERIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return df.dropna(subset=["Date", "Open", "High", "Low", "Close"])
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    # Temp name + rename: the final name only ever holds a complete file
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_parquet(tmp, index=False, compression="zstd")
+    os.replace(tmp, path)
+
+
+# ============================================================
+#   SNAPSHOT (consistent read view)
+# ============================================================
+class Snapshot:
+    def __init__(self, root: Path, manifest: dict):
+        self.root = root
+        self.manifest = manifest
+        self.version = manifest.get("version", "")
+
+    @property
+    def symbols(self) -> list[str]:
+        names = set(self.manifest["base"])
+        for delta in self.manifest["deltas"]:
+            names.update(delta["symbols"])
+        return sorted(names)
+
+    @property
+    def rows(self) -> int:
+        """Upper bound on rows (deltas may repeat bars already in base)."""
+        return sum(e["rows"] for e in self.manifest["base"].values()) + sum(
+            d["rows"] for d in self.manifest["deltas"]
+        )
+
+    def _read_deltas(self, symbols=None) -> pd.DataFrame:
+        frames = []
+        for delta in self.manifest["deltas"]:
+            if symbols is not None and not symbols.intersection(delta["symbols"]):
+                continue
+            df = pd.read_parquet(self.root / delta["file"])
+            frames.append(df if symbols is None else df[df["Symbol"].isin(symbols)])
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+
+    def read(self, symbols=None) -> pd.DataFrame:
+        """Prices (store schema) for `symbols` (all by default), sorted by Symbol, Date."""
+        symbols = set(self.symbols if symbols is None else symbols)
+        base = self.manifest["base"]
+
+        frames = [pd.read_parquet(self.root / base[s]["file"]) for s in sorted(symbols) if s in base]
+        deltas = self._read_deltas(symbols)
+        if not deltas.empty:
+            frames.append(deltas)
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+
+        df = pd.concat(frames, ignore_index=True)
+        if not deltas.empty:
+            # A re-fetched bar in a later delta wins over the base row
+            df = df.drop_duplicates(["Symbol", "Date"], keep="last")
+        return df.sort_values(["Symbol", "Date"], kind="stable").reset_index(drop=True)
+
+    def iter_symbol_chunks(self, chunk_rows: int):
+        """Frames of complete symbols, ~chunk_rows rows each (out-of-core readers)."""
+        batch, batch_rows = [], 0
+        base = self.manifest["base"]
+        for symbol in self.symbols:
+            batch.append(symbol)
+            batch_rows += base.get(symbol, {}).get("rows", 0)
+            if batch_rows >= chunk_rows:
+                yield self.read(batch)
+                batch, batch_rows = [], 0
+        if batch:
+            yield self.read(batch)
+
+
+# ============================================================
+#   STORE
+# ============================================================
+class PriceStore:
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+
+    # --------------------------------------------------------
+    #   MANIFEST
+    # --------------------------------------------------------
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return _empty_manifest()
+
+    def _commit(self, manifest: dict) -> dict:
+        manifest["version"] = uuid.uuid4().hex[:12]
+        manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+        return manifest
+
+    def version(self) -> str:
+        return self.manifest().get("version", "") if self.exists() else ""
+
+    def snapshot(self) -> Snapshot:
+        return Snapshot(self.root, self.manifest())
+
+    def last_dates(self) -> dict:
+        """{symbol: last stored date} – drives the incremental fetch."""
+        manifest = self.manifest()
+        last = {s: pd.Timestamp(e["date_max"]) for s, e in manifest["base"].items()}
+        for delta in manifest["deltas"]:
+            for s, d in delta["symbols"].items():
+                last[s] = max(last.get(s, pd.Timestamp(d)), pd.Timestamp(d))
+        return last
+
+    # --------------------------------------------------------
+    #   WRITES (hold the pipeline lock)
+    # --------------------------------------------------------
+    def _write_base(self, symbol: str, df: pd.DataFrame, generation: int) -> dict:
+        (self.root / "base").mkdir(parents=True, exist_ok=True)
+        name = f"base/{symbol}.g{generation}.parquet"
+        _write_parquet(df, self.root / name)
+        return {
+            "file": name,
+            "rows": len(df),
+            "date_min": df["Date"].min().strftime("%Y-%m-%d"),
+            "date_max": df["Date"].max().strftime("%Y-%m-%d"),
+        }
+
+    def write_base(self, df: pd.DataFrame) -> dict:
+        """Replace the whole store with `df` (initial import / full rebuild)."""
+        df = _normalize(df).sort_values(["Symbol", "Date"], kind="stable")
+        df = df.drop_duplicates(["Symbol", "Date"], keep="last")
+
+        manifest = self.manifest()
+        generation = manifest["generation"] + 1
+        retired = [e["file"] for e in manifest["base"].values()] + [d["file"] for d in manifest["deltas"]]
+
+        base = {
+            symbol: self._write_base(symbol, g.reset_index(drop=True), generation)
+            for symbol, g in df.groupby("Symbol", sort=True)
+        }
+        manifest.update(generation=generation, base=base, deltas=[])
+        manifest["retired"] = manifest.get("retired", []) + [{"file": f, "at": time.time()} for f in retired]
+        return self._commit(manifest)
+
+    def import_csv(self, csv_path: Path) -> dict:
+        """One-time migration from a stock_data.csv file."""
+        return self.write_base(pd.read_csv(csv_path))
+
+    def append_delta(self, df: pd.DataFrame) -> int:
+        """
+        Store the bars in `df` from each symbol's last stored date on, as
+        ONE new immutable delta file. A re-fetched last bar replaces the
+        stored one on read and at compaction; older bars are left alone
+        (corporate actions need a full rebuild). Returns the number of rows.
+        """
+        df = _normalize(df)
+        last = self.last_dates()
+        if last:
+            cutoff = df["Symbol"].map(last)
+            df = df[cutoff.isna() | (df["Date"] >= cutoff)]
+        df = df.drop_duplicates(["Symbol", "Date"], keep="last").sort_values(["Symbol", "Date"])
+        if df.empty:
+            return 0
+
+        (self.root / "delta").mkdir(parents=True, exist_ok=True)
+        name = f"delta/{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}.parquet"
+        _write_parquet(df.reset_index(drop=True), self.root / name)
+
+        manifest = self.manifest()
+        manifest["deltas"].append({
+            "file": name,
+            "rows": len(df),
+            "symbols": {s: d.strftime("%Y-%m-%d") for s, d in df.groupby("Symbol")["Date"].max().items()},
+        })
+        self._commit(manifest)
+        return len(df)
+
+    def compact(self, min_deltas: int = 1) -> int:
+        """
+        Fold all deltas into new base generations of the symbols they touch.
+        Returns the number of deltas merged (0 → nothing to do).
+        """
+        manifest = self.manifest()
+        deltas = manifest["deltas"]
+        if len(deltas) < max(min_deltas, 1):
+            self.gc(manifest)
+            return 0
+
+        # Every delta is read once; only the touched symbols' bases are rewritten
+        delta_df = Snapshot(self.root, manifest)._read_deltas()
+        generation = manifest["generation"] + 1
+        retired = [d["file"] for d in deltas]
+
+        base = dict(manifest["base"])
+        for symbol, new_rows in delta_df.groupby("Symbol", sort=True):
+            frames = [new_rows]
+            if symbol in base:
+                frames.insert(0, pd.read_parquet(self.root / base[symbol]["file"]))
+                retired.append(base[symbol]["file"])
+            merged = (
+                pd.concat(frames, ignore_index=True)
+                .drop_duplicates(["Date"], keep="last")
+                .sort_values("Date")
+                .reset_index(drop=True)
+            )
+            base[symbol] = self._write_base(symbol, merged, generation)
+
+        manifest.update(generation=generation, base=base, deltas=[])
+        manifest["retired"] = manifest.get("retired", []) + [{"file": f, "at": time.time()} for f in retired]
+        manifest = self._commit(manifest)
+
+        self.gc(manifest)
+        return len(deltas)
+
+    def gc(self, manifest: dict | None = None) -> int:
+        """Delete files retired more than GC_GRACE_S ago (readers have moved on)."""
+        manifest = manifest or self.manifest()
+        now = time.time()
+        keep, removed = [], 0
+        for entry in manifest.get("retired", []):
+            if now - entry["at"] < GC_GRACE_S:
+                keep.append(entry)
+                continue
+            (self.root / entry["file"]).unlink(missing_ok=True)
+            removed += 1
+
+        if removed:
+            manifest["retired"] = keep
+            self._commit(manifest)
+        return removed
+
+    def status(self) -> dict:
+        manifest = self.manifest()
+        return {
+            "version": manifest.get("version", ""),
+            "generation": manifest["generation"],
+            "symbols": len(Snapshot(self.root, manifest).symbols),
+            "base_rows": sum(e["rows"] for e in manifest["base"].values()),
+            "deltas": len(manifest["deltas"]),
+            "delta_rows": sum(d["rows"] for d in manifest["deltas"]),
+            "retired_files": len(manifest.get("retired", [])),
+            "updated_at": manifest.get("updated_at"),
+        }
+
+
+# ============================================================
+#   READ HELPER (pipeline scripts)
+# ============================================================
+def read_prices(csv_fallback: Path, store_dir: Path = STORE_DIR) -> pd.DataFrame:
+    """
+    All prices from the store snapshot; the legacy stock_data.csv when no
+    store has been created yet. Date is datetime in the store case and a
+    DD-MM-YYYY string in the CSV case – the feature code accepts both.
+    """
+    store = PriceStore(store_dir)
+    if store.exists():
+        return store.snapshot().read()
+    return pd.read_csv(csv_fallback)
+
+
+# ============================================================
+#   CLI: python -m utils.price_store [status | compact | import <csv>]
+# ============================================================
+if __name__ == "__main__":
+    from utils.scheduling import PipelineLock
+
+    store = PriceStore()
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+    if cmd == "status":
+        print(json.dumps(store.status(), indent=1) if store.exists() else "No price store yet.")
+        sys.exit(0)
+
+    with PipelineLock(f"price_store {cmd}") as acquired:
+        if not acquired:
+            print("⏳ A pipeline run holds the lock – try again later.")
+            sys.exit(1)
+
+        if cmd == "compact":
+            merged = store.compact()
+            print(f"🗜 Compacted {merged} delta(s) → generation {store.manifest()['generation']}")
+        elif cmd == "import":
+            src = Path(sys.argv[2]) if len(sys.argv) > 2 else STORE_DIR.parent / "stock_data.csv"
+            manifest = store.import_csv(src)
+            print(f"📥 Imported {src} → {len(manifest['base'])} symbols")
+        else:
+            print(f"Unknown command: {cmd}")
+            sys.exit(2)
@@ -0,0 +1,153 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from utils.drift import FeatureSketch
+from utils.panel import PricePanel
+from utils.price_store import PriceStore
+from utils.result_cache import ResultCache, get_cache_dir
+from utils.risk import RollingCovariance, daily_returns
+
+
+# ============================================================
+#   SHARED RESOURCE LAYER
+# ============================================================
+# Objects here are cached with st.cache_resource: ONE instance per
+# process, shared by every page and session (no per-rerun copy, unlike
+# st.cache_data which hands each caller its own deserialized copy).
+# Callers must treat them as read-only – filter or .copy() before
+# modifying a frame.
+
+
+# ============================================================
+#   PRICE FRAME (stock_data.csv)
+# ============================================================
+def read_price_csv(path) -> pd.DataFrame:
+    """Parse stock_data.csv (uncached – the benchmarks time this directly)."""
+    df = pd.read_csv(path)
+
+    # Convert Date column
+    # stock_data.csv uses DD-MM-YYYY format
+    try:
+        df["Date"] = pd.to_datetime(df["Date"], format="%d-%m-%Y")
+    except:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+
+    # Convert numeric fields
+    numeric_cols = ["Open", "High", "Low", "Close", "Volume"]
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df = df.dropna(subset=["Open", "High", "Low", "Close"])
+
+    return df
+
+
+def read_price_store(store_dir) -> pd.DataFrame:
+    """Consistent snapshot of the partitioned price store (base + deltas)."""
+    df = PriceStore(store_dir).snapshot().read()
+    return df.dropna(subset=["Open", "High", "Low", "Close"])
+
+
+@st.cache_resource(max_entries=1)
+def get_price_frame(path: str, data_version: str) -> pd.DataFrame:
+    """
+    Parsed prices from the price store directory (or the legacy
+    stock_data.csv). `data_version` is part of the cache key, so new
+    data replaces the shared frame on the next rerun.
+    """
+    if Path(path).is_dir():
+        return read_price_store(path)
+    return read_price_csv(path)
+
+
+@st.cache_resource(max_entries=1)
+def get_price_panel(path: str, data_version: str) -> PricePanel:
+    """
+    The shared price frame pivoted once into Date × Symbol float32
+    arrays (utils/panel.py). Read-only, like the frame: build derived
+    panels from copies of `arrays`.
+    """
+    return PricePanel.from_long(get_price_frame(path, data_version))
+
+
+# ============================================================
+#   ROLLING RISK MODEL (data/risk/rolling_cov.npz)
+# ============================================================
+@st.cache_resource(max_entries=1)
+def get_rolling_covariance(path: str, state_version: str) -> RollingCovariance | None:
+    """Persisted state advanced by run_daily.py; reloaded when the file changes."""
+    return RollingCovariance.load(path)
+
+
+@st.cache_resource(max_entries=1)
+def build_rolling_covariance(path: str, data_version: str) -> RollingCovariance:
+    """Fallback before the first run_daily.py: built once from the price panel."""
+    return RollingCovariance.from_returns(daily_returns(get_price_panel(path, data_version)))
+
+
+# ============================================================
+#   MODEL HANDLES (model/*.pkl)
+# ============================================================
+def get_model_dir() -> Path:
+    return Path(__file__).resolve().parents[1] / "model"
+
+
+def model_path(name: str) -> Path:
+    return get_model_dir() / f"{name}.pkl"
+
+
+def model_exists(name: str) -> bool:
+    return model_path(name).exists()
+
+
+@st.cache_resource(max_entries=8)
+def _load_model(path: str, mtime_ns: int):
+    # joblib (and sklearn behind it) is only imported by pages that
+    # actually need a model
+    import joblib
+
+    return joblib.load(path)
+
+
+def get_model(name: str):
+    """Shared model handle, reloaded only when the .pkl file changes."""
+    path = model_path(name)
+    if not path.exists():
+        return None
+
+    return _load_model(str(path), path.stat().st_mtime_ns)
+
+
+def get_model_info() -> dict:
+    """
+    model/model_info.json written by train_model.py (class names, feature
+    columns, test scores). Lets pages describe the models without
+    unpickling them. Empty dict for models trained before it existed.
+    """
+    path = get_model_dir() / "model_info.json"
+    if not path.exists():
+        return {}
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@st.cache_resource(max_entries=2)
+def get_feature_sketch(path: str, version: str) -> FeatureSketch | None:
+    """Drift sketch (model reference or live), reloaded when the file changes."""
+    return FeatureSketch.load(path)
+
+
+# ============================================================
+#   BACKTEST / SWEEP RESULT CACHE (memory LRU + data/cache/results)
+# ============================================================
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    # One LRU per process; the disk tier is shared across processes
+    return ResultCache(get_cache_dir(Path(__file__).resolve().parents[1]))
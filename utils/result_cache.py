@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+# ============================================================
+#   CONTENT-ADDRESSED RESULT CACHE
+# ============================================================
+# Backtest / sweep results keyed by a hash of
+#     (strategy name, parameters, symbol, data version)
+# Two tiers:
+#     • memory → OrderedDict LRU, per process
+#     • disk   → data/cache/results/<key>.pkl, shared by every process
+#                and session; least recently used files are evicted
+# A new data version changes every key, so stale results are never
+# served – they just age out of both tiers. Values from the memory tier
+# are shared between callers: treat them as read-only.
+
+MEMORY_ENTRIES = 64
+DISK_MAX_ENTRIES = 500
+DISK_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when the structure of a cached result changes, so results pickled
+# by older code are not served
+RESULT_FORMAT = 2
+
+_MISS = object()
+
+
+def get_cache_dir(base_dir: Path) -> Path:
+    return Path(base_dir) / "data" / "cache" / "results"
+
+
+def result_key(strategy: str, params: dict, symbol: str | None, data_version: str) -> str:
+    """sha256 over a canonical JSON of everything that determines a result."""
+    payload = json.dumps(
+        {
+            "strategy": strategy,
+            "params": params,
+            "symbol": symbol,
+            "data_version": data_version,
+            "format": RESULT_FORMAT,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        cache_dir: Path,
+        memory_entries: int = MEMORY_ENTRIES,
+        disk_max_entries: int = DISK_MAX_ENTRIES,
+        disk_max_bytes: int = DISK_MAX_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.memory_entries = memory_entries
+        self.disk_max_entries = disk_max_entries
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0, "miss": 0}
+
+    # --------------------------------------------------------
+    #   LOOKUP / STORE
+    # --------------------------------------------------------
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                return self._memory[key]
+
+        value = self._read_disk(key)
+        if value is _MISS:
+            self.hits["miss"] += 1
+            return default
+
+        self.hits["disk"] += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value) -> None:
+        self._remember(key, value)
+        self._write_disk(key, value)
+
+    def get_or_compute(self, strategy: str, params: dict, symbol, data_version: str, compute):
+        """Return the cached result, or run `compute()` and cache it."""
+        key = result_key(strategy, params, symbol, data_version)
+
+        value = self.get(key, _MISS)
+        if value is _MISS:
+            value = compute()
+            self.put(key, value)
+
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        for path in self._disk_files():
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        files = self._disk_files()
+        return {
+            "memory_entries": len(self._memory),
+            "disk_entries": len(files),
+            "disk_bytes": sum(self._size(p) for p in files),
+            "memory_hits": self.hits["memory"],
+            "disk_hits": self.hits["disk"],
+            "misses": self.hits["miss"],
+        }
+
+    # --------------------------------------------------------
+    #   MEMORY TIER
+    # --------------------------------------------------------
+    def _remember(self, key: str, value) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # --------------------------------------------------------
+    #   DISK TIER
+    # --------------------------------------------------------
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _read_disk(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISS
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Truncated or written by incompatible code → treat as a miss
+            path.unlink(missing_ok=True)
+            return _MISS
+
+        # Touch: mtime doubles as the LRU clock for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _write_disk(self, key: str, value) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            # Disk tier is best-effort; the memory tier still has the value
+            return
+
+        self._evict()
+
+    def _disk_files(self) -> list:
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*.pkl"))
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _evict(self) -> None:
+        """Drop least recently used files beyond the entry / byte limits."""
+        entries = []
+        for path in self._disk_files():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+
+        entries.sort(reverse=True)      # newest first
+        total = 0
+        for i, (_, size, path) in enumerate(entries):
+            total += size
+            if i >= self.disk_max_entries or total > self.disk_max_bytes:
+                path.unlink(missing_ok=True)
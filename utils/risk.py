@@ -0,0 +1,304 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.panel import PricePanel
+
+
+# ============================================================
+#   ROLLING COVARIANCE / CORRELATION (incremental)
+# ============================================================
+# Covariance of daily returns over the last `window` sessions for the
+# whole universe, kept as running pairwise sums:
+#
+#     count[i, j]  = days where both i and j have a return
+#     sum_x[i, j]  = Σ r_i   over those days
+#     sum_xx[i, j] = Σ r_i²  over those days
+#     sum_xy[i, j] = Σ r_i·r_j
+#
+# A new session adds four outer products and the session leaving the
+# window (kept in a ring buffer) subtracts them again – O(N²) per day
+# instead of O(window · N²) for a full recompute. Pairwise sums keep
+# symbols with gaps (new listings, suspensions) usable.
+#
+# run_daily.py advances the persisted state (data/risk/rolling_cov.npz)
+# once per run; pages only load it.
+
+WINDOW = 60                 # sessions (~3 months)
+MIN_PERIODS = 20            # fewer overlapping days → NaN
+TRADING_DAYS = 252
+
+# Sums are rebuilt from the ring buffer every REBUILD_EVERY updates so
+# add/subtract rounding never accumulates
+REBUILD_EVERY = 250
+
+STATE_FILE = Path(__file__).resolve().parents[1] / "data" / "risk" / "rolling_cov.npz"
+
+
+def daily_returns(prices) -> pd.DataFrame:
+    """
+    Date × Symbol close-to-close returns from a PricePanel or long frame.
+    A missing bar carries the last close, so returns span sessions; days
+    without a bar are NaN.
+    """
+    if isinstance(prices, pd.DataFrame):
+        prices = PricePanel.from_long(prices, fields=["Close"])
+
+    close = prices.frame("Close").ffill()
+    return close.pct_change(1, fill_method=None).where(prices.valid)
+
+
+class RollingCovariance:
+    def __init__(self, symbols, window: int = WINDOW):
+        self.symbols = pd.Index(symbols)
+        self.window = int(window)
+
+        n = len(self.symbols)
+        self.buffer = np.full((self.window, n), np.nan)
+        self.dates = np.full(self.window, np.datetime64("NaT"), dtype="datetime64[ns]")
+        self.head = 0           # next ring slot
+        self.filled = 0
+        self.updates = 0
+        self._rebuild()
+
+    # --------------------------------------------------------
+    #   RUNNING SUMS
+    # --------------------------------------------------------
+    def _apply(self, x: np.ndarray, sign: float) -> None:
+        has = np.isfinite(x)
+        x = np.where(has, x, 0.0)
+        has = has.astype(float)
+
+        self.count += sign * np.outer(has, has)
+        self.sum_x += sign * np.outer(x, has)
+        self.sum_xx += sign * np.outer(x * x, has)
+        self.sum_xy += sign * np.outer(x, x)
+
+    def _rebuild(self) -> None:
+        """Exact sums from the buffered sessions (matrix products, O(window · N²))."""
+        rows = self.buffer[: self.filled]
+        has = np.isfinite(rows).astype(float)
+        x = np.nan_to_num(rows)
+
+        self.count = has.T @ has
+        self.sum_x = x.T @ has
+        self.sum_xx = (x * x).T @ has
+        self.sum_xy = x.T @ x
+
+    # --------------------------------------------------------
+    #   UPDATES
+    # --------------------------------------------------------
+    @property
+    def last_date(self):
+        return None if self.filled == 0 else pd.Timestamp(self.dates[(self.head - 1) % self.window])
+
+    def update(self, date, returns) -> None:
+        """
+        Push one session. `returns` is a Series indexed by symbol (missing
+        symbols → no return) or an array aligned with `self.symbols`.
+        """
+        if isinstance(returns, pd.Series):
+            x = returns.reindex(self.symbols).to_numpy(dtype=float)
+        else:
+            x = np.asarray(returns, dtype=float)
+
+        if self.filled == self.window:
+            self._apply(self.buffer[self.head], -1.0)
+        else:
+            self.filled += 1
+
+        self.buffer[self.head] = x
+        self.dates[self.head] = np.datetime64(pd.Timestamp(date), "ns")
+        self.head = (self.head + 1) % self.window
+        self._apply(x, 1.0)
+
+        self.updates += 1
+        if self.updates % REBUILD_EVERY == 0:
+            self._rebuild()
+
+    @classmethod
+    def from_returns(cls, returns: pd.DataFrame, window: int = WINDOW) -> "RollingCovariance":
+        """Initial state from the last `window` rows of a Date × Symbol return frame."""
+        state = cls(returns.columns, window)
+        tail = returns.iloc[-window:]
+
+        state.filled = len(tail)
+        state.buffer[: state.filled] = tail.to_numpy(dtype=float)
+        state.dates[: state.filled] = tail.index.to_numpy(dtype="datetime64[ns]")
+        state.head = state.filled % window
+        state._rebuild()
+        return state
+
+    # --------------------------------------------------------
+    #   ESTIMATES
+    # --------------------------------------------------------
+    def covariance(self, min_periods: int = MIN_PERIODS) -> pd.DataFrame:
+        """Pairwise sample covariance of daily returns (NaN below min_periods)."""
+        n = self.count
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = (self.sum_xy - self.sum_x * self.sum_x.T / n) / (n - 1)
+        cov[n < max(min_periods, 2)] = np.nan
+        return pd.DataFrame(cov, index=self.symbols, columns=self.symbols)
+
+    def correlation(self, min_periods: int = MIN_PERIODS) -> pd.DataFrame:
+        """Pairwise correlation; each pair uses the variances of its common days."""
+        n = self.count
+        with np.errstate(divide="ignore", invalid="ignore"):
+            co = self.sum_xy - self.sum_x * self.sum_x.T / n
+            var_i = self.sum_xx - self.sum_x ** 2 / n
+            corr = co / np.sqrt(var_i * var_i.T)
+        corr = np.clip(corr, -1.0, 1.0)
+        corr[n < max(min_periods, 2)] = np.nan
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+    def shrunk_covariance(self, intensity: float | None = None, min_periods: int = MIN_PERIODS) -> pd.DataFrame:
+        """
+        Ledoit-Wolf shrinkage of the covariance towards a scaled identity,
+        for the symbols with enough history (others are dropped).
+
+        `intensity=None` estimates the optimal weight from the buffered
+        returns in O(window · N); pass a float in [0, 1] to fix it.
+        A well-conditioned matrix for sizing even when N ≥ window.
+        """
+        cov = self.covariance(min_periods)
+        ok = np.isfinite(np.diag(cov.to_numpy()))
+        s = cov.to_numpy()[np.ix_(ok, ok)]
+        s = np.nan_to_num(s)
+        p = s.shape[0]
+        if p == 0:
+            return cov.iloc[:0, :0]
+
+        mu = np.trace(s) / p
+        target = mu * np.eye(p)
+
+        if intensity is None:
+            rows = self.buffer[: self.filled][:, ok]
+            x = np.nan_to_num(rows - np.nanmean(rows, axis=0))
+            t = max(len(x), 1)
+
+            # π: Σ_t ‖x_t x_tᵀ − S‖²_F / t² with ‖x xᵀ‖²_F = (xᵀx)² – no N×N per day
+            d2 = np.sum((s - target) ** 2)
+            b2 = (np.sum(np.sum(x * x, axis=1) ** 2) / t - np.sum(s ** 2)) / t
+            intensity = 0.0 if d2 <= 0 else float(np.clip(b2 / d2, 0.0, 1.0))
+
+        shrunk = intensity * target + (1 - intensity) * s
+        labels = self.symbols[ok]
+        return pd.DataFrame(shrunk, index=labels, columns=labels)
+
+    # --------------------------------------------------------
+    #   PERSISTENCE
+    # --------------------------------------------------------
+    def save(self, path: Path = STATE_FILE) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # np.savez appends .npz to names without it – write under the final suffix
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(
+            tmp,
+            symbols=self.symbols.to_numpy(dtype=str),
+            window=self.window,
+            buffer=self.buffer,
+            dates=self.dates,
+            head=self.head,
+            filled=self.filled,
+            updates=self.updates,
+            count=self.count,
+            sum_x=self.sum_x,
+            sum_xx=self.sum_xx,
+            sum_xy=self.sum_xy,
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = STATE_FILE) -> "RollingCovariance | None":
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        with np.load(path) as data:
+            state = cls.__new__(cls)
+            state.symbols = pd.Index(data["symbols"].astype(str))
+            state.window = int(data["window"])
+            state.buffer = data["buffer"]
+            state.dates = data["dates"]
+            state.head = int(data["head"])
+            state.filled = int(data["filled"])
+            state.updates = int(data["updates"])
+            state.count = data["count"]
+            state.sum_x = data["sum_x"]
+            state.sum_xx = data["sum_xx"]
+            state.sum_xy = data["sum_xy"]
+        return state
+
+
+# ============================================================
+#   DAILY UPDATE (run_daily.py)
+# ============================================================
+def update_risk_state(prices, path: Path = STATE_FILE, window: int = WINDOW) -> RollingCovariance:
+    """
+    Advance the persisted state by the sessions after its last date.
+    Rebuilt from scratch when there is no state yet, the universe or
+    window changed, or its last date is no longer in the price history.
+    """
+    returns = daily_returns(prices)
+    state = RollingCovariance.load(path)
+
+    if (
+        state is None
+        or state.window != window
+        or not state.symbols.equals(returns.columns)
+        or state.last_date not in returns.index
+    ):
+        state = RollingCovariance.from_returns(returns, window)
+    else:
+        new = returns.loc[returns.index > state.last_date]
+        for date, row in zip(new.index, new.to_numpy(dtype=float)):
+            state.update(date, row)
+
+    state.save(path)
+    return state
+
+
+# ============================================================
+#   SIZING HELPERS
+# ============================================================
+def annualized_volatility(cov: pd.DataFrame, periods: int = TRADING_DAYS) -> pd.Series:
+    return pd.Series(np.sqrt(np.diag(cov.to_numpy()) * periods), index=cov.index, name="Volatility")
+
+
+def inverse_vol_weights(cov: pd.DataFrame, symbols=None, max_weight: float | None = None) -> pd.Series:
+    """
+    Weights ∝ 1 / volatility, summing to 1 over `symbols` (all by default).
+    Symbols without a volatility get no weight; `max_weight` caps any
+    one position and hands the excess to the rest.
+    """
+    vol = annualized_volatility(cov)
+    if symbols is not None:
+        vol = vol.reindex(pd.Index(symbols))
+
+    inv = (1 / vol).replace([np.inf, -np.inf], np.nan).dropna()
+    if inv.empty:
+        return inv.rename("Weight")
+
+    weights = inv / inv.sum()
+    if max_weight is not None and max_weight * len(weights) >= 1:
+        # Cap and re-spread until no weight exceeds the cap
+        for _ in range(len(weights)):
+            over = weights > max_weight
+            if not over.any():
+                break
+            excess = (weights[over] - max_weight).sum()
+            weights[over] = max_weight
+            free = ~over & (weights < max_weight)
+            weights[free] += excess * weights[free] / weights[free].sum()
+
+    return weights.rename("Weight")
+
+
+def portfolio_volatility(weights: pd.Series, cov: pd.DataFrame, periods: int = TRADING_DAYS) -> float:
+    """Annualized volatility of a weight vector under `cov`."""
+    cov = cov.reindex(index=weights.index, columns=weights.index).fillna(0.0).to_numpy()
+    w = weights.to_numpy(dtype=float)
+    return float(np.sqrt(max(w @ cov @ w, 0.0) * periods))
@@ -0,0 +1,227 @@
+import functools
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource     # POSIX only
+except ImportError:
+    resource = None
+
+
+# ============================================================
+#   STRUCTURED RUN LOG FOR THE BATCH SCRIPTS
+# ============================================================
+# Usage (nse_fetch / train_model / run_daily):
+#
+#     log = get_run_log()
+#     with log.stage("features") as s:
+#         df_feat = create_features(df)
+#         s.rows = len(df_feat)
+#
+#     @timed("predict")
+#     def predict(...): ...
+#
+# Switched on with `--log` or STOCKAPP_RUN_LOG=1. Every stage is appended
+# as one JSON line to data/logs/run_log.jsonl (path overridable through
+# STOCKAPP_RUN_LOG_FILE) and a summary is printed at the end of the run.
+# When disabled, stage() hands back a shared no-op object: no clock
+# reads, no allocations, no I/O.
+
+ENV_VAR = "STOCKAPP_RUN_LOG"
+ENV_FILE = "STOCKAPP_RUN_LOG_FILE"
+DEFAULT_LOG_FILE = Path(__file__).resolve().parents[1] / "data" / "logs" / "run_log.jsonl"
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process (None where unsupported)."""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class _NullStage:
+    """Returned by stage() when logging is off – accepts and drops everything."""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, log: "RunLog", name: str, fields: dict):
+        self._log = log
+        self.name = name
+        self.fields = fields
+        self.rows = None
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._log._record_stage(
+            self.name,
+            time.perf_counter() - self._t0,
+            self.rows,
+            self.fields,
+            error=None if exc_type is None else f"{exc_type.__name__}: {exc}",
+        )
+        return False
+
+
+class RunLog:
+    def __init__(self, script: str = "", enabled: bool = False, path: Path | None = None):
+        self.script = script
+        self.enabled = enabled
+        self.path = Path(path) if path else DEFAULT_LOG_FILE
+        self.run_id = uuid.uuid4().hex[:12]
+        self._t0 = time.perf_counter()
+        self._stages = {}
+
+    # --------------------------------------------------------
+    #   PUBLIC API
+    # --------------------------------------------------------
+    def stage(self, name: str, **fields):
+        """Context manager timing one stage; set `.rows` on it to log a row count."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, fields)
+
+    def event(self, kind: str, **fields) -> None:
+        """Free-form structured event (e.g. counts, warnings)."""
+        if self.enabled:
+            self._write({"kind": kind, **fields})
+
+    def summary(self) -> dict:
+        """Write and print the end-of-run summary (per stage name aggregates)."""
+        if not self.enabled:
+            return {}
+
+        total = time.perf_counter() - self._t0
+        summary = {
+            "total_s": round(total, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self._stages,
+        }
+        self._write({"kind": "summary", **summary})
+
+        print(f"⏱ Run summary ({self.script}, {total:.2f} s, peak RSS {summary['peak_rss_mb']} MB)")
+        for name, agg in sorted(self._stages.items(), key=lambda kv: -kv[1]["total_s"]):
+            rows = f"  {agg['rows']:,} rows" if agg["rows"] else ""
+            count = f" ×{agg['count']}" if agg["count"] > 1 else ""
+            print(
+                f"   {name:<32}{agg['total_s']:>9.2f} s{count}"
+                f"  (max {agg['max_s']:.3f} s){rows}"
+                + (f"  ❌ {agg['errors']} failed" if agg["errors"] else "")
+            )
+        print(f"📝 Run log → {self.path}")
+
+        return summary
+
+    # --------------------------------------------------------
+    #   INTERNALS
+    # --------------------------------------------------------
+    def _record_stage(self, name, seconds, rows, fields, error=None) -> None:
+        agg = self._stages.setdefault(
+            name, {"count": 0, "total_s": 0.0, "max_s": 0.0, "rows": 0, "errors": 0}
+        )
+        agg["count"] += 1
+        agg["total_s"] = round(agg["total_s"] + seconds, 6)
+        agg["max_s"] = round(max(agg["max_s"], seconds), 6)
+        agg["rows"] += int(rows or 0)
+        agg["errors"] += error is not None
+
+        self._write({
+            "kind": "stage",
+            "name": name,
+            "seconds": round(seconds, 6),
+            "rows": rows,
+            "peak_rss_mb": peak_rss_mb(),
+            **({"error": error} if error else {}),
+            **fields,
+        })
+
+    def _write(self, record: dict) -> None:
+        record = {
+            "run_id": self.run_id,
+            "script": self.script,
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            **record,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            print(f"⚠ Run log write failed ({e}); logging disabled")
+            self.enabled = False
+
+
+# ============================================================
+#   PROCESS-WIDE INSTANCE
+# ============================================================
+_RUN_LOG = RunLog()
+
+
+def get_run_log() -> RunLog:
+    return _RUN_LOG
+
+
+def init_run_log(script: str, enabled: bool | None = None) -> RunLog:
+    """
+    Configure the process-wide run log once, from the entry script.
+    enabled=None → decided by the STOCKAPP_RUN_LOG environment variable.
+    Nested entry points (run_daily → nse_fetch.main) reuse the same log.
+    """
+    global _RUN_LOG
+
+    if enabled is None:
+        enabled = os.environ.get(ENV_VAR, "").lower() in ("1", "true", "yes", "on")
+
+    _RUN_LOG = RunLog(script, enabled, os.environ.get(ENV_FILE) or None)
+    return _RUN_LOG
+
+
+def timed(name: str | None = None):
+    """
+    Decorator form of RunLog.stage(); the log is looked up at call time.
+    Returned frames/arrays are counted as the stage's rows.
+    """
+
+    def decorator(fn):
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            log = get_run_log()
+            if not log.enabled:
+                return fn(*args, **kwargs)
+            with log.stage(stage_name) as stage:
+                out = fn(*args, **kwargs)
+                # Row count of a returned frame (or of the first item of a tuple)
+                first = out[0] if isinstance(out, tuple) and out else out
+                if hasattr(first, "shape"):
+                    stage.rows = len(first)
+                return out
+
+        return wrapper
+
+    return decorator
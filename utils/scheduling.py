@@ -0,0 +1,149 @@
+import json
+import os
+import socket
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from utils.market_calendar import (
+    IST,
+    is_trading_day,
+    last_closed_session,
+    load_holidays,
+    next_trading_day,
+    now_ist,
+    session_close,
+)
+
+
+# ============================================================
+#   SCHEDULE (shared by scheduler.py and the Admin page)
+# ============================================================
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+STATE_FILE = DATA_DIR / "scheduler_state.json"
+LOCK_FILE = DATA_DIR / "pipeline.lock"
+
+RUN_DELAY = timedelta(minutes=30)     # first poll 30 min after the 15:30 close
+POLL_INTERVAL_S = 600                 # then every 10 min …
+POLL_WINDOW = timedelta(hours=6)      # … until the bar shows up or 21:30 IST (close + 6 h)
+LOCK_STALE_AFTER = timedelta(hours=6)
+
+
+def read_state(path: Path = STATE_FILE) -> dict:
+    """Last processed session + outcome; {} before the first scheduled run."""
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(state: dict, path: Path = STATE_FILE) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=1, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def next_due(now: datetime | None = None, last_session: date | None = None) -> tuple[date, datetime]:
+    """
+    (session, due_at) of the next pipeline run.
+    • The latest closed session not yet processed is due RUN_DELAY after its close
+      (immediately, when catching up after downtime)
+    • Otherwise the next trading day's close + RUN_DELAY
+    """
+    now = (now or now_ist()).astimezone(IST)
+    holidays = load_holidays()
+
+    session = last_closed_session(now, holidays)
+    if last_session is None or last_session < session:
+        return session, max(now, session_close(session) + RUN_DELAY)
+
+    today = now.date()
+    upcoming = today if is_trading_day(today, holidays) and today > session else next_trading_day(today, holidays)
+    return upcoming, session_close(upcoming) + RUN_DELAY
+
+
+# ============================================================
+#   PIPELINE LOCK (one fetch/predict run at a time)
+# ============================================================
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True     # os.kill(pid, 0) terminates on Windows – rely on age only
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PipelineLock:
+    """
+    Lock file created with O_EXCL, so two processes can never both hold it.
+    A lock left behind by a crashed run is taken over once its process is
+    gone (same host) or it is older than LOCK_STALE_AFTER.
+    """
+
+    def __init__(self, owner: str, path: Path = LOCK_FILE):
+        self.owner = owner
+        self.path = Path(path)
+        self.held = False
+
+    def acquire(self) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._is_stale():
+                    return False
+                print(f"🧹 Removing stale lock: {self.holder()}")
+                self.path.unlink(missing_ok=True)
+                continue
+
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({
+                    "owner": self.owner,
+                    "pid": os.getpid(),
+                    "host": socket.gethostname(),
+                    "started_at": now_ist().isoformat(timespec="seconds"),
+                    "started_ts": time.time(),
+                }, f)
+            self.held = True
+            return True
+        return False
+
+    def release(self) -> None:
+        if self.held:
+            self.path.unlink(missing_ok=True)
+            self.held = False
+
+    def holder(self) -> dict:
+        return lock_status(self.path) or {}
+
+    def _is_stale(self) -> bool:
+        info = self.holder()
+        if not info:
+            return True     # empty / unreadable: the writer died mid-create
+        if time.time() - info.get("started_ts", 0) > LOCK_STALE_AFTER.total_seconds():
+            return True
+        return info.get("host") == socket.gethostname() and not _pid_alive(int(info.get("pid", 0)))
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def lock_status(path: Path = LOCK_FILE) -> dict | None:
+    """Contents of the lock file, or None when no run is active."""
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        return {}
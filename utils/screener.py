@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+#   DERIVED SCREENING COLUMNS
+# ============================================================
+def add_screen_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds ratio columns used by the screener:
+        • ATR_Pct        → ATR_14 / Close (in %)
+        • Close_vs_SMA20 → Close / SMA_20 - 1 (in %)
+    """
+
+    df = df.copy()
+
+    close = df["Close"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["ATR_Pct"] = df["ATR_14"].to_numpy(dtype=float) / close * 100
+        df["Close_vs_SMA20"] = (close / df["SMA_20"].to_numpy(dtype=float) - 1) * 100
+
+    return df
+
+
+# ============================================================
+#   VECTORIZED UNIVERSE SCAN
+# ============================================================
+def screen_universe(
+    df: pd.DataFrame,
+    rsi_range: tuple = (0.0, 100.0),
+    sma20_filter: str = "any",
+    atr_pct_range: tuple = (0.0, np.inf),
+    min_prob_up: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Evaluate all filters across the latest feature row of every symbol
+    in one pass of boolean array operations (no per-symbol loop).
+
+    Filters:
+        • rsi_range      → RSI_14 within [low, high]
+        • sma20_filter   → "any", "above" (Close > SMA_20) or "below"
+        • atr_pct_range  → ATR % of Close within [low, high]
+        • min_prob_up    → Probability_Up >= threshold
+
+    Expects the output of add_screen_columns().
+    """
+
+    if df.empty:
+        return df
+
+    rsi = df["RSI_14"].to_numpy(dtype=float)
+    atr_pct = df["ATR_Pct"].to_numpy(dtype=float)
+    vs_sma = df["Close_vs_SMA20"].to_numpy(dtype=float)
+
+    mask = (rsi >= rsi_range[0]) & (rsi <= rsi_range[1])
+    mask &= (atr_pct >= atr_pct_range[0]) & (atr_pct <= atr_pct_range[1])
+
+    if sma20_filter == "above":
+        mask &= vs_sma > 0
+    elif sma20_filter == "below":
+        mask &= vs_sma < 0
+
+    if min_prob_up > 0 and "Probability_Up" in df.columns:
+        mask &= df["Probability_Up"].to_numpy(dtype=float) >= min_prob_up
+
+    return df[mask]
@@ -0,0 +1,143 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from utils.run_log import get_run_log
+
+
+# ============================================================
+#   SYMBOL SHARDS OVER A PROCESS POOL
+# ============================================================
+# Used by nse_fetch (download), train_model (features) and run_daily
+# (features + scoring):
+#
+#     shards = shard_symbols(symbols, n_shards)
+#     results, failed = run_sharded(fetch_shard, shards, label="fetch")
+#
+# Each shard is an independent task. A shard that raises is reported
+# and skipped – the others still finish and get merged. Progress is
+# printed as shards complete, and every shard is recorded in the run log.
+
+ENV_WORKERS = "STOCKAPP_WORKERS"
+SHARDS_PER_WORKER = 4     # small shards keep the pool busy until the end
+
+
+def worker_count(processes: int | None = None) -> int:
+    """--workers N on the command line, else STOCKAPP_WORKERS, else all cores."""
+    if processes is None and "--workers" in sys.argv:
+        idx = sys.argv.index("--workers")
+        if idx + 1 < len(sys.argv):
+            processes = int(sys.argv[idx + 1])
+    if processes is None and os.environ.get(ENV_WORKERS):
+        processes = int(os.environ[ENV_WORKERS])
+    return max(1, processes or os.cpu_count() or 1)
+
+
+def shard_symbols(symbols: list, n_shards: int) -> list[list]:
+    """Contiguous, near-equal shards of a symbol (or item) list, order preserved."""
+    n_shards = max(1, min(n_shards, len(symbols)))
+    bounds = np.linspace(0, len(symbols), n_shards + 1).astype(int)
+    return [list(symbols[a:b]) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def shard_frame(df: pd.DataFrame, n_shards: int, col: str = "Symbol") -> list[pd.DataFrame]:
+    """Split a long frame into shards of whole symbols, in sorted symbol order."""
+    symbols = sorted(df[col].unique())
+    shards = shard_symbols(list(symbols), n_shards)
+    codes = pd.Categorical(df[col], categories=symbols).codes
+    shard_of = np.repeat(np.arange(len(shards)), [len(s) for s in shards])[codes]
+    return [df[shard_of == i] for i in range(len(shards))]
+
+
+def _shard_size(shard) -> int:
+    if isinstance(shard, tuple):
+        # (frame, extra inputs) task: size of the frame
+        shard = shard[0]
+    if isinstance(shard, pd.DataFrame):
+        return shard["Symbol"].nunique() if "Symbol" in shard else len(shard)
+    return len(shard)
+
+
+def _timed_call(fn, shard):
+    t0 = time.perf_counter()
+    return fn(shard), time.perf_counter() - t0
+
+
+def run_sharded(
+    fn,
+    shards: list,
+    processes: int | None = None,
+    label: str = "shard",
+    initializer=None,
+    initargs: tuple = (),
+) -> tuple[list, list]:
+    """
+    Apply `fn` (a module-level function) to every shard.
+
+    processes=1 (or a single shard) runs inline; otherwise a process pool
+    with `initializer(*initargs)` run once per worker.
+
+    Returns (results, failed):
+        results → fn outputs in shard order (None for failed shards)
+        failed  → [(shard index, "ExcType: message"), ...]
+    """
+    processes = worker_count(processes)
+    n = len(shards)
+    results = [None] * n
+    failed = []
+    completed = 0
+    log = get_run_log()
+    t_start = time.perf_counter()
+
+    def report(i, seconds=None, error=None):
+        nonlocal completed
+        completed += 1
+        size = _shard_size(shards[i])
+        if error is None:
+            print(f"   ✅ {label} {completed}/{n} · shard {i + 1}: {size} symbols in {seconds:.1f} s")
+        else:
+            print(f"   ❌ {label} {completed}/{n} · shard {i + 1} ({size} symbols) failed: {error}")
+        log.event(
+            "shard", label=label, shard=i, symbols=size,
+            seconds=None if seconds is None else round(seconds, 4),
+            **({"error": error} if error else {}),
+        )
+
+    print(f"🧩 {label}: {n} shards on {min(processes, n)} worker(s)")
+
+    if processes <= 1 or n <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for i, shard in enumerate(shards):
+            try:
+                results[i], seconds = _timed_call(fn, shard)
+            except Exception as e:
+                failed.append((i, f"{type(e).__name__}: {e}"))
+                report(i, error=failed[-1][1])
+            else:
+                report(i, seconds)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(processes, n), initializer=initializer, initargs=initargs
+        ) as pool:
+            futures = {pool.submit(partial(_timed_call, fn), shard): i for i, shard in enumerate(shards)}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    results[i], seconds = fut.result()
+                except Exception as e:
+                    failed.append((i, f"{type(e).__name__}: {e}"))
+                    report(i, error=failed[-1][1])
+                else:
+                    report(i, seconds)
+
+    elapsed = time.perf_counter() - t_start
+    status = f"{len(failed)} failed" if failed else "all ok"
+    print(f"🧩 {label}: {n - len(failed)}/{n} shards in {elapsed:.1f} s ({status})")
+
+    return results, sorted(failed)
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from utils.indicators import to_wide
+
+
+# ============================================================
+#   DEFAULTS
+# ============================================================
+THRESHOLDS = np.round(np.arange(0.50, 0.71, 0.01), 2)
+RULES = ["long_flat", "long_short"]
+
+# Max elements of one (threshold, date, symbol) block held in memory
+_BLOCK_ELEMENTS = 4_000_000
+
+
+# ============================================================
+#   SIGNAL SOURCES
+# ============================================================
+def history_signals(hist_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Probability_Up from predictions_history.csv as a Date × Symbol frame.
+    When a (Symbol, Date) was predicted by several runs, the latest run wins.
+    """
+    hist = hist_df.dropna(subset=["Date", "Symbol", "Probability_Up"])
+    if "Run_Timestamp" in hist.columns:
+        hist = hist.sort_values("Run_Timestamp", kind="stable")
+
+    return to_wide(hist, "Probability_Up")
+
+
+def backfill_signals(price_df: pd.DataFrame, dir_model) -> pd.DataFrame:
+    """
+    Vectorized backfill: training features for the whole price history,
+    scored by the direction model in ONE predict_proba call.
+
+    NOTE: the model was trained on most of this history, so backfilled
+    signals are largely in-sample – useful for mechanics, optimistic
+    for performance.
+    """
+    # Lazy import: train_model pulls in sklearn
+    from train_model import create_features
+
+    feat, feature_cols = create_features(price_df)
+
+    # Models fitted on a frame know their columns (older models: fewer features)
+    cols = list(getattr(dir_model, "feature_names_in_", feature_cols))
+
+    feat = feat[["Date", "Symbol"]].assign(
+        Probability_Up=dir_model.predict_proba(feat[cols])[:, 1]
+    )
+    return to_wide(feat, "Probability_Up")
+
+
+# ============================================================
+#   BATCHED THRESHOLD BACKTEST
+# ============================================================
+def signal_backtest(
+    prob: pd.DataFrame,
+    price_df: pd.DataFrame,
+    thresholds=THRESHOLDS,
+    rule: str = "long_flat",
+    cost_bps: float = 10.0,
+) -> dict:
+    """
+    Backtest threshold rules on the model's Probability_Up for many
+    thresholds at once.
+
+    Signals dated D are traded at D's close and held to the next close:
+        • long  when Probability_Up >= threshold
+        • short when Probability_Up <= 1 - threshold ("long_short" only)
+        • flat  otherwise (and when there is no prediction)
+
+    Each day the active positions are equally weighted (gross exposure 1
+    whenever anything is held). Costs are charged on turnover (|Δweight|)
+    at `cost_bps` per unit traded.
+
+    Predictions and prices are joined by (Date, Symbol) through index
+    alignment of the two Date × Symbol frames. All thresholds are
+    evaluated as one (threshold, date, symbol) array, split into blocks
+    only when it would not fit the memory budget.
+
+    Returns:
+        {
+            "stats": DataFrame, one row per threshold
+            "equity": DataFrame (Date × threshold), growth of 1
+            "benchmark": Series, equal-weight buy & hold of the same symbols
+            "symbols": symbols with both predictions and prices
+        }
+    """
+    if rule not in RULES:
+        raise ValueError(f"rule must be one of {RULES}, got {rule!r}")
+
+    thresholds = np.asarray(thresholds, dtype=float)
+
+    # --- Join on (Date, Symbol) ---
+    close = to_wide(price_df, "Close")
+    fwd_ret = close.shift(-1) / close - 1
+
+    prob = prob.reindex(columns=prob.columns.intersection(close.columns))
+    dates = prob.index.intersection(fwd_ret.dropna(how="all").index)
+
+    p = prob.reindex(index=dates).to_numpy(dtype=np.float32)
+    r = fwd_ret.reindex(index=dates, columns=prob.columns).to_numpy(dtype=np.float32)
+
+    # No price → no trade
+    p = np.where(np.isfinite(r), p, np.nan)
+    r = np.nan_to_num(r)
+
+    n_dates, n_symbols = p.shape
+    daily = np.zeros((len(thresholds), n_dates))
+    turnover = np.zeros((len(thresholds), n_dates))
+    exposure = np.zeros((len(thresholds), n_dates))
+    hits = np.zeros(len(thresholds))
+    bets = np.zeros(len(thresholds))
+
+    block = max(1, _BLOCK_ELEMENTS // max(n_dates * n_symbols, 1))
+    with np.errstate(invalid="ignore"):
+        for k0 in range(0, len(thresholds), block):
+            th = thresholds[k0:k0 + block, None, None].astype(np.float32)
+
+            pos = (p >= th).astype(np.float32)
+            if rule == "long_short":
+                pos -= (p <= 1 - th)
+
+            n_active = np.abs(pos).sum(axis=2, keepdims=True)
+            w = pos / np.maximum(n_active, 1)
+
+            prev = np.concatenate([np.zeros_like(w[:, :1]), w[:, :-1]], axis=1)
+
+            ks = slice(k0, k0 + len(th))
+            daily[ks] = (w * r).sum(axis=2)
+            turnover[ks] = np.abs(w - prev).sum(axis=2)
+            exposure[ks] = np.abs(w).sum(axis=2)
+            hits[ks] = ((pos * r) > 0).sum(axis=(1, 2))
+            bets[ks] = (pos != 0).sum(axis=(1, 2))
+
+    net = daily - turnover * cost_bps / 1e4
+    equity = np.cumprod(1 + net, axis=1)
+
+    stats = pd.DataFrame({
+        "threshold": thresholds,
+        "total_return": equity[:, -1] - 1 if n_dates else 0.0,
+        "max_drawdown": _max_drawdown(equity),
+        "sharpe": _sharpe(net),
+        "hit_rate": np.divide(hits, bets, out=np.full_like(hits, np.nan), where=bets > 0),
+        "n_positions": bets.astype(np.int64),
+        "avg_exposure": exposure.mean(axis=1) if n_dates else 0.0,
+        "avg_turnover": turnover.mean(axis=1) if n_dates else 0.0,
+    })
+
+    benchmark = pd.Series(
+        np.cumprod(1 + r.mean(axis=1)) if n_symbols else np.ones(n_dates),
+        index=dates,
+        name="Buy & hold",
+    )
+
+    return {
+        "stats": stats,
+        "equity": pd.DataFrame(equity.T, index=dates, columns=thresholds),
+        "benchmark": benchmark,
+        "symbols": list(prob.columns),
+    }
+
+
+def _max_drawdown(equity: np.ndarray) -> np.ndarray:
+    if equity.shape[1] == 0:
+        return np.zeros(equity.shape[0])
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)
+    return ((equity - peak) / peak).min(axis=1)
+
+
+def _sharpe(daily: np.ndarray) -> np.ndarray:
+    std = daily.std(axis=1)
+    return np.divide(daily.mean(axis=1) * np.sqrt(252), std, out=np.zeros_like(std), where=std > 0)
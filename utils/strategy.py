@@ -3,10 +3,260 @@ import numpy as np
 import ta
 
 
+# ============================================================
+#   INDICATORS USED BY THE ATR STRATEGY
+# ============================================================
+def average_true_range(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14
+) -> np.ndarray:
+    """
+    Same values as ta.volatility.average_true_range (Wilder smoothing,
+    zeros during warm-up), but the recursion runs over plain floats
+    instead of pandas .iloc lookups – ~50x faster on long histories.
+    """
+    n = len(close)
+    if n < window:
+        raise ValueError("not enough bars for ATR")
+
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.fmax(
+        high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+
+    atr = np.zeros(n)
+    value = float(pd.Series(true_range[:window]).mean())
+    atr[window - 1] = value
+
+    out = atr.tolist()
+    for i, tr in enumerate(true_range[window:].tolist(), start=window):
+        value = (value * (window - 1) + tr) / float(window)
+        out[i] = value
+
+    return np.asarray(out)
+
+
+def compute_atr_indicators(df: pd.DataFrame) -> pd.DataFrame | None:
+    """
+    Adds SMA_20, RSI_14 and ATR_14 and drops the warm-up rows.
+    Returns None when the indicators cannot be computed.
+    """
+
+    if df is None or df.empty:
+        return None
+
+    # Sort data
+    df = df.sort_values("Date").copy()
+
+    # Basic Indicators
+    df["SMA_20"] = df["Close"].rolling(20).mean()
+
+    # RSI + ATR (with safe try/except)
+    try:
+        df["RSI_14"] = ta.momentum.rsi(df["Close"], window=14)
+        df["ATR_14"] = average_true_range(
+            df["High"].to_numpy(dtype=float),
+            df["Low"].to_numpy(dtype=float),
+            df["Close"].to_numpy(dtype=float),
+            window=14,
+        )
+    except Exception:
+        return None
+
+    # Drop rows with missing values
+    df = df.dropna(subset=["SMA_20", "RSI_14", "ATR_14"])
+    if df.empty:
+        return None
+
+    return df
+
+
+# ============================================================
+#   ARRAY KERNEL
+# ============================================================
+def _next_true(mask: np.ndarray) -> np.ndarray:
+    """
+    For every bar i, the index of the first True at or after i
+    (len(mask) when there is none).
+    """
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+
+def atr_signal_arrays(
+    close: np.ndarray,
+    sma: np.ndarray,
+    rsi: np.ndarray,
+    rsi_entry: float = 50.0,
+    rsi_exit: float = 45.0,
+) -> dict:
+    """
+    Entry / trend-break jump tables for the kernel:
+        • next_entry[i] → first bar >= i with Close > SMA20 and RSI > rsi_entry
+        • cand          → every bar where an entry could happen
+        • limit         → for each candidate, the first trend-break bar
+                          after it (Close < SMA20 or RSI < rsi_exit)
+    None of these depend on the ATR multipliers, so parameter sweeps
+    reuse them across every stop / take-profit combination.
+    """
+    n = len(close)
+    entry = (close > sma) & (rsi > rsi_entry)
+    trend_break = (close < sma) | (rsi < rsi_exit)
+
+    next_entry = _next_true(entry)
+    next_break = np.append(_next_true(trend_break), n)
+
+    cand = np.flatnonzero(entry)
+    start = cand + 1
+
+    return {
+        "next_entry": np.append(next_entry, n),
+        "cand": cand,
+        "start": start,
+        "limit": next_break[start],
+    }
+
+
+def crossing_tables(close: np.ndarray, max_span: int) -> tuple[list, list]:
+    """
+    Sparse tables of running min / max of Close over windows of 2^k
+    bars, for k up to what `max_span` needs. Level k holds
+    min(close[i : i + 2^k]) at position i.
+    """
+    min_table = [close]
+    max_table = [close]
+
+    k = 1
+    while (1 << k) <= max(int(max_span), 1) and (1 << k) <= len(close):
+        half = 1 << (k - 1)
+        prev_min, prev_max = min_table[-1], max_table[-1]
+        min_table.append(np.minimum(prev_min[:-half], prev_min[half:]))
+        max_table.append(np.maximum(prev_max[:-half], prev_max[half:]))
+        k += 1
+
+    return min_table, max_table
+
+
+def _first_crossing(table, start, limit, threshold, below: bool) -> np.ndarray:
+    """
+    For every row, the first bar p in [start, limit) with
+    close[p] <= threshold (below=True) or close[p] >= threshold,
+    else `limit`. Binary lifting over the sparse table: skip whole
+    2^k blocks that never cross, largest blocks first.
+    """
+    pos = start.copy()
+
+    for k in range(len(table) - 1, -1, -1):
+        step = 1 << k
+        level = table[k]
+
+        fits = pos + step <= limit
+        vals = level[np.where(fits, pos, 0)]
+        clear = (vals > threshold) if below else (vals < threshold)
+        pos = np.where(fits & clear, pos + step, pos)
+
+    return pos
+
+
+def atr_exit_bars(
+    close: np.ndarray,
+    atr: np.ndarray,
+    signals: dict,
+    tables: tuple,
+    atr_mult_stop: float,
+    atr_mult_tp: float,
+) -> np.ndarray:
+    """
+    Exit bar for a trade entered at EVERY candidate bar at once:
+    the first of stop-loss, take-profit or trend break (n = still open).
+    Returned as a lookup array indexed by entry bar.
+    """
+    n = len(close)
+    cand, start, limit = signals["cand"], signals["start"], signals["limit"]
+
+    stop_price = close[cand] - atr_mult_stop * atr[cand]
+    take_profit = close[cand] + atr_mult_tp * atr[cand]
+
+    min_table, max_table = tables
+    stop_hit = _first_crossing(min_table, start, limit, stop_price, below=True)
+    tp_hit = _first_crossing(max_table, start, limit, take_profit, below=False)
+
+    exit_at = np.full(n + 1, n, dtype=np.int64)
+    exit_at[cand] = np.minimum(stop_hit, tp_hit)
+
+    return exit_at
+
+
+def atr_backtest_kernel(
+    close: np.ndarray,
+    atr: np.ndarray,
+    signals: dict,
+    tables: tuple | None = None,
+    atr_mult_stop: float = 2.0,
+    atr_mult_tp: float = 3.0,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Array-based state machine for the ATR strategy.
+
+    1. atr_exit_bars() resolves the exit of a trade from every possible
+       entry bar in one vectorized pass.
+    2. The state machine then only hops entry → exit → next entry
+       (integer lookups, one per TRADE instead of one per bar).
+    3. The equity curve is the running product of trade returns,
+       broadcast back to bars.
+
+    Returns:
+        equity  → equity curve (one value per bar)
+        entries → bar index of each entry
+        exits   → bar index of each exit (-1 if still open at the end)
+    """
+
+    n = len(close)
+    if tables is None:
+        span = int((signals["limit"] - signals["start"]).max(initial=0))
+        tables = crossing_tables(close, span)
+
+    exit_at = atr_exit_bars(close, atr, signals, tables, atr_mult_stop, atr_mult_tp).tolist()
+    next_entry = signals["next_entry"].tolist()
+
+    entries = []
+    exits = []
+
+    i = next_entry[0] if n else 0
+    while i < n:
+        j = exit_at[i]
+        entries.append(i)
+
+        if j >= n:
+            exits.append(-1)
+            break
+
+        exits.append(j)
+        # Re-entry is only checked from the bar after the exit
+        i = next_entry[j + 1]
+
+    entries = np.asarray(entries, dtype=np.int64)
+    exits = np.asarray(exits, dtype=np.int64)
+
+    # Equity only changes on exit bars: running product of trade returns
+    closed = exits >= 0
+    exit_bars = exits[closed]
+    steps = np.cumprod(close[exit_bars] / close[entries[closed]])
+    levels = np.concatenate(([1.0], steps))
+    equity = levels[np.searchsorted(exit_bars, np.arange(n), side="right")]
+
+    return equity, entries, exits
+
+
+# ============================================================
+#   ATR STRATEGY BACKTEST
+# ============================================================
 def atr_strategy_backtest(
     df: pd.DataFrame,
     atr_mult_stop: float = 2.0,
-    atr_mult_tp: float = 3.0
+    atr_mult_tp: float = 3.0,
+    rsi_entry: float = 50.0,
+    rsi_exit: float = 45.0,
 ):
     """
     ATR Trend Strategy Backtest
@@ -19,21 +269,92 @@ def atr_strategy_backtest(
     Entry:
         Long when:
             - Close > SMA20
-            - RSI > 50
+            - RSI > 50 (rsi_entry)
 
     Exit Conditions:
         - Stop-loss hit  → Close <= Entry - ATR * stop_mult
         - Take-profit hit → Close >= Entry + ATR * tp_mult
-        - Trend breaks → Close < SMA20 or RSI < 45
+        - Trend breaks → Close < SMA20 or RSI < 45 (rsi_exit)
+
+    Runs on NumPy arrays via atr_backtest_kernel(); produces the same
+    equity curve as the original row-by-row loop
+    (_atr_strategy_backtest_loop, kept as the reference implementation).
 
     Returns:
         dict {
             "df": DataFrame with equity curve
+            "trades": DataFrame of closed trades (dates, prices, Return)
             "total_return": float
             "max_drawdown": float
         }
     """
 
+    df = compute_atr_indicators(df)
+    if df is None:
+        return None
+
+    close = df["Close"].to_numpy(dtype=float)
+    signals = atr_signal_arrays(
+        close,
+        df["SMA_20"].to_numpy(dtype=float),
+        df["RSI_14"].to_numpy(dtype=float),
+        rsi_entry,
+        rsi_exit,
+    )
+    equity, entries, exits = atr_backtest_kernel(
+        close,
+        df["ATR_14"].to_numpy(dtype=float),
+        signals,
+        atr_mult_stop=atr_mult_stop,
+        atr_mult_tp=atr_mult_tp,
+    )
+
+    # Build Backtest Output
+    df_bt = df.copy()
+    df_bt["Equity"] = equity
+
+    # Closed trades (a trade still open at the end is not booked)
+    closed = exits >= 0
+    entries, exits = entries[closed], exits[closed]
+    dates = df["Date"].to_numpy()
+    trades = pd.DataFrame({
+        "Entry_Date": dates[entries],
+        "Exit_Date": dates[exits],
+        "Entry_Price": close[entries],
+        "Exit_Price": close[exits],
+        "Return": close[exits] / close[entries] - 1,
+        "Bars_Held": exits - entries,
+    })
+
+    # Total return
+    total_return = equity[-1] - 1.0
+
+    # Max Drawdown
+    max_equity = np.maximum.accumulate(equity)
+    dd = (equity - max_equity) / max_equity
+    max_dd = float(dd.min()) if len(dd) else 0.0
+
+    return {
+        "df": df_bt,
+        "trades": trades,
+        "total_return": float(total_return),
+        "max_drawdown": float(max_dd),
+    }
+
+
+# ============================================================
+#   REFERENCE IMPLEMENTATION (row-by-row, used to verify the kernel)
+# ============================================================
+def _atr_strategy_backtest_loop(
+    df: pd.DataFrame,
+    atr_mult_stop: float = 2.0,
+    atr_mult_tp: float = 3.0
+):
+    """
+    Original iterrows() implementation of atr_strategy_backtest.
+    Slow – kept only as the oracle for benchmarks/bench_strategy.py.
+    """
+
     if df is None or df.empty:
         return None
 
@@ -0,0 +1,262 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.strategy import (
+    _first_crossing,
+    atr_signal_arrays,
+    compute_atr_indicators,
+    crossing_tables,
+)
+
+
+# ============================================================
+#   DEFAULT GRIDS
+# ============================================================
+STOP_GRID = np.round(np.linspace(1.0, 4.0, 7), 2)
+TP_GRID = np.round(np.linspace(1.5, 6.0, 10), 2)
+RSI_ENTRY_GRID = np.array([50.0])
+RSI_EXIT_GRID = np.array([45.0])
+
+METRICS = ["total_return", "max_drawdown", "n_trades", "win_rate"]
+
+
+# ============================================================
+#   ONE SYMBOL, WHOLE GRID
+# ============================================================
+def _walk_all_combos(close, next_entry, cand_pos, exit_kc):
+    """
+    Run the entry → exit state machine for K parameter combinations
+    side by side. Each step advances every still-active combination by
+    one trade, so the loop runs max(#trades) times, not K × #bars.
+    State is kept compacted to the active combinations only.
+    """
+    n = len(close)
+    k = exit_kc.shape[0]
+    out = np.empty((k, len(METRICS)))
+
+    ids = np.arange(k)
+    i = np.full(k, next_entry[0])
+    eq = np.ones(k)
+    peak = np.ones(k)
+    max_dd = np.zeros(k)
+    trades = np.zeros(k)
+    wins = np.zeros(k)
+
+    def finish(done):
+        out[ids[done]] = np.stack(
+            [eq[done] - 1.0, max_dd[done], trades[done], wins[done]], axis=-1
+        )
+        keep = ~done
+        return ids[keep], i[keep], eq[keep], peak[keep], max_dd[keep], trades[keep], wins[keep]
+
+    done = i >= n
+    if done.any():
+        ids, i, eq, peak, max_dd, trades, wins = finish(done)
+
+    while ids.size:
+        j = exit_kc[ids, cand_pos[i]]
+
+        # Trades still open at the end of the data are not booked
+        done = j >= n
+        if done.any():
+            ids, i, eq, peak, max_dd, trades, wins = finish(done)
+            j = j[~done]
+
+        ret = close[j] / close[i]
+        eq *= ret
+        trades += 1
+        wins += ret > 1
+        np.maximum(peak, eq, out=peak)
+        np.minimum(max_dd, (eq - peak) / peak, out=max_dd)
+
+        i = next_entry[j + 1]
+        done = i >= n
+        if done.any():
+            ids, i, eq, peak, max_dd, trades, wins = finish(done)
+
+    # Column 3 holds winning trades until here → win rate
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[:, 3] = np.where(out[:, 2] > 0, out[:, 3] / out[:, 2], np.nan)
+
+    return out
+
+
+def sweep_symbol(
+    close: np.ndarray,
+    sma: np.ndarray,
+    rsi: np.ndarray,
+    atr: np.ndarray,
+    stop_grid=STOP_GRID,
+    tp_grid=TP_GRID,
+    rsi_entry_grid=RSI_ENTRY_GRID,
+    rsi_exit_grid=RSI_EXIT_GRID,
+) -> np.ndarray:
+    """
+    Backtest every parameter combination on one symbol.
+
+    Shared work is done once: the min/max crossing tables per symbol,
+    the entry/break tables per RSI pair, and the stop / take-profit
+    crossings per multiplier (S + T searches, not S × T).
+
+    Returns an array of shape
+        (len(rsi_entry), len(rsi_exit), len(stop), len(tp), len(METRICS))
+    """
+    n = len(close)
+    stop_grid = np.asarray(stop_grid, dtype=float)
+    tp_grid = np.asarray(tp_grid, dtype=float)
+
+    out = np.full(
+        (len(rsi_entry_grid), len(rsi_exit_grid), len(stop_grid), len(tp_grid), len(METRICS)),
+        np.nan,
+    )
+    if n == 0:
+        return out
+
+    tables = crossing_tables(close, n)
+
+    for a, rsi_entry in enumerate(rsi_entry_grid):
+        for b, rsi_exit in enumerate(rsi_exit_grid):
+            signals = atr_signal_arrays(close, sma, rsi, rsi_entry, rsi_exit)
+            cand, start, limit = signals["cand"], signals["start"], signals["limit"]
+
+            if cand.size == 0:
+                out[a, b, ..., 0:2] = 0.0
+                out[a, b, ..., 2] = 0
+                continue
+
+            # (S, C) and (T, C): one crossing search per multiplier
+            stop_px = close[cand] - stop_grid[:, None] * atr[cand]
+            tp_px = close[cand] + tp_grid[:, None] * atr[cand]
+            stop_hit = _first_crossing(tables[0], start[None, :], limit[None, :], stop_px, below=True)
+            tp_hit = _first_crossing(tables[1], start[None, :], limit[None, :], tp_px, below=False)
+
+            # Exit of every combination = earliest of its stop and TP bars
+            exit_kc = np.minimum(stop_hit[:, None, :], tp_hit[None, :, :])
+            exit_kc = exit_kc.reshape(len(stop_grid) * len(tp_grid), cand.size)
+
+            cand_pos = np.full(n + 1, -1, dtype=np.int64)
+            cand_pos[cand] = np.arange(cand.size)
+
+            metrics = _walk_all_combos(close, signals["next_entry"], cand_pos, exit_kc)
+            out[a, b] = metrics.reshape(len(stop_grid), len(tp_grid), len(METRICS))
+
+    return out
+
+
+# ============================================================
+#   WORKER (runs in a child process)
+# ============================================================
+def _sweep_batch(batch: list, grids: tuple) -> list:
+    results = []
+    for symbol, sym_df in batch:
+        ind = compute_atr_indicators(sym_df)
+        if ind is None:
+            continue
+
+        cube = sweep_symbol(
+            ind["Close"].to_numpy(dtype=float),
+            ind["SMA_20"].to_numpy(dtype=float),
+            ind["RSI_14"].to_numpy(dtype=float),
+            ind["ATR_14"].to_numpy(dtype=float),
+            *grids,
+        )
+        results.append((symbol, cube))
+
+    return results
+
+
+# ============================================================
+#   UNIVERSE SWEEP
+# ============================================================
+def run_param_sweep(
+    price_df: pd.DataFrame,
+    stop_grid=STOP_GRID,
+    tp_grid=TP_GRID,
+    rsi_entry_grid=RSI_ENTRY_GRID,
+    rsi_exit_grid=RSI_EXIT_GRID,
+    processes: int | None = None,
+    lookback_days: int | None = None,
+) -> dict:
+    """
+    ATR strategy parameter sweep across every symbol in `price_df`.
+
+    Symbols are split into batches and spread over a process pool
+    (processes=1 runs inline). Indicators are computed once per symbol
+    inside the workers.
+
+    Returns a results cube:
+        {
+            "cube": array (symbol, rsi_entry, rsi_exit, stop, tp, metric),
+            "symbols", "stop_grid", "tp_grid",
+            "rsi_entry_grid", "rsi_exit_grid", "metrics",
+            "elapsed_s": wall time,
+        }
+    """
+    start_t = time.perf_counter()
+
+    grids = tuple(
+        np.asarray(g, dtype=float)
+        for g in (stop_grid, tp_grid, rsi_entry_grid, rsi_exit_grid)
+    )
+
+    cols = ["Date", "Open", "High", "Low", "Close"]
+    items = []
+    for symbol, g in price_df.groupby("Symbol"):
+        g = g[cols].sort_values("Date")
+        if lookback_days:
+            g = g.tail(lookback_days)
+        items.append((symbol, g))
+
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or len(items) <= 1:
+        results = _sweep_batch(items, grids)
+    else:
+        n_batches = min(len(items), processes * 4)
+        batches = [items[i::n_batches] for i in range(n_batches)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = [r for part in pool.map(_sweep_batch, batches, [grids] * n_batches) for r in part]
+
+    results.sort(key=lambda r: r[0])
+
+    shape = tuple(len(g) for g in grids) + (len(METRICS),)
+    cube = np.stack([r[1] for r in results]) if results else np.empty((0,) + shape)
+
+    return {
+        "cube": cube,
+        "symbols": [r[0] for r in results],
+        "stop_grid": grids[0],
+        "tp_grid": grids[1],
+        "rsi_entry_grid": grids[2],
+        "rsi_exit_grid": grids[3],
+        "metrics": list(METRICS),
+        "elapsed_s": time.perf_counter() - start_t,
+    }
+
+
+def sweep_heatmap_frame(
+    result: dict,
+    metric: str = "total_return",
+    rsi_entry_idx: int = 0,
+    rsi_exit_idx: int = 0,
+    symbol: str | None = None,
+    agg: str = "median",
+) -> pd.DataFrame:
+    """
+    Stop × TP slice of the cube for one RSI pair: a single symbol, or
+    aggregated across the universe ("median" or "mean").
+    """
+    m = result["metrics"].index(metric)
+    cube = result["cube"][:, rsi_entry_idx, rsi_exit_idx, :, :, m]
+
+    if symbol is not None:
+        grid = cube[result["symbols"].index(symbol)]
+    elif agg == "mean":
+        grid = np.nanmean(cube, axis=0)
+    else:
+        grid = np.nanmedian(cube, axis=0)
+
+    return pd.DataFrame(grid, index=result["stop_grid"], columns=result["tp_grid"])
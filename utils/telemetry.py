@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# ============================================================
+#   PAGE RENDER TELEMETRY
+# ============================================================
+# Every page creates a timer at the top of the script and wraps its
+# phases:
+#
+#     timer = page_timer("2_Charts")
+#     with timer.phase("load"):
+#         df = load_price_data()
+#     ...
+#     timer.finish()
+#
+# The last RENDER_WINDOW reruns per page are kept in an in-process ring
+# buffer (st.cache_resource → shared by all sessions). A render record is
+# stored when the timer starts and updated after every phase, so reruns
+# that end early through st.stop() are still counted up to their last
+# completed phase.
+
+RENDER_WINDOW = 200
+PHASES = ["load", "compute", "figures"]
+
+
+@st.cache_resource
+def _render_store() -> dict:
+    return {"lock": threading.Lock(), "pages": {}}
+
+
+class PageTimer:
+    def __init__(self, page: str):
+        self.page = page
+        self._t0 = time.perf_counter()
+        self.record = {"ts": time.time(), "total": 0.0}
+
+        store = _render_store()
+        with store["lock"]:
+            store["pages"].setdefault(page, deque(maxlen=RENDER_WINDOW)).append(self.record)
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.record[name] = self.record.get(name, 0.0) + (now - t0)
+            self.record["total"] = now - self._t0
+
+    def finish(self) -> float:
+        self.record["total"] = time.perf_counter() - self._t0
+        self.record["complete"] = True
+        return self.record["total"]
+
+
+def page_timer(page: str) -> PageTimer:
+    return PageTimer(page)
+
+
+# ============================================================
+#   AGGREGATES (Admin page)
+# ============================================================
+def _snapshot() -> dict:
+    store = _render_store()
+    with store["lock"]:
+        return {page: [dict(r) for r in records] for page, records in store["pages"].items()}
+
+
+def page_latency_stats() -> pd.DataFrame:
+    """p50 / p95 (ms) of total and per-phase time, one row per page."""
+    rows = []
+    for page, records in sorted(_snapshot().items()):
+        row = {"page": page, "renders": len(records)}
+        for key in ["total"] + PHASES:
+            values = np.array([r[key] for r in records if key in r])
+            if values.size:
+                row[f"{key}_p50_ms"] = float(np.percentile(values, 50) * 1000)
+                row[f"{key}_p95_ms"] = float(np.percentile(values, 95) * 1000)
+        row["last_ms"] = records[-1]["total"] * 1000 if records else np.nan
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def export_telemetry_json() -> str:
+    """Raw render records plus the summary table, as a JSON document."""
+    return json.dumps(
+        {
+            "window": RENDER_WINDOW,
+            "summary": page_latency_stats().to_dict(orient="records"),
+            "renders": _snapshot(),
+        },
+        indent=1,
+        default=float,
+    )
+
+
+def reset_telemetry() -> None:
+    store = _render_store()
+    with store["lock"]:
+        store["pages"].clear()
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pandas as pd
+
+
+# ============================================================
+#   SYMBOL UNIVERSE (data/universe.csv)
+# ============================================================
+# One NSE symbol per row in a `Symbol` column (without the ".NS"
+# suffix). Any index constituent export works – e.g. the NIFTY 500 list
+# from niftyindices.com, whose symbol column is already named "Symbol".
+# Without the file the original 20 large caps are used.
+
+UNIVERSE_FILE = Path(__file__).resolve().parents[1] / "data" / "universe.csv"
+
+DEFAULT_SYMBOLS = [
+    "TCS", "HDFCBANK", "INFY", "RELIANCE", "ICICIBANK", "SBIN",
+    "AXISBANK", "KOTAKBANK", "LT", "ITC", "HINDUNILVR", "BAJFINANCE",
+    "ASIANPAINT", "MARUTI", "SUNPHARMA", "TECHM", "ULTRACEMCO",
+    "BHARTIARTL", "POWERGRID", "NESTLEIND"
+]
+
+
+def load_universe(path: Path | None = None) -> list[str]:
+    """Symbols to fetch / score, in file order, de-duplicated."""
+    path = Path(path or UNIVERSE_FILE)
+    if not path.exists():
+        return list(DEFAULT_SYMBOLS)
+
+    symbols = (
+        pd.read_csv(path, usecols=["Symbol"])["Symbol"]
+        .dropna()
+        .astype(str)
+        .str.strip()
+        .str.upper()
+        .str.removesuffix(".NS")
+    )
+    symbols = [s for s in dict.fromkeys(symbols) if s]
+    return symbols or list(DEFAULT_SYMBOLS)
+
+
+# ============================================================
+#   SECTORS (data/sectors.csv)
+# ============================================================
+# Symbol → sector, used by the sector-relative features. A `Sector` or
+# `Industry` column is accepted, so the NIFTY 500 constituent export
+# (Symbol, Industry, ...) can be dropped in as is. Symbols without an
+# entry share the "Other" bucket.
+
+SECTORS_FILE = Path(__file__).resolve().parents[1] / "data" / "sectors.csv"
+UNKNOWN_SECTOR = "Other"
+
+
+def load_sectors(path: Path | None = None) -> dict[str, str]:
+    """{symbol: sector}; empty when the file is missing."""
+    path = Path(path or SECTORS_FILE)
+    if not path.exists():
+        return {}
+
+    df = pd.read_csv(path)
+    col = "Sector" if "Sector" in df.columns else "Industry"
+    if "Symbol" not in df.columns or col not in df.columns:
+        return {}
+
+    df = df.dropna(subset=["Symbol", col])
+    symbols = df["Symbol"].astype(str).str.strip().str.upper().str.removesuffix(".NS")
+    return dict(zip(symbols, df[col].astype(str).str.strip()))
@@ -0,0 +1,272 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from utils.strategy import atr_backtest_kernel, atr_signal_arrays, compute_atr_indicators
+from utils.sweep import METRICS, RSI_ENTRY_GRID, RSI_EXIT_GRID, STOP_GRID, TP_GRID, sweep_symbol
+
+
+# ============================================================
+#   DEFAULTS
+# ============================================================
+TRAIN_BARS = 750        # ~3 years in-sample
+TEST_BARS = 250         # ~1 year out-of-sample
+MIN_BARS = 60           # symbols with fewer bars in a window are skipped
+OBJECTIVES = ["total_return", "return_to_drawdown"]
+
+# Row order of the shared indicator block
+_FIELDS = ["Close", "SMA_20", "RSI_14", "ATR_14"]
+
+# Worker-side views of the shared arrays (set by _attach_shared)
+_SHARED = {}
+
+
+# ============================================================
+#   SHARED MEMORY (indicator arrays computed once, read by all workers)
+# ============================================================
+def _to_shared(arr: np.ndarray) -> tuple:
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def _open_shared(spec: tuple) -> tuple:
+    # Pool workers share the parent's resource tracker, so attaching does
+    # not hand ownership over: the parent alone unlinks the block
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _attach_shared(values_spec: tuple, dates_spec: tuple, offsets: list) -> None:
+    # Pool initializer: runs once per worker process
+    values_shm, values = _open_shared(values_spec)
+    dates_shm, dates = _open_shared(dates_spec)
+    _SHARED.update(
+        values=values, dates=dates, offsets=offsets, _handles=(values_shm, dates_shm)
+    )
+
+
+# ============================================================
+#   ONE WINDOW (runs in a worker)
+# ============================================================
+def _symbol_slice(k: int, start: np.int64, end: np.int64) -> tuple:
+    symbol, lo, hi = _SHARED["offsets"][k]
+    dates = _SHARED["dates"][lo:hi]
+    a, b = np.searchsorted(dates, [start, end])
+    return symbol, dates[a:b], _SHARED["values"][:, lo + a:lo + b]
+
+
+def _objective(cube: np.ndarray, objective: str) -> np.ndarray:
+    total = cube[..., METRICS.index("total_return")]
+    if objective == "return_to_drawdown":
+        dd = np.abs(cube[..., METRICS.index("max_drawdown")])
+        return total / np.maximum(dd, 0.01)
+    return total
+
+
+def _evaluate_window(task: dict) -> dict:
+    """
+    In-sample: full parameter grid for every symbol (sweep_symbol), pick
+    the combination with the best MEDIAN objective across the universe.
+    Out-of-sample: run those parameters on the next window.
+    """
+    grids = task["grids"]
+    scores = []
+
+    for k in range(len(_SHARED["offsets"])):
+        _, _, vals = _symbol_slice(k, task["is_start"], task["is_end"])
+        if vals.shape[1] < MIN_BARS:
+            continue
+        rsi_entry_grid, rsi_exit_grid, stop_grid, tp_grid = grids
+        cube = sweep_symbol(*vals, stop_grid, tp_grid, rsi_entry_grid, rsi_exit_grid)
+        scores.append(_objective(cube, task["objective"]))
+
+    if not scores:
+        return {**task, "params": None, "is_score": np.nan, "oos": []}
+
+    with np.errstate(all="ignore"):
+        median = np.nanmedian(np.stack(scores), axis=0)
+    best = np.unravel_index(np.nanargmax(median), median.shape)
+    params = {
+        name: float(grids[axis][best[axis]])
+        for axis, name in enumerate(["rsi_entry", "rsi_exit", "atr_mult_stop", "atr_mult_tp"])
+    }
+
+    oos = []
+    for k in range(len(_SHARED["offsets"])):
+        symbol, dates, vals = _symbol_slice(k, task["is_end"], task["oos_end"])
+        if vals.shape[1] == 0:
+            continue
+        close, sma, rsi, atr = vals
+        signals = atr_signal_arrays(close, sma, rsi, params["rsi_entry"], params["rsi_exit"])
+        equity, _, _ = atr_backtest_kernel(
+            close, atr, signals,
+            atr_mult_stop=params["atr_mult_stop"], atr_mult_tp=params["atr_mult_tp"],
+        )
+        oos.append((symbol, dates.copy(), equity))
+
+    return {**task, "params": params, "is_score": float(median[best]), "oos": oos}
+
+
+# ============================================================
+#   WALK-FORWARD DRIVER
+# ============================================================
+def walk_forward(
+    price_df: pd.DataFrame,
+    train_bars: int = TRAIN_BARS,
+    test_bars: int = TEST_BARS,
+    stop_grid=STOP_GRID,
+    tp_grid=TP_GRID,
+    rsi_entry_grid=RSI_ENTRY_GRID,
+    rsi_exit_grid=RSI_EXIT_GRID,
+    objective: str = "total_return",
+    processes: int | None = None,
+) -> dict:
+    """
+    Rolling walk-forward optimization of the ATR strategy.
+
+    Windows are laid on the union of trading dates:
+        [in-sample: train_bars][out-of-sample: test_bars] → step test_bars
+    Each window is an independent task on a process pool. Indicators are
+    computed ONCE per symbol over the full history (they are causal, so
+    no look-ahead) and shared with the workers through shared memory
+    instead of being pickled per task.
+
+    Trades still open at the end of an out-of-sample window are not
+    booked (same rule as atr_strategy_backtest).
+
+    Returns:
+        {
+            "windows": DataFrame, one row per window (dates, chosen params,
+                       in-sample score, median out-of-sample return)
+            "equity": Series, stitched out-of-sample equity of an
+                      equal-weight portfolio of all symbols
+            "symbol_equity": DataFrame (Date × Symbol), stitched per symbol
+            "elapsed_s": wall time
+        }
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}, got {objective!r}")
+
+    start_t = time.perf_counter()
+    grids = tuple(
+        np.asarray(g, dtype=float) for g in (rsi_entry_grid, rsi_exit_grid, stop_grid, tp_grid)
+    )
+
+    # --- Indicators once per symbol, packed into one block ---
+    blocks, date_blocks, offsets = [], [], []
+    pos = 0
+    for symbol, g in price_df.groupby("Symbol"):
+        ind = compute_atr_indicators(g[["Date", "Open", "High", "Low", "Close"]])
+        if ind is None:
+            continue
+        blocks.append(ind[_FIELDS].to_numpy(dtype=float).T)
+        date_blocks.append(ind["Date"].to_numpy(dtype="datetime64[ns]").astype(np.int64))
+        offsets.append((symbol, pos, pos + len(ind)))
+        pos += len(ind)
+
+    empty = {
+        "windows": pd.DataFrame(),
+        "equity": pd.Series(dtype=float, name="Equity"),
+        "symbol_equity": pd.DataFrame(),
+        "elapsed_s": time.perf_counter() - start_t,
+    }
+    if not blocks:
+        return empty
+
+    values = np.ascontiguousarray(np.concatenate(blocks, axis=1))
+    dates = np.concatenate(date_blocks)
+
+    # --- Windows on the union date axis ---
+    axis = np.unique(dates)
+    tasks = []
+    for i, a in enumerate(range(0, len(axis) - train_bars, test_bars)):
+        b = a + train_bars
+        c = min(b + test_bars, len(axis))
+        tasks.append({
+            "window": i,
+            "is_start": axis[a],
+            "is_end": axis[b],
+            "oos_end": axis[c] if c < len(axis) else axis[-1] + 1,
+            "grids": grids,
+            "objective": objective,
+        })
+
+    if not tasks:
+        return empty
+
+    # --- Run windows (shared memory + process pool) ---
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or len(tasks) == 1:
+        _SHARED.update(values=values, dates=dates, offsets=offsets)
+        try:
+            results = [_evaluate_window(t) for t in tasks]
+        finally:
+            _SHARED.clear()
+    else:
+        values_shm, values_spec = _to_shared(values)
+        dates_shm, dates_spec = _to_shared(dates)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(processes, len(tasks)),
+                initializer=_attach_shared,
+                initargs=(values_spec, dates_spec, offsets),
+            ) as pool:
+                results = list(pool.map(_evaluate_window, tasks))
+        finally:
+            for shm in (values_shm, dates_shm):
+                shm.close()
+                shm.unlink()
+
+    return {**_stitch(results), "elapsed_s": time.perf_counter() - start_t}
+
+
+# ============================================================
+#   STITCH OUT-OF-SAMPLE SEGMENTS
+# ============================================================
+def _stitch(results: list) -> dict:
+    rows = []
+    segments = {}
+
+    for res in sorted(results, key=lambda r: r["window"]):
+        oos_returns = [eq[-1] - 1 for _, _, eq in res["oos"]]
+        rows.append({
+            "window": res["window"],
+            "is_start": pd.Timestamp(res["is_start"]),
+            "oos_start": pd.Timestamp(res["is_end"]),
+            "oos_end": pd.Timestamp(max((d[-1] for _, d, _ in res["oos"]), default=res["is_end"])),
+            **(res["params"] or {}),
+            "is_score": res["is_score"],
+            "oos_median_return": float(np.median(oos_returns)) if oos_returns else np.nan,
+            "n_symbols": len(res["oos"]),
+        })
+        for symbol, d, eq in res["oos"]:
+            segments.setdefault(symbol, []).append((d, eq))
+
+    # Chain each symbol's segments: every window starts from the previous end
+    columns = {}
+    for symbol, parts in segments.items():
+        level = 1.0
+        chained = []
+        for d, eq in parts:
+            chained.append(pd.Series(eq * level, index=pd.to_datetime(d)))
+            level *= eq[-1]
+        columns[symbol] = pd.concat(chained)
+
+    symbol_equity = pd.DataFrame(columns).sort_index()
+
+    # Equal-weight portfolio of whatever symbols trade that day
+    daily = symbol_equity.pct_change(fill_method=None)
+    equity = (1 + daily.mean(axis=1).fillna(0.0)).cumprod().rename("Equity")
+
+    return {
+        "windows": pd.DataFrame(rows),
+        "equity": equity,
+        "symbol_equity": symbol_equity,
+    }